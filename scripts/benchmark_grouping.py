@@ -0,0 +1,106 @@
+"""Benchmark grouping and rendering synthetic organizations of growing size.
+
+Groups and renders 1/8, 1/4, 1/2 and all of ``--repos`` synthetic
+repositories and prints the time per repository, which stays flat when the
+cost grows linearly. Repositories arrive sorted by name, as
+:func:`fetch_repositories` returns them, unless ``--shuffle`` is passed.
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import time
+from functools import partial
+from typing import TYPE_CHECKING
+
+from profile_readme_generator.generator import (
+    RepoEntry,
+    group_repositories,
+    load_config,
+    render_readme,
+)
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+    from profile_readme_generator.generator import ReadmeConfig
+
+TEMPLATE = "# Repositories\n\n{{ repo_sections }}\n"
+CATEGORY_COUNT = 40
+SUBCATEGORY_COUNT = 6
+
+
+def synthetic_repositories(
+    repository_count: int,
+    config: ReadmeConfig,
+    generator: random.Random,
+) -> list[RepoEntry]:
+    configured = [category.name for category in config.categories]
+    categories = configured + [
+        f"Category {index:02d}" for index in range(CATEGORY_COUNT - len(configured))
+    ]
+    repos = [
+        RepoEntry(
+            name=f"{generator.choice(('', 'score-', 'Score-'))}repository-{index:06d}",
+            description=f"Synthetic repository number {index} used for benchmarks",
+            category=generator.choice(categories),
+            subcategory=generator.choice(
+                ["General"] + [f"Area {area}" for area in range(SUBCATEGORY_COUNT)]
+            ),
+        )
+        for index in range(repository_count)
+    ]
+    return sorted(repos, key=lambda repo: repo.name.casefold())
+
+
+def best_of(repeat: int, run: Callable[[], object]) -> float:
+    timings: list[float] = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        run()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description="Benchmark grouping and rendering synthetic organizations",
+    )
+    parser.add_argument("--repos", type=int, default=100_000, help="Largest size")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs per size")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed")
+    parser.add_argument(
+        "--shuffle", action="store_true", help="Pass the repositories unsorted"
+    )
+    return parser
+
+
+def main() -> int:
+    args = build_parser().parse_args()
+    config = load_config(None)
+    generator = random.Random(args.seed)
+    all_repos = synthetic_repositories(args.repos, config, generator)
+    if args.shuffle:
+        generator.shuffle(all_repos)
+
+    print(
+        f"{'repos':>8} {'group ms':>9} {'render ms':>10}"
+        f" {'group µs/repo':>14} {'render µs/repo':>15}"
+    )
+    for divisor in (8, 4, 2, 1):
+        repos = all_repos[: args.repos // divisor]
+        group = best_of(args.repeat, partial(group_repositories, repos, config))
+        render = best_of(
+            args.repeat,
+            partial(render_readme, repos, template=TEMPLATE, config=config),
+        )
+        print(
+            f"{len(repos):>8} {group * 1000:>9.1f} {render * 1000:>10.1f}"
+            f" {group / len(repos) * 1e6:>14.2f} {render / len(repos) * 1e6:>15.2f}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,242 @@
+"""Benchmark decoding an organization repository listing.
+
+Serves a synthetic ``/orgs/{org}/repos`` listing with GitHub-sized repository
+objects from a local HTTP server and compares two ways of reading it:
+
+* ``full objects``: keep every decoded JSON object of every page and project
+  them afterwards, which is what an object-per-repository client holds.
+* ``projected``: :meth:`OrganizationClient.get_repos`, which projects each
+  page to :class:`RepositorySummary` as soon as it is decoded.
+
+CPU time is measured on the decoding thread (the server runs in other threads);
+peak memory is measured separately with ``tracemalloc``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import json
+import threading
+import time
+import tracemalloc
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import TYPE_CHECKING, Any
+from urllib.parse import parse_qs, urlsplit
+
+from profile_readme_generator.github_api import (
+    DEFAULT_PER_PAGE,
+    GitHubClient,
+    OrganizationClient,
+    repository_summary,
+)
+from profile_readme_generator.ratelimit import RequestScheduler
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+ORG = "bench"
+URL_FIELDS = (
+    "archive",
+    "assignees",
+    "blobs",
+    "branches",
+    "collaborators",
+    "comments",
+    "commits",
+    "compare",
+    "contents",
+    "contributors",
+    "deployments",
+    "downloads",
+    "events",
+    "forks",
+    "git_commits",
+    "git_refs",
+    "git_tags",
+    "hooks",
+    "issue_comment",
+    "issue_events",
+    "issues",
+    "keys",
+    "labels",
+    "languages",
+    "merges",
+    "milestones",
+    "notifications",
+    "pulls",
+    "releases",
+    "stargazers",
+    "statuses",
+    "subscribers",
+    "subscription",
+    "tags",
+    "teams",
+    "trees",
+)
+
+
+def synthetic_repository(index: int) -> dict[str, Any]:
+    name = f"repository-{index:05d}"
+    api_url = f"https://api.github.com/repos/{ORG}/{name}"
+    return {
+        "id": 100_000 + index,
+        "node_id": f"R_kgDO{index:08d}",
+        "name": name,
+        "full_name": f"{ORG}/{name}",
+        "private": False,
+        "owner": {
+            "login": ORG,
+            "id": 1,
+            "node_id": "O_kgDOAAAAAQ",
+            "avatar_url": "https://avatars.githubusercontent.com/u/1?v=4",
+            "url": f"https://api.github.com/users/{ORG}",
+            "html_url": f"https://github.com/{ORG}",
+            "type": "Organization",
+            "site_admin": False,
+        },
+        "html_url": f"https://github.com/{ORG}/{name}",
+        "description": f"Synthetic repository number {index} used for benchmarks",
+        "fork": False,
+        "url": api_url,
+        **{f"{field}_url": f"{api_url}/{field}{{/id}}" for field in URL_FIELDS},
+        "created_at": "2024-01-01T00:00:00Z",
+        "updated_at": "2025-01-01T00:00:00Z",
+        "pushed_at": "2025-01-01T00:00:00Z",
+        "git_url": f"git://github.com/{ORG}/{name}.git",
+        "ssh_url": f"git@github.com:{ORG}/{name}.git",
+        "clone_url": f"https://github.com/{ORG}/{name}.git",
+        "homepage": None,
+        "size": index % 5000,
+        "stargazers_count": index % 97,
+        "watchers_count": index % 97,
+        "language": "Python",
+        "has_issues": True,
+        "has_projects": True,
+        "has_wiki": False,
+        "has_pages": False,
+        "has_discussions": False,
+        "forks_count": index % 13,
+        "archived": index % 10 == 0,
+        "disabled": False,
+        "open_issues_count": index % 31,
+        "license": {"key": "apache-2.0", "name": "Apache License 2.0"},
+        "topics": ["score", "benchmark"],
+        "visibility": "public",
+        "default_branch": "main",
+        "permissions": {"admin": False, "push": False, "pull": True},
+    }
+
+
+def encode_pages(repository_count: int) -> list[bytes]:
+    repositories = [synthetic_repository(index) for index in range(repository_count)]
+    return [
+        json.dumps(repositories[start : start + DEFAULT_PER_PAGE]).encode()
+        for start in range(0, repository_count, DEFAULT_PER_PAGE)
+    ]
+
+
+def serve_listing(pages: list[bytes]) -> ThreadingHTTPServer:
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self) -> None:
+            query = parse_qs(urlsplit(self.path).query)
+            page = int(query.get("page", ["1"])[0])
+            listing_url = f"http://{self.headers['Host']}/orgs/{ORG}/repos?per_page={DEFAULT_PER_PAGE}"
+            body = pages[page - 1]
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(body)))
+            if page < len(pages):
+                self.send_header(
+                    "Link",
+                    f'<{listing_url}&page={page + 1}>; rel="next", '
+                    f'<{listing_url}&page={len(pages)}>; rel="last"',
+                )
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format: str, *args: object) -> None:
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def read_full_objects(client: GitHubClient, workers: int) -> list[Any]:
+    repositories = list(client.paginate(f"/orgs/{ORG}/repos", workers=workers))
+    return [repository_summary(repository) for repository in repositories]
+
+
+def read_projected(client: GitHubClient, workers: int) -> list[Any]:
+    return list(OrganizationClient(client, ORG, page_workers=workers).get_repos())
+
+
+def measure(
+    read: Callable[[GitHubClient, int], list[Any]],
+    client: GitHubClient,
+    workers: int,
+    repeat: int,
+) -> tuple[float, int]:
+    cpu_seconds: list[float] = []
+    for _ in range(repeat):
+        gc.collect()
+        started = time.thread_time()
+        read(client, workers)
+        cpu_seconds.append(time.thread_time() - started)
+
+    gc.collect()
+    tracemalloc.start()
+    read(client, workers)
+    _, peak_bytes = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return min(cpu_seconds), peak_bytes
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description="Benchmark decoding a synthetic organization repository listing",
+    )
+    parser.add_argument("--repos", type=int, default=10_000, help="Listing size")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Page workers; CPU time is only exact for 1 (decoding on one thread)",
+    )
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs per variant")
+    return parser
+
+
+def main() -> int:
+    args = build_parser().parse_args()
+    server = serve_listing(encode_pages(args.repos))
+    scheduler = RequestScheduler(requests_per_second=1e6, burst=10_000)
+    api_url = f"http://127.0.0.1:{server.server_address[1]}"
+    results: dict[str, tuple[float, int]] = {}
+    try:
+        with GitHubClient(None, api_url=api_url, scheduler=scheduler) as client:
+            for label, read in (
+                ("full objects", read_full_objects),
+                ("projected", read_projected),
+            ):
+                results[label] = measure(read, client, args.workers, args.repeat)
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    print(f"{args.repos} repositories, {args.workers} page worker(s)")
+    print(f"{'variant':<14} {'CPU ms':>9} {'peak MiB':>9}")
+    for label, (cpu_seconds, peak_bytes) in results.items():
+        print(f"{label:<14} {cpu_seconds * 1000:>9.1f} {peak_bytes / 2**20:>9.1f}")
+    (full_cpu, full_peak), (lean_cpu, lean_peak) = results.values()
+    print(
+        f"projection saves {1 - lean_cpu / full_cpu:.0%} CPU"
+        f" and {1 - lean_peak / full_peak:.0%} peak memory"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
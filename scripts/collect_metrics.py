@@ -17,22 +17,83 @@ Collect extended metrics across all repositories in eclipse-score
 and write them into a Markdown report file.
 """
 
+import argparse
+import base64
+import heapq
+import json
+import math
 import os
 import pathlib
 import re
-from dataclasses import dataclass
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, as_completed, wait
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
 from datetime import datetime, timedelta, timezone
-from typing import Optional
+from typing import Callable, Optional
+from urllib.parse import quote
 
-from github import Github
+from profile_readme_generator.blob_store import BlobStore
+from profile_readme_generator.freshness import content_fingerprint
+from profile_readme_generator.github_api import GitHubApiError, GitHubClient
+from profile_readme_generator.history import MetricsHistory, MetricsSample
+from profile_readme_generator.http_cache import ResponseCache
+from profile_readme_generator.ratelimit import AdaptiveConcurrencyLimiter, RequestScheduler
+from profile_readme_generator.snapshot import load_snapshot as load_org_snapshot
 
 ORG = "eclipse-score"
 OUTPUT_DIR = pathlib.Path("profile")
 OUTPUT_FILE = OUTPUT_DIR / "metrics.md"
+STATE_DIR = pathlib.Path(".cache/metrics")
+SNAPSHOT_FILE_NAME = "snapshot.jsonl"
+BLOB_STORE_DIR_NAME = "blobs"
+NO_RELEASE_FILE_NAME = "no-releases.json"
+NO_RELEASE_TTL = timedelta(days=7)
+HISTORY_FILE_NAME = "history.sqlite3"
+TREND_WINDOWS = [7, 30]
+RESUME_MAX_AGE_HOURS = 6.0
+# Report columns that change every day without any change on GitHub.
+VOLATILE_COLUMNS = ["Days Since Release"]
+LISTING_FIELDS = [
+    "name",
+    "full_name",
+    "description",
+    "pushed_at",
+    "default_branch",
+    "open_issues_count",
+    "stargazers_count",
+    "forks_count",
+    "size",
+]
+
+# Options of a collection run that have no effect on merge, by argparse dest.
+COLLECT_ONLY_OPTIONS = {
+    "--backend": "backend",
+    "--cache-dir": "cache_dir",
+    "--workers": "workers",
+    "--full": "full",
+    "--resume": "resume",
+    "--resume-max-age": "resume_max_age",
+    "--shard": "shard",
+}
 
-gh = Github(os.getenv("GITHUB_TOKEN"))
 NOW = datetime.now(timezone.utc)
 
+BAZEL_VERSION_FILES = [".bazelversion", "WORKSPACE", "WORKSPACE.bzlmod"]
+LINT_CONFIG_FILES = [".gitlint", ".editorconfig", ".pre-commit-config.yaml"]
+CI_SETUP_FILES = [".github/workflows", "Jenkinsfile"]
+TEST_COVERAGE_FILES = ["coverage.yml", "coverage.xml", "pytest.ini", ".coveragerc"]
+
+WORKSPACE_VERSION_PATTERN = re.compile(r'\b\d+\.\d+(?:\.\d+)?\b')
+# Blob store namespaces of the file parsers; change them when a parser's output changes.
+BAZELVERSION_PARSER = "bazelversion/1"
+WORKSPACE_BAZEL_VERSION_PARSER = "workspace-bazel-version/1"
+
+GRAPHQL_PAGE_SIZE = 50
+GRAPHQL_COUNT_PAGE_SIZE = 100
+
 @dataclass
 class RepoData:
     name: str
@@ -47,121 +108,1143 @@ class RepoData:
     latest_release: Optional[str]
     stars: int
     forks: int
+    pushed_at: Optional[str] = None
+    head_sha: Optional[str] = None
+    collected_at: Optional[str] = None
+    # detector_fingerprint() of the detectors that produced the fields above.
+    detectors: Optional[str] = None
+
+def get_contents(client, full_name, path):
+    return client.get_json(f"/repos/{full_name}/contents/{quote(path)}")
 
-def file_exists(repo, path):
+def file_exists(client, full_name, path):
     try:
-        repo.get_contents(path)
+        get_contents(client, full_name, path)
         return True
-    except:
+    except GitHubApiError:
         return False
 
 
-def detect_bazel_version(repo):
-    try:
-        content = repo.get_contents(".bazelversion").decoded_content.decode()
-        for line in content.splitlines():
-            line = line.strip()
-            if not line or line.startswith("#"):
-                continue
-            return line
-    except Exception:
-        pass
+class RepoFiles:
+    """Path index of a repository's default branch.
+
+    The index is loaded with a single recursive git tree request, so presence
+    checks are answered from memory. Only files whose content is needed are
+    downloaded, by blob SHA, and kept in ``blob_store`` so that the same blob
+    is never downloaded twice. If the tree is unavailable or truncated, the
+    index falls back to per-path contents probes.
+    """
+
+    def __init__(self, client, full_name, paths=None, blob_shas=None, blob_store=None):
+        self.client = client
+        self.full_name = full_name
+        self.paths = paths
+        self.blob_shas = blob_shas or {}
+        self.blob_store = blob_store
 
-    pattern = re.compile(r'\b\d+\.\d+(?:\.\d+)?\b')
-    for ws_name in ["WORKSPACE", "WORKSPACE.bzlmod"]:
+    def exists(self, path):
+        if self.paths is None:
+            return file_exists(self.client, self.full_name, path)
+        return path in self.paths
+
+    def read_text(self, path):
+        """Return the decoded content of ``path``, or ``None`` if it cannot be read."""
         try:
-            content = repo.get_contents(ws_name).decoded_content.decode()
-            for line in content.splitlines():
-                line = line.strip()
-                if line.startswith("#"):
-                    continue
-                match = pattern.search(line)
-                if match:
-                    return match.group(0)
-        except Exception:
+            if self.paths is None:
+                blob = get_contents(self.client, self.full_name, path)
+            else:
+                sha = self.blob_shas.get(path)
+                if sha is None:
+                    return None
+                if self.blob_store is not None:
+                    text = self.blob_store.get_text(sha)
+                    if text is not None:
+                        return text
+                blob = self.client.get_json(f"/repos/{self.full_name}/git/blobs/{sha}")
+            text = base64.b64decode(blob["content"]).decode()
+            sha = blob["sha"]
+        except (GitHubApiError, KeyError, TypeError, ValueError):
+            return None
+        if self.blob_store is not None:
+            self.blob_store.put_text(sha, text)
+        return text
+
+    def parse(self, path, namespace, parser):
+        """Return ``parser(text)`` for ``path``, memoized per blob SHA in ``blob_store``.
+
+        ``namespace`` names the parser in the store; change it whenever the
+        parser's output changes. Returns ``None`` if the file cannot be read.
+        """
+        sha = self.blob_shas.get(path)
+        if sha is not None and self.blob_store is not None and self.blob_store.has_result(namespace, sha):
+            return self.blob_store.result(namespace, sha)
+        text = self.read_text(path)
+        if text is None:
+            return None
+        value = parser(text)
+        if sha is not None and self.blob_store is not None:
+            self.blob_store.put_result(namespace, sha, value)
+        return value
+
+
+def load_repo_files(client, full_name, default_branch, blob_store=None):
+    if not default_branch:
+        return RepoFiles(client, full_name, paths=set())
+    try:
+        tree = client.get_json(
+            f"/repos/{full_name}/git/trees/{quote(default_branch, safe='')}",
+            {"recursive": 1},
+        )
+    except GitHubApiError as exc:
+        # 409 is returned for empty repositories, 404 for a missing branch.
+        if exc.status in (404, 409):
+            return RepoFiles(client, full_name, paths=set())
+        return RepoFiles(client, full_name, blob_store=blob_store)
+    if tree.get("truncated"):
+        return RepoFiles(client, full_name, blob_store=blob_store)
+
+    paths = set()
+    blob_shas = {}
+    for element in tree["tree"]:
+        paths.add(element["path"])
+        if element["type"] == "blob":
+            blob_shas[element["path"]] = element["sha"]
+    return RepoFiles(client, full_name, paths=paths, blob_shas=blob_shas, blob_store=blob_store)
+
+
+def parse_bazelversion(content):
+    for line in content.splitlines():
+        line = line.strip()
+        if not line or line.startswith("#"):
             continue
+        return line
+    return None
 
-    return "⚠️ missing"
+def parse_workspace_bazel_version(content):
+    for line in content.splitlines():
+        line = line.strip()
+        if line.startswith("#"):
+            continue
+        match = WORKSPACE_VERSION_PATTERN.search(line)
+        if match:
+            return match.group(0)
+    return None
 
+@dataclass(frozen=True)
+class Detector:
+    """A ``RepoData`` field computed from the files of a repository.
 
-def detect_lint_config(repo):
-    for candidate in [".gitlint", ".editorconfig", ".pre-commit-config.yaml"]:
-        if file_exists(repo, candidate):
+    ``presence_paths`` are only checked with ``files.exists`` and
+    ``content_paths`` are read with ``files.parse``/``files.read_text``.
+    A detector must not look at any other path: the collectors fetch the
+    union of the declared paths of all detectors in one go and run the
+    detectors in memory. ``parsers`` are the ``files.parse`` namespaces it
+    uses; bump ``version`` when ``detect`` changes in any other way.
+    """
+
+    field: str
+    detect: Callable
+    presence_paths: tuple = ()
+    content_paths: tuple = ()
+    parsers: tuple = ()
+    version: int = 1
+
+
+DETECTORS: list[Detector] = []
+
+def register_detector(field, presence_paths=(), content_paths=(), parsers=(), version=1):
+    """Register the decorated ``detect(files)`` function as the detector for ``field``."""
+    def register(detect):
+        DETECTORS.append(
+            Detector(field, detect, tuple(presence_paths), tuple(content_paths), tuple(parsers), version)
+        )
+        return detect
+    return register
+
+def detector_fingerprint():
+    """Hash the declarations of the registered detectors.
+
+    Detector results in a snapshot are only reused while this matches the
+    ``detectors`` field stored with them.
+    """
+    declarations = [
+        [detector.field, detector.version, detector.presence_paths, detector.content_paths, detector.parsers]
+        for detector in DETECTORS
+    ]
+    return content_fingerprint(json.dumps(declarations))[:16]
+
+def required_paths() -> dict[str, bool]:
+    """Return every path the registered detectors use, mapped to whether its content is read."""
+    paths = {}
+    for detector in DETECTORS:
+        for path in detector.presence_paths:
+            paths.setdefault(path, False)
+        for path in detector.content_paths:
+            paths[path] = True
+    return paths
+
+@register_detector(
+    "bazel_version",
+    content_paths=BAZEL_VERSION_FILES,
+    parsers=(BAZELVERSION_PARSER, WORKSPACE_BAZEL_VERSION_PARSER),
+)
+def detect_bazel_version(files):
+    version = files.parse(BAZEL_VERSION_FILES[0], BAZELVERSION_PARSER, parse_bazelversion)
+    if version is not None:
+        return version
+
+    for ws_name in BAZEL_VERSION_FILES[1:]:
+        version = files.parse(ws_name, WORKSPACE_BAZEL_VERSION_PARSER, parse_workspace_bazel_version)
+        if version is not None:
+            return version
+
+    return "⚠️ missing"
+
+@register_detector("lint_config", presence_paths=LINT_CONFIG_FILES)
+def detect_lint_config(files):
+    for candidate in LINT_CONFIG_FILES:
+        if files.exists(candidate):
             return "✅ yes"
     return "❌ no"
 
-def detect_ci_setup(repo):
-    for candidate in [".github/workflows", "Jenkinsfile"]:
-        if file_exists(repo, candidate):
+@register_detector("ci_setup", presence_paths=CI_SETUP_FILES)
+def detect_ci_setup(files):
+    for candidate in CI_SETUP_FILES:
+        if files.exists(candidate):
             return "✅ yes"
     return "❌ no"
 
-def detect_test_coverage(repo):
-    for candidate in ["coverage.yml", "coverage.xml", "pytest.ini", ".coveragerc"]:
-        if file_exists(repo, candidate):
+@register_detector("test_coverage", presence_paths=TEST_COVERAGE_FILES)
+def detect_test_coverage(files):
+    for candidate in TEST_COVERAGE_FILES:
+        if files.exists(candidate):
             return "✅ yes"
     return "❌ no"
 
-def get_latest_release_date(repo):
+class NoReleaseCache:
+    """Repositories whose latest release lookup answered 404 on a previous run.
+
+    An entry is trusted until it is older than ``ttl`` or the repository's
+    ``pushed_at`` changes. Publishing a release that creates a new tag moves
+    ``pushed_at``; a release cut from an existing tag does not, so ``ttl``
+    bounds how long such a release can go unnoticed. Lookups for
+    repositories that do have releases are left to the HTTP response cache,
+    which revalidates them with their ETag. The methods are called from the
+    collector's worker threads.
+    """
+
+    def __init__(self, path, ttl=NO_RELEASE_TTL):
+        self.path = path
+        self.ttl = ttl
+        self.skipped = 0
+        self._lock = threading.Lock()
+        try:
+            self.entries = json.loads(path.read_text(encoding="utf-8"))
+        except (FileNotFoundError, ValueError):
+            self.entries = {}
+
+    def known_missing(self, full_name, pushed_at):
+        with self._lock:
+            entry = self.entries.get(full_name)
+            if entry is None or entry["pushed_at"] != pushed_at:
+                return False
+            if NOW - datetime.fromisoformat(entry["checked_at"]) > self.ttl:
+                return False
+            self.skipped += 1
+            return True
+
+    def add(self, full_name, pushed_at):
+        with self._lock:
+            self.entries[full_name] = {"pushed_at": pushed_at, "checked_at": NOW.isoformat()}
+
+    def discard(self, full_name):
+        with self._lock:
+            self.entries.pop(full_name, None)
+
+    def save(self):
+        with self._lock:
+            entries = json.dumps(self.entries, indent=2, sort_keys=True)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        temporary = self.path.with_name(f"{self.path.name}.tmp")
+        temporary.write_text(entries, encoding="utf-8")
+        os.replace(temporary, self.path)
+
+def get_latest_release_date(client, full_name, no_releases=None, pushed_at=None):
+    if no_releases is not None and no_releases.known_missing(full_name, pushed_at):
+        return None
+    try:
+        release = client.get_json(f"/repos/{full_name}/releases/latest")
+    except GitHubApiError as exc:
+        if exc.status == 404 and no_releases is not None:
+            no_releases.add(full_name, pushed_at)
+        return None
+    if no_releases is not None:
+        no_releases.discard(full_name)
+    return release["published_at"][:10] if release.get("published_at") else None
+
+def get_head_sha(client, full_name, default_branch):
+    """Return the commit SHA the default branch points to, or ``None`` if it cannot be resolved."""
+    if not default_branch:
+        return None
     try:
-        release = repo.get_latest_release()
-        return release.published_at.date().isoformat()
-    except:
+        response = client.request(
+            "GET",
+            f"/repos/{full_name}/commits/{quote(default_branch, safe='')}",
+            headers={"Accept": "application/vnd.github.sha"},
+        )
+    except GitHubApiError:
         return None
+    return response.body.decode().strip() or None
+
+def detect_repo_files(files):
+    return {detector.field: detector.detect(files) for detector in DETECTORS}
+
+def reuse_detected(previous):
+    return {detector.field: getattr(previous, detector.field) for detector in DETECTORS}
+
+def build_repo_data(
+    name,
+    description,
+    pushed_at,
+    head_sha,
+    open_issues,
+    open_prs,
+    detected,
+    latest_release,
+    stars,
+    forks,
+) -> RepoData:
+    return RepoData(
+        name=name,
+        description=(description or "").replace("|", "‖"),
+        last_commit=pushed_at[:10] if pushed_at else None,
+        open_issues=open_issues,
+        open_prs=open_prs,
+        latest_release=latest_release,
+        stars=stars,
+        forks=forks,
+        pushed_at=pushed_at,
+        head_sha=head_sha,
+        collected_at=NOW.isoformat(),
+        detectors=detector_fingerprint(),
+        **detected,
+    )
+
+def count_open_issues_and_prs(client, org, page_size=GRAPHQL_COUNT_PAGE_SIZE) -> dict[str, tuple[int, int]]:
+    """Return ``{name: (open_issues, open_prs)}`` for the public repositories of ``org``.
 
-def query_github_org_for_repo_data(gh: Github, org: str):
-    repo_data_list = []
-    user = gh.get_user(org)
-    for repo in user.get_repos():
-        description = repo.description or ""
-        last_commit = repo.pushed_at.date().isoformat() if repo.pushed_at else None
-        open_issues = repo.open_issues_count
-        open_prs = repo.get_pulls(state="open").totalCount
-        bazel_version = detect_bazel_version(repo)
-        lint_config = detect_lint_config(repo)
-        ci_setup = detect_ci_setup(repo)
-        test_coverage = detect_test_coverage(repo)
-        latest_release = get_latest_release_date(repo)
-        stars = repo.stargazers_count
-        forks = repo.forks_count
-
-        repo_data_list.append(
-            RepoData(
-                name=repo.name,
-                description=description.replace("|", "‖"),
-                last_commit=last_commit,
-                open_issues=open_issues,
-                open_prs=open_prs,
-                bazel_version=bazel_version,
-                lint_config=lint_config,
-                ci_setup=ci_setup,
-                test_coverage=test_coverage,
-                latest_release=latest_release,
-                stars=stars,
-                forks=forks,
+    The counts are ``totalCount`` fields of a paged GraphQL query, so the
+    number of requests grows with the number of repositories divided by
+    ``page_size`` rather than with the number of repositories.
+    """
+    query = """
+query($owner: String!, $first: Int!, $after: String) {
+  repositoryOwner(login: $owner) {
+    repositories(first: $first, after: $after, privacy: PUBLIC, ownerAffiliations: [OWNER]) {
+      pageInfo { hasNextPage endCursor }
+      nodes {
+        name
+        issues(states: OPEN) { totalCount }
+        pullRequests(states: OPEN) { totalCount }
+      }
+    }
+  }
+}
+"""
+    counts = {}
+    after = None
+    while True:
+        response = client.graphql(query, {"owner": org, "first": page_size, "after": after})
+        owner = response["repositoryOwner"]
+        if owner is None:
+            return counts
+        repositories = owner["repositories"]
+        for node in repositories["nodes"]:
+            counts[node["name"]] = (
+                node["issues"]["totalCount"],
+                node["pullRequests"]["totalCount"],
             )
+        if not repositories["pageInfo"]["hasNextPage"]:
+            return counts
+        after = repositories["pageInfo"]["endCursor"]
+
+def collect_repo_data(client, summary, previous=None, blob_store=None, counts=None, no_releases=None) -> tuple[RepoData, bool]:
+    """Run the per-repository probes for one entry of the repository listing.
+
+    The file-based detectors are skipped when ``previous`` (the entry of the
+    last run's snapshot) shows that the default branch has not moved: either
+    ``pushed_at`` is unchanged, or the branch still points at the same
+    commit. ``counts`` is the ``(open_issues, open_prs)`` pair from
+    ``count_open_issues_and_prs``; without it the pull requests are counted
+    with one request. Returns the ``RepoData`` and whether the detector
+    results were reused.
+    """
+    full_name = summary["full_name"]
+    pushed_at = summary["pushed_at"]
+    reused = previous is not None and bool(pushed_at) and previous.pushed_at == pushed_at
+    if reused:
+        head_sha = previous.head_sha
+    else:
+        head_sha = get_head_sha(client, full_name, summary["default_branch"])
+        reused = previous is not None and head_sha is not None and previous.head_sha == head_sha
+    if reused:
+        detected = reuse_detected(previous)
+    else:
+        files = load_repo_files(client, full_name, head_sha or summary["default_branch"], blob_store)
+        detected = detect_repo_files(files)
+
+    if counts is not None:
+        open_issues, open_prs = counts
+    else:
+        open_prs = client.count(f"/repos/{full_name}/pulls", {"state": "open"})
+        # open_issues_count includes pull requests.
+        open_issues = max(0, summary["open_issues_count"] - open_prs)
+
+    repo_data = build_repo_data(
+        name=summary["name"],
+        description=summary["description"],
+        pushed_at=pushed_at,
+        head_sha=head_sha,
+        open_issues=open_issues,
+        open_prs=open_prs,
+        detected=detected,
+        latest_release=get_latest_release_date(client, full_name, no_releases, pushed_at),
+        stars=summary["stargazers_count"],
+        forks=summary["forks_count"],
+    )
+    return repo_data, reused
+
+def run_bounded(function, items, workers):
+    """Yield ``function(item)`` for every item, in completion order.
+
+    At most ``2 * workers`` calls are submitted ahead of the consumer, so
+    ``items`` is consumed lazily and pending results do not pile up.
+    """
+    if workers <= 1:
+        for item in items:
+            yield function(item)
+        return
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        pending = set()
+        for item in items:
+            pending.add(executor.submit(function, item))
+            if len(pending) >= 2 * workers:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+        for future in as_completed(pending):
+            yield future.result()
+
+def estimate_cost(summary):
+    """Rough relative cost of collecting one repository.
+
+    Every repository needs a head commit, tree, release and pull request
+    request; larger repositories have larger trees and are more likely to
+    need per-path fallbacks. ``size`` changes with every push, so shards
+    only agree on the estimate if they read the same listing, which is why
+    ``--shard`` requires ``--from-snapshot``.
+    """
+    return 4 + int(math.log10((summary.get("size") or 0) + 1))
+
+def assign_shards(summaries, count):
+    """Map repository names to shard indexes, balancing the estimated cost.
+
+    Repositories are assigned in descending cost order to the shard with
+    the lowest total so far (longest-processing-time first); ties are broken
+    by name and shard index, so the assignment is deterministic.
+    """
+    loads = [(0, index) for index in range(count)]
+    assignment = {}
+    for summary in sorted(summaries, key=lambda s: (-estimate_cost(s), s["name"])):
+        load, index = heapq.heappop(loads)
+        assignment[summary["name"]] = index
+        heapq.heappush(loads, (load + estimate_cost(summary), index))
+    return assignment
+
+def parse_shard(value):
+    """Parse ``i/N`` (1-based) into the 0-based shard index and the shard count."""
+    try:
+        number, count = (int(part) for part in value.split("/"))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected i/N, got {value!r}") from None
+    if not 1 <= number <= count:
+        raise argparse.ArgumentTypeError(f"shard {value!r} is out of range")
+    return number - 1, count
+
+def listing_from_org_snapshot(org_snapshot):
+    """Return the public repositories of an org snapshot in the shape of ``/users/{org}/repos`` entries."""
+    return [
+        {field: getattr(record, field) for field in LISTING_FIELDS}
+        for record in org_snapshot.repositories
+        if record.visibility == "public"
+    ]
+
+def load_listing(path, org):
+    """Return the repository listing of the org snapshot at ``path``, which must be of ``org``."""
+    org_snapshot = load_org_snapshot(path)
+    if org_snapshot.org != org:
+        raise SystemExit(f"Snapshot {path} is of organization {org_snapshot.org}, not {org}")
+    listing = listing_from_org_snapshot(org_snapshot)
+    print_status(f"Using {len(listing)} public repositories from a snapshot of {org_snapshot.created_at}")
+    return listing
+
+def check_shard_coverage(names, shard_names):
+    """Raise ``SystemExit`` unless the shards contain every name in ``names`` exactly once.
+
+    ``shard_names`` maps each shard snapshot to the repository names in it.
+    """
+    seen = set()
+    duplicated = set()
+    for shard in shard_names.values():
+        duplicated.update(seen.intersection(shard))
+        seen.update(shard)
+    problems = []
+    for description, found in (
+        ("in more than one shard", duplicated),
+        ("missing", names - seen),
+        ("not in the listing", seen - names),
+    ):
+        if found:
+            examples = ", ".join(sorted(found)[:5]) + (", ..." if len(found) > 5 else "")
+            problems.append(f"{len(found)} {description} ({examples})")
+    if problems:
+        raise SystemExit(f"The shard snapshots do not cover the listing exactly once: {'; '.join(problems)}")
+
+def iter_org_repo_data(client: GitHubClient, org: str, workers: int = 1, snapshot=None, blob_store=None, no_releases=None, resumed=None, shard=None, listing=None):
+    """Yield ``(RepoData, reused)`` for every repository of ``org`` as soon as it is collected.
+
+    The repository listing is consumed page by page and the per-repository
+    probes run on a bounded thread pool when ``workers > 1``, so memory does
+    not grow with the size of the organization. Results arrive in
+    completion order. ``snapshot`` maps repository names to the ``RepoData``
+    of the previous run, ``blob_store`` keeps file contents and parsed
+    results between runs, and ``no_releases`` the repositories known to have
+    no release. Repositories in ``resumed`` (records of an interrupted run)
+    are yielded as they are, without any request. With ``shard``, an
+    ``(index, count)`` pair, only the repositories ``assign_shards`` gives
+    to that shard are collected; the listing is then read in full first.
+    ``listing`` replaces the repository listing request, e.g. with the
+    entries of an org snapshot.
+    """
+    snapshot = snapshot or {}
+    resumed = resumed or {}
+    with timed("count open issues and pull requests"):
+        try:
+            counts = count_open_issues_and_prs(client, org)
+        except GitHubApiError as exc:
+            # GraphQL requires a token; fall back to counting per repository.
+            print_status(f"Bulk counting failed, counting per repository: {exc}")
+            counts = {}
+
+    def collect(repo):
+        if repo["name"] in resumed:
+            return resumed[repo["name"]], True
+        return collect_repo_data(
+            client,
+            repo,
+            snapshot.get(repo["name"]),
+            blob_store,
+            counts.get(repo["name"]),
+            no_releases,
         )
-    return repo_data_list
 
-def render_markdown(repos):
-    header = (
+    if listing is None:
+        listing = client.paginate(f"/users/{org}/repos", workers=workers)
+    if shard is not None:
+        index, count = shard
+        summaries = [{field: repo.get(field) for field in LISTING_FIELDS} for repo in listing]
+        assignment = assign_shards(summaries, count)
+        listing = [summary for summary in summaries if assignment[summary["name"]] == index]
+        print_status(f"Shard {index + 1}/{count}: {len(listing)} of {len(summaries)} repositories")
+
+    yield from run_bounded(collect, listing, workers)
+
+def build_graphql_repo_query():
+    """Build the paginated repository query used by the GraphQL backend.
+
+    The query only selects the cheap per-repository fields and the head
+    commit of the default branch; file lookups are done separately for the
+    repositories whose head changed.
+    """
+    return """
+query($owner: String!, $first: Int!, $after: String) {
+  repositoryOwner(login: $owner) {
+    repositories(first: $first, after: $after, privacy: PUBLIC, ownerAffiliations: [OWNER]) {
+      pageInfo { hasNextPage endCursor }
+      nodes {
+        name
+        description
+        pushedAt
+        stargazerCount
+        forkCount
+        issues(states: OPEN) { totalCount }
+        pullRequests(states: OPEN) { totalCount }
+        latestRelease { publishedAt }
+        defaultBranchRef { target { oid } }
+      }
+    }
+  }
+}
+"""
+
+def build_graphql_files_query(count):
+    """Build a query that looks up every detector path in ``count`` repositories at once.
+
+    Every path in ``required_paths()`` is an aliased ``object(expression:)``
+    field (with the blob oid for paths whose content is read), and every
+    repository is an aliased ``repository(name:)`` field named by the
+    variables ``$n0`` … ``$n{count-1}``.
+    """
+    file_fields = [
+        f"f{index}: object(expression: {json.dumps(f'HEAD:{path}')})"
+        f" {{ __typename{' ... on Blob { oid }' if read else ''} }}"
+        for index, (path, read) in enumerate(required_paths().items())
+    ]
+    file_selection = "\n    ".join(file_fields)
+    variables = ", ".join(f"$n{index}: String!" for index in range(count))
+    repositories = "\n".join(
+        f"  r{index}: repository(owner: $owner, name: $n{index}) {{\n    {file_selection}\n  }}"
+        for index in range(count)
+    )
+    return f"query($owner: String!, {variables}) {{\n{repositories}\n}}\n"
+
+def files_from_graphql(client, full_name, node, blob_store=None):
+    """Build the ``RepoFiles`` of one repository from a files query result.
+
+    Contents are not part of the query; they are read by blob oid, so a blob
+    that is already in ``blob_store`` is never transferred again.
+    """
+    paths = set()
+    blob_shas = {}
+    for index, path in enumerate(required_paths()):
+        git_object = node.get(f"f{index}")
+        if git_object is not None:
+            paths.add(path)
+            if git_object.get("oid") is not None:
+                blob_shas[path] = git_object["oid"]
+    return RepoFiles(client, full_name, paths=paths, blob_shas=blob_shas, blob_store=blob_store)
+
+def graphql_head_sha(node):
+    branch = node.get("defaultBranchRef") or {}
+    return (branch.get("target") or {}).get("oid")
+
+def repo_data_from_graphql(node, detected) -> RepoData:
+    release = node.get("latestRelease") or {}
+    return build_repo_data(
+        name=node["name"],
+        description=node["description"],
+        pushed_at=node["pushedAt"],
+        head_sha=graphql_head_sha(node),
+        open_issues=node["issues"]["totalCount"],
+        open_prs=node["pullRequests"]["totalCount"],
+        detected=detected,
+        latest_release=release["publishedAt"][:10] if release.get("publishedAt") else None,
+        stars=node["stargazerCount"],
+        forks=node["forkCount"],
+    )
+
+def iter_org_repo_data_graphql(client: GitHubClient, org: str, page_size: int = GRAPHQL_PAGE_SIZE, snapshot=None, blob_store=None, resumed=None):
+    """Yield ``(RepoData, reused)`` for every public repository of ``org``, one query page at a time.
+
+    File presence is only queried for the repositories of a page whose
+    ``pushedAt`` and head commit differ from ``snapshot``; the others reuse
+    its detector results. Repositories in ``resumed`` are yielded from there.
+    """
+    snapshot = snapshot or {}
+    resumed = resumed or {}
+    query = build_graphql_repo_query()
+    after = None
+    while True:
+        response = client.graphql(
+            query,
+            {"owner": org, "first": page_size, "after": after},
+        )
+        owner = response["repositoryOwner"]
+        if owner is None:
+            raise SystemExit(f"Unknown GitHub organization {org}")
+        repositories = owner["repositories"]
+        for node in repositories["nodes"]:
+            if node["name"] in resumed:
+                yield resumed[node["name"]], True
+        nodes = [node for node in repositories["nodes"] if node["name"] not in resumed]
+
+        detected = {}
+        for node in nodes:
+            previous = snapshot.get(node["name"])
+            if previous is None:
+                continue
+            head_sha = graphql_head_sha(node)
+            if (node["pushedAt"] and previous.pushed_at == node["pushedAt"]) or (
+                head_sha is not None and previous.head_sha == head_sha
+            ):
+                detected[node["name"]] = reuse_detected(previous)
+        reused = set(detected)
+
+        changed = [node["name"] for node in nodes if node["name"] not in reused]
+        if changed:
+            variables = {"owner": org}
+            variables.update((f"n{index}", name) for index, name in enumerate(changed))
+            files_response = client.graphql(build_graphql_files_query(len(changed)), variables)
+            for index, name in enumerate(changed):
+                files = files_from_graphql(client, f"{org}/{name}", files_response[f"r{index}"] or {}, blob_store)
+                detected[name] = detect_repo_files(files)
+
+        for node in nodes:
+            yield repo_data_from_graphql(node, detected[node["name"]]), node["name"] in reused
+        if not repositories["pageInfo"]["hasNextPage"]:
+            return
+        after = repositories["pageInfo"]["endCursor"]
+
+def load_checkpoint(path, max_age) -> dict[str, RepoData]:
+    """Return the records of an interrupted run that are younger than ``max_age``, by repository name.
+
+    Records written by other detectors than the registered ones are dropped.
+    """
+    try:
+        lines = path.read_text(encoding="utf-8").splitlines()
+    except FileNotFoundError:
+        return {}
+    detectors = detector_fingerprint()
+    checkpoint = {}
+    for line in lines:
+        try:
+            repo_data = RepoData(**json.loads(line))
+        except (TypeError, ValueError):
+            # The last record of a killed run may be incomplete.
+            continue
+        if repo_data.detectors != detectors:
+            continue
+        if repo_data.collected_at and NOW - datetime.fromisoformat(repo_data.collected_at) <= max_age:
+            checkpoint[repo_data.name] = repo_data
+    return checkpoint
+
+def iter_snapshot(path):
+    """Yield the ``RepoData`` records of a snapshot file; raise ``ValueError``/``TypeError`` if it is unreadable."""
+    with path.open(encoding="utf-8") as records:
+        for line in records:
+            yield RepoData(**json.loads(line))
+
+def load_snapshot(path):
+    """Return the ``RepoData`` of the last run by repository name.
+
+    A missing or unreadable snapshot yields an empty mapping, so every
+    repository is fully collected. So are the repositories whose records
+    were written by other detectors than the registered ones, as with
+    ``--full``.
+    """
+    try:
+        snapshot = {repo_data.name: repo_data for repo_data in iter_snapshot(path)}
+    except FileNotFoundError:
+        return {}
+    except (TypeError, ValueError):
+        print_status(f"Ignoring unreadable snapshot {path}")
+        return {}
+    detectors = detector_fingerprint()
+    current = {name: repo_data for name, repo_data in snapshot.items() if repo_data.detectors == detectors}
+    if len(current) < len(snapshot):
+        print_status(f"Detectors changed since {len(snapshot) - len(current)} repositories were collected; running them again")
+    return current
+
+def to_sample(repo_data):
+    return MetricsSample(
+        repo=repo_data.name,
+        date=NOW.date().isoformat(),
+        open_issues=repo_data.open_issues,
+        open_prs=repo_data.open_prs,
+        stars=repo_data.stars,
+        forks=repo_data.forks,
+        latest_release=repo_data.latest_release,
+    )
+
+def load_trend_baselines(history):
+    """Return, per day count in ``TREND_WINDOWS``, the samples of that many days ago by repository.
+
+    A baseline is the latest sample that is at least ``days`` and at most
+    ``2 * days`` old; after a longer gap in the history the repository has
+    none, so the report shows ``-`` instead of a change over months.
+    """
+    return {
+        days: history.samples_as_of(
+            (NOW - timedelta(days=days)).date().isoformat(),
+            not_before=(NOW - timedelta(days=2 * days)).date().isoformat(),
+        )
+        for days in TREND_WINDOWS
+    }
+
+def format_delta(current, baseline):
+    if baseline is None:
+        return "-"
+    delta = current - baseline.open_issues
+    return f"{delta:+d}" if delta else "0"
+
+def days_since(date):
+    if not date:
+        return "-"
+    return str((NOW.date() - datetime.fromisoformat(date).date()).days)
+
+def render_header():
+    return (
         f"# Cross-Repo Metrics Report\n\n"
         f"Generated on {NOW.isoformat()}\n\n"
-        "| Repo |Last Commit | Issues | PRs | Bazel | Lint | CI | Test Coverage | Latest Release | Stars | Forks |\n"
-        "|------|------------|--------|-----|-------|------|----|---------------|----------------|-------|-------|"
-    )
-    rows = []
-    for r in sorted(repos, key=lambda x: x.name.lower()):
-        rows.append(
-            f"| [{r.name}](https://github.com/{ORG}/{r.name}) | {r.last_commit or '-'} | "
-            f"{r.open_issues} | {r.open_prs} | {r.bazel_version} | {r.lint_config} | "
-            f"{r.ci_setup} | {r.test_coverage} | {r.latest_release or '-'} | {r.stars} | {r.forks} |"
+        "| Repo |Last Commit | Issues | Issues Δ7d | Issues Δ30d | PRs | Bazel | Lint | CI | Test Coverage | Latest Release | Days Since Release | Stars | Forks |\n"
+        "|------|------------|--------|------------|-------------|-----|-------|------|----|---------------|----------------|--------------------|-------|-------|"
+    )
+
+def render_row(r, org=ORG, baselines=None):
+    baselines = baselines or {days: {} for days in TREND_WINDOWS}
+    issue_deltas = " | ".join(
+        format_delta(r.open_issues, baselines[days].get(r.name)) for days in TREND_WINDOWS
+    )
+    return (
+        f"| [{r.name}](https://github.com/{org}/{r.name}) | {r.last_commit or '-'} | "
+        f"{r.open_issues} | {issue_deltas} | {r.open_prs} | {r.bazel_version} | {r.lint_config} | "
+        f"{r.ci_setup} | {r.test_coverage} | {r.latest_release or '-'} | "
+        f"{days_since(r.latest_release)} | {r.stars} | {r.forks} |"
+    )
+
+def row_sort_key(row):
+    # Rows start with "| [name](", and repository names cannot contain "]".
+    return row[3:row.index("](")].lower()
+
+def report_fingerprint(report):
+    """Hash a report without its timestamp and its ``VOLATILE_COLUMNS``."""
+    lines = report.split("\n")
+    header = next((line for line in lines if line.startswith("| Repo ")), "")
+    columns = [cell.strip() for cell in header.split("|")]
+    volatile = [columns.index(name) for name in VOLATILE_COLUMNS if name in columns]
+    kept = []
+    for line in lines:
+        if line.startswith("Generated on "):
+            continue
+        if line.startswith("| [") and volatile:
+            cells = line.split("|")
+            for index in volatile:
+                cells[index] = ""
+            line = "|".join(cells)
+        kept.append(line)
+    return content_fingerprint("\n".join(kept))
+
+def render_markdown(repos, org=ORG, baselines=None):
+    rows = [render_row(r, org, baselines) for r in sorted(repos, key=lambda x: x.name.lower())]
+    return "\n".join([render_header()] + rows)
+
+
+class ReportWriter:
+    """Writes report rows and ``RepoData`` records as repositories are collected.
+
+    Rows are appended to ``<output>.partial`` (a readable report in
+    collection order) and records to ``<snapshot_file>.partial``, both
+    flushed per repository, so a failed run leaves everything collected so
+    far on disk. The records file is the checkpoint read by ``--resume``. ``finish`` sorts the rows into ``output`` and promotes the
+    records to ``snapshot_file``, each with an atomic rename. ``output`` is
+    left alone if only its timestamp and volatile columns would change;
+    ``changed`` tells whether it was rewritten.
+    """
+
+    def __init__(self, output, snapshot_file, org=ORG, baselines=None):
+        self.output = output
+        self.snapshot_file = snapshot_file
+        self.org = org
+        self.baselines = baselines
+        self.partial_report = output.with_name(f"{output.name}.partial")
+        self.partial_snapshot = snapshot_file.with_name(f"{snapshot_file.name}.partial")
+        self.count = 0
+        self.changed = False
+        self._report = None
+        self._records = None
+
+    def __enter__(self):
+        self.partial_report.parent.mkdir(parents=True, exist_ok=True)
+        self.partial_snapshot.parent.mkdir(parents=True, exist_ok=True)
+        self._report = self.partial_report.open("w", encoding="utf-8")
+        self._records = self.partial_snapshot.open("w", encoding="utf-8")
+        self._report.write(render_header() + "\n")
+        return self
+
+    def __exit__(self, *exc_info):
+        self._close()
+
+    def add(self, repo_data):
+        self._report.write(render_row(repo_data, self.org, self.baselines) + "\n")
+        self._report.flush()
+        self._records.write(json.dumps(asdict(repo_data), ensure_ascii=False) + "\n")
+        self._records.flush()
+        self.count += 1
+
+    def finish(self):
+        self._close()
+        with self.partial_report.open(encoding="utf-8") as report:
+            rows = [line.rstrip("\n") for line in report if line.startswith("| [")]
+        rows.sort(key=row_sort_key)
+        report = "\n".join([render_header()] + rows)
+        self.changed = not (
+            self.output.exists()
+            and report_fingerprint(self.output.read_text(encoding="utf-8")) == report_fingerprint(report)
         )
-    return "\n".join([header] + rows)
+        if self.changed:
+            temporary = self.output.with_name(f"{self.output.name}.tmp")
+            temporary.write_text(report, encoding="utf-8")
+            os.replace(temporary, self.output)
+        self.partial_report.unlink()
+        os.replace(self.partial_snapshot, self.snapshot_file)
+
+    def _close(self):
+        for stream in (self._report, self._records):
+            if stream is not None:
+                stream.close()
+
+
+def print_status(message):
+    print(f"[collect-metrics] {message}", file=sys.stderr)
+
+@contextmanager
+def timed(phase):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        print_status(f"{phase}: {time.perf_counter() - start:.2f}s")
+
+def add_report_arguments(parser, defaults=True):
+    """Add the options shared by collection runs and ``merge``.
+
+    ``merge`` also accepts them after the subcommand. Its copies have no
+    defaults (``defaults=False``), so they do not overwrite values given
+    before the subcommand.
+    """
+    def default(value):
+        return value if defaults else argparse.SUPPRESS
+
+    parser.add_argument("--org", default=default(ORG), help="GitHub organization name")
+    parser.add_argument(
+        "--output",
+        type=pathlib.Path,
+        default=default(OUTPUT_FILE),
+        help="Markdown file to write",
+    )
+    parser.add_argument(
+        "--state-dir",
+        type=pathlib.Path,
+        default=default(STATE_DIR),
+        help=f"Directory for the snapshot of the previous run and the metrics history (default: {STATE_DIR})",
+    )
+    parser.add_argument(
+        "--unchanged-exit-code",
+        type=int,
+        default=default(0),
+        help="Exit status when the report was not rewritten because only its timestamp and days-since columns would change (default: 0)",
+    )
+
+def build_parser():
+    parser = argparse.ArgumentParser(description=__doc__)
+    add_report_arguments(parser)
+    parser.add_argument(
+        "--backend",
+        choices=["rest", "graphql"],
+        default="rest",
+        help="Collect with per-repository REST calls or with batched GraphQL queries",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        type=pathlib.Path,
+        help="Directory for the persistent GitHub API response cache (disabled by default)",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Number of repositories to collect concurrently with the REST backend (default: 1, sequential)",
+    )
+    parser.add_argument(
+        "--full",
+        action="store_true",
+        help="Ignore the state of the previous run: run the file detectors and release lookups for every repository",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Continue an interrupted run: keep the repositories it already collected instead of collecting them again",
+    )
+    parser.add_argument(
+        "--resume-max-age",
+        type=float,
+        default=RESUME_MAX_AGE_HOURS,
+        metavar="HOURS",
+        help=f"Only resume repositories collected within this many hours (default: {RESUME_MAX_AGE_HOURS:g})",
+    )
+    parser.add_argument(
+        "--shard",
+        type=parse_shard,
+        metavar="I/N",
+        help="Only collect the I-th of N cost-balanced shards of the repositories (REST backend, requires --from-snapshot); combine the shard snapshots with 'merge'",
+    )
+    parser.add_argument(
+        "--from-snapshot",
+        type=pathlib.Path,
+        help="Take the repository listing from an org snapshot written by snapshot-org (REST backend)",
+    )
+
+    subparsers = parser.add_subparsers(dest="command")
+    merge_parser = subparsers.add_parser(
+        "merge",
+        help="Combine the snapshots of sharded runs into the report",
+        description="Combine the snapshots of sharded runs into the report, the snapshot and the history in --state-dir.",
+    )
+    merge_parser.add_argument(
+        "snapshots",
+        nargs="+",
+        type=pathlib.Path,
+        help="snapshot.jsonl files written by --shard runs",
+    )
+    merge_parser.add_argument(
+        "--from-snapshot",
+        type=pathlib.Path,
+        default=argparse.SUPPRESS,
+        help="The org snapshot the shards were collected from (required); every repository in it must be in exactly one shard snapshot",
+    )
+    add_report_arguments(merge_parser, defaults=False)
+    return parser
+
+def parse_args(argv=None):
+    """Parse the command line; collection options are rejected for ``merge``."""
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.command == "merge":
+        given = [
+            option
+            for option, dest in COLLECT_ONLY_OPTIONS.items()
+            if getattr(args, dest) != parser.get_default(dest)
+        ]
+        if given:
+            parser.error(f"{', '.join(given)} cannot be used with merge")
+    return args
+
+def merge_snapshots(args):
+    """Write the report, snapshot and history for the union of several shard snapshots.
+
+    The shards must cover the listing of ``--from-snapshot`` exactly once.
+    The profile README is not written here; it is rendered from the same
+    org snapshot by ``generate-profile-readme --from-snapshot``.
+    """
+    if args.from_snapshot is None:
+        raise SystemExit("merge requires --from-snapshot, the org snapshot the shards were collected from")
+    listing = load_listing(args.from_snapshot, args.org)
+    merged = {}
+    shard_names = {}
+    for path in args.snapshots:
+        shard_names[path] = set()
+        for repo_data in iter_snapshot(path):
+            shard_names[path].add(repo_data.name)
+            merged[repo_data.name] = repo_data
+    check_shard_coverage({repo["name"] for repo in listing}, shard_names)
+
+    with MetricsHistory(args.state_dir / HISTORY_FILE_NAME) as history:
+        baselines = load_trend_baselines(history)
+        snapshot_file = args.state_dir / SNAPSHOT_FILE_NAME
+        with ReportWriter(args.output, snapshot_file, org=args.org, baselines=baselines) as writer:
+            for repo_data in merged.values():
+                writer.add(repo_data)
+            writer.finish()
+        history.record(to_sample(r) for r in merged.values())
+    if not writer.changed:
+        print(f"{args.output} is unchanged for {writer.count} repos from {len(args.snapshots)} snapshots")
+        return args.unchanged_exit_code
+    print(f"Wrote {writer.count} repos from {len(args.snapshots)} snapshots to {args.output}")
+    return 0
+
+def main():
+    args = parse_args()
+    if args.command == "merge":
+        return merge_snapshots(args)
+    if args.workers < 1:
+        raise SystemExit("--workers must be at least 1")
+    if args.shard is not None and args.backend != "rest":
+        raise SystemExit("--shard is only supported with --backend rest")
+    if args.shard is not None and args.from_snapshot is None:
+        # Every shard must split the same listing, or repositories fall between shards.
+        raise SystemExit("--shard requires --from-snapshot")
+    if args.from_snapshot is not None and args.backend != "rest":
+        raise SystemExit("--from-snapshot is only supported with --backend rest")
+    listing = None
+    if args.from_snapshot is not None:
+        listing = load_listing(args.from_snapshot, args.org)
+    if args.resume and args.full:
+        raise SystemExit("--resume and --full cannot be combined")
+
+    cache = ResponseCache(args.cache_dir) if args.cache_dir is not None else None
+    snapshot_file = args.state_dir / SNAPSHOT_FILE_NAME
+    snapshot = {} if args.full else load_snapshot(snapshot_file)
+    blob_store = BlobStore(args.state_dir / BLOB_STORE_DIR_NAME)
+    no_releases = NoReleaseCache(args.state_dir / NO_RELEASE_FILE_NAME)
+    if args.full:
+        no_releases.entries = {}
+    start = time.perf_counter()
+    scheduler = RequestScheduler(
+        limiter=AdaptiveConcurrencyLimiter(maximum=args.workers),
+        notify=print_status,
+    )
+    history = MetricsHistory(args.state_dir / HISTORY_FILE_NAME)
+    baselines = load_trend_baselines(history)
+    writer = ReportWriter(args.output, snapshot_file, org=args.org, baselines=baselines)
+    resumed = {}
+    if args.resume:
+        resumed = load_checkpoint(writer.partial_snapshot, timedelta(hours=args.resume_max_age))
+        print_status(f"Resuming {len(resumed)} repositories from {writer.partial_snapshot}")
+    with (
+        history,
+        GitHubClient(os.getenv("GITHUB_TOKEN"), cache=cache, scheduler=scheduler) as client,
+        writer,
+    ):
+        if args.backend == "graphql":
+            phase = "collect repository data (graphql)"
+            results = iter_org_repo_data_graphql(
+                client, args.org, snapshot=snapshot, blob_store=blob_store, resumed=resumed
+            )
+        else:
+            phase = f"collect repository data ({args.workers} worker{'s' if args.workers != 1 else ''})"
+            results = iter_org_repo_data(
+                client,
+                args.org,
+                workers=args.workers,
+                snapshot=snapshot,
+                blob_store=blob_store,
+                no_releases=no_releases,
+                resumed=resumed,
+                shard=args.shard,
+                listing=listing,
+            )
+        reused = 0
+        try:
+            with timed(phase):
+                for repo_data, was_reused in results:
+                    writer.add(repo_data)
+                    reused += was_reused
+        finally:
+            # Keep what was learned so far for a --resume run.
+            blob_store.save()
+            no_releases.save()
+        with timed("sort and write report"):
+            writer.finish()
+        if args.shard is None:
+            # Sharded runs are recorded once, by merge.
+            with timed("update history"):
+                history.record(to_sample(r) for r in iter_snapshot(snapshot_file))
+
+    print_status(f"Collected {writer.count} repositories in {args.org}")
+    print_status(f"Reused file detection results for {reused} of {writer.count} repositories")
+    print_status(f"Skipped {no_releases.skipped} release lookups for repositories without releases")
+    print_status(
+        f"API requests: {client.requests_sent} ({client.not_modified} not modified,"
+        f" {scheduler.retries} retried, concurrency limit {scheduler.limiter.limit})"
+    )
+    print_status(f"Blob store: {blob_store.downloads} files downloaded, {blob_store.parses} parsed")
+    print_status(f"total: {time.perf_counter() - start:.2f}s")
+    if not writer.changed:
+        print(f"{args.output} is unchanged for {writer.count} repos")
+        return args.unchanged_exit_code
+    print(f"Wrote {writer.count} repos to {args.output}")
+    return 0
 
 if __name__ == "__main__":
-    OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
-    repos = query_github_org_for_repo_data(gh, ORG)
-    md = render_markdown(repos)
-    OUTPUT_FILE.write_text(md, encoding="utf-8")
-    print(f"Wrote {len(repos)} repos to {OUTPUT_FILE}")
+    raise SystemExit(main())
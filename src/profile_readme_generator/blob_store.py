@@ -0,0 +1,90 @@
+"""Content-addressed store for git blob contents and values derived from them."""
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+RESULTS_FILE_NAME = "results.json"
+RESULTS_VERSION = 1
+
+JsonValue = str | int | float | bool | list["JsonValue"] | dict[str, "JsonValue"] | None
+
+
+class BlobStore:
+    """Blob texts and parsed results keyed by git blob SHA.
+
+    A blob SHA is the hash of the blob's bytes, so entries never go stale and
+    are shared between repositories that contain identical files. Texts are
+    stored one file per blob below ``directory``; parsed results are kept per
+    ``namespace`` (a parser name that should change whenever the parser's
+    output changes) and written by :meth:`save`.
+    """
+
+    def __init__(self, directory: Path) -> None:
+        self.directory = directory
+        self.downloads = 0
+        self.parses = 0
+        self._lock = threading.Lock()
+        self._results = self._load_results()
+
+    def get_text(self, sha: str) -> str | None:
+        try:
+            return self._text_path(sha).read_text(encoding="utf-8")
+        except (FileNotFoundError, UnicodeDecodeError):
+            return None
+
+    def put_text(self, sha: str, text: str) -> None:
+        text_path = self._text_path(sha)
+        text_path.parent.mkdir(parents=True, exist_ok=True)
+        temporary_path = text_path.with_name(
+            f"{text_path.name}.{threading.get_ident()}.tmp"
+        )
+        temporary_path.write_text(text, encoding="utf-8")
+        os.replace(temporary_path, text_path)
+        with self._lock:
+            self.downloads += 1
+
+    def result(self, namespace: str, sha: str) -> JsonValue:
+        """Return the stored result of ``namespace`` for ``sha``; raise ``KeyError`` if unknown."""
+        with self._lock:
+            return self._results[namespace][sha]
+
+    def has_result(self, namespace: str, sha: str) -> bool:
+        with self._lock:
+            return sha in self._results.get(namespace, {})
+
+    def put_result(self, namespace: str, sha: str, value: JsonValue) -> None:
+        with self._lock:
+            self._results.setdefault(namespace, {})[sha] = value
+            self.parses += 1
+
+    def save(self) -> None:
+        with self._lock:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            results_path = self.directory / RESULTS_FILE_NAME
+            temporary_path = results_path.with_name(f"{RESULTS_FILE_NAME}.tmp")
+            temporary_path.write_text(
+                json.dumps({"version": RESULTS_VERSION, "results": self._results}),
+                encoding="utf-8",
+            )
+            os.replace(temporary_path, results_path)
+
+    def _text_path(self, sha: str) -> Path:
+        return self.directory / "texts" / sha[:2] / sha
+
+    def _load_results(self) -> dict[str, dict[str, JsonValue]]:
+        try:
+            raw_results = json.loads(
+                (self.directory / RESULTS_FILE_NAME).read_text(encoding="utf-8")
+            )
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+        if raw_results.get("version") != RESULTS_VERSION:
+            return {}
+        return raw_results.get("results", {})
@@ -0,0 +1,106 @@
+"""Cheap checks of whether a rendered output is still current."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from dataclasses import asdict, dataclass
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    import re
+    from pathlib import Path
+
+    from profile_readme_generator.github_api import GitHubClient
+
+SOURCE_STATE_VERSION = 1
+
+
+@dataclass(frozen=True, slots=True)
+class SourceState:
+    """What a rendered README depends on, in a form that is cheap to probe."""
+
+    repository_count: int
+    latest_updated_at: str | None
+    properties_fingerprint: str
+    inputs_fingerprint: str
+
+
+def content_fingerprint(text: str) -> str:
+    normalized = text.replace("\r\n", "\n").rstrip("\n")
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+def output_is_current(
+    path: Path, content: str, volatile: re.Pattern[str] | None = None
+) -> bool:
+    """Return whether ``path`` already holds ``content``.
+
+    Line endings and text matching ``volatile``, such as a render timestamp,
+    are ignored.
+    """
+    if not path.exists():
+        return False
+    existing = path.read_text(encoding="utf-8")
+    if volatile is not None:
+        existing = volatile.sub("", existing)
+        content = volatile.sub("", content)
+    return content_fingerprint(existing) == content_fingerprint(content)
+
+
+def probe_source_state(
+    client: GitHubClient,
+    org: str,
+    inputs_fingerprint: str,
+) -> SourceState:
+    """Probe ``org`` with one ``per_page=1`` repository request and the property-value pages.
+
+    Repository edits, renames, archiving and deletions change the most
+    recently updated repository or the repository count; custom property
+    changes change the property fingerprint. With a response cache the
+    requests are conditional, and ``304 Not Modified`` answers do not count
+    against the rate limit.
+    """
+    from profile_readme_generator.github_api import OrganizationClient
+
+    response = client.request(
+        "GET",
+        f"/orgs/{org}/repos",
+        params={"sort": "updated", "direction": "desc", "per_page": 1},
+    )
+    latest: list[dict[str, Any]] = response.json()
+    properties = {
+        values.repository_name: values.properties
+        for values in OrganizationClient(client, org).list_custom_property_values()
+        if values.properties
+    }
+    return SourceState(
+        repository_count=response.per_page_one_count(),
+        latest_updated_at=latest[0]["updated_at"] if latest else None,
+        properties_fingerprint=content_fingerprint(
+            json.dumps(properties, sort_keys=True)
+        ),
+        inputs_fingerprint=inputs_fingerprint,
+    )
+
+
+def load_source_state(path: Path) -> SourceState | None:
+    """Read the state saved by :func:`save_source_state`; ``None`` if there is none usable."""
+    try:
+        raw_state = json.loads(path.read_text(encoding="utf-8"))
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+    if raw_state.pop("version", None) != SOURCE_STATE_VERSION:
+        return None
+    return SourceState(**raw_state)
+
+
+def save_source_state(path: Path, state: SourceState) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temporary_path = path.with_name(f"{path.name}.tmp")
+    temporary_path.write_text(
+        json.dumps({"version": SOURCE_STATE_VERSION, **asdict(state)}, indent=1),
+        encoding="utf-8",
+    )
+    os.replace(temporary_path, path)
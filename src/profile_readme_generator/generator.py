@@ -6,17 +6,42 @@ import subprocess
 import sys
 import tomllib
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
+from datetime import UTC, datetime
+from functools import lru_cache, partial
 from importlib.resources import files
 from pathlib import Path
-from typing import TYPE_CHECKING, cast
+from typing import TYPE_CHECKING, TextIO, cast
+
+from profile_readme_generator.freshness import (
+    content_fingerprint,
+    load_source_state,
+    output_is_current,
+    probe_source_state,
+    save_source_state,
+)
+from profile_readme_generator.readme_template import compile_template
+from profile_readme_generator.section_cache import (
+    load_section_cache,
+    renderer_fingerprint,
+    save_section_cache,
+    section_key,
+)
 
 if TYPE_CHECKING:
-    from github import Auth, Github
-    from github.Organization import Organization
+    from collections.abc import Callable, Iterable, Iterator, Sequence
+
+    from profile_readme_generator.freshness import SourceState
+    from profile_readme_generator.github_api import GitHubClient
+    from profile_readme_generator.listings import OrganizationListings
+    from profile_readme_generator.readme_template import Slot
+    from profile_readme_generator.section_cache import SectionCache
 
 DEFAULT_ORG = "eclipse-score"
 DEFAULT_OUTPUT = Path("profile/README.md")
+DEFAULT_STATE_FILE = Path(".cache/profile-readme-state.json")
+DEFAULT_SECTION_CACHE = Path(".cache/profile-readme-sections.json")
 DEFAULT_CATEGORY = "Uncategorized"
 DEFAULT_SUBCATEGORY = "General"
 
@@ -112,6 +137,22 @@ class ConfigIndex:
             "",
         )
 
+    def category_entries(self, category: str) -> list[object]:
+        """The config entries a rendered ``category`` section depends on."""
+        category_key = category.casefold()
+        return [
+            self.category_names.get(category_key),
+            self.category_descriptions.get(category_key),
+            sorted(self.subcategory_names.get(category_key, {}).items()),
+            sorted(self.subcategory_descriptions.get(category_key, {}).items()),
+        ]
+
+
+@lru_cache(maxsize=8)
+def config_index_for(config: ReadmeConfig | None) -> ConfigIndex:
+    """Return the :class:`ConfigIndex` of ``config``, built once per config."""
+    return ConfigIndex.from_config(config)
+
 
 GroupedRepos = dict[str, dict[str, list[RepoEntry]]]
 CustomPropertyValue = str | list[str] | None
@@ -141,45 +182,92 @@ def build_parser() -> argparse.ArgumentParser:
         default="GITHUB_TOKEN",
         help="Environment variable that contains the GitHub token",
     )
+    parser.add_argument(
+        "--cache-dir",
+        type=Path,
+        help="Directory for the persistent GitHub API response cache (disabled by default)",
+    )
+    parser.add_argument(
+        "--backend",
+        choices=("rest", "graphql"),
+        default="rest",
+        help="API used to list repositories; graphql skips archived repositories on the server (default: rest)",
+    )
+    parser.add_argument(
+        "--from-snapshot",
+        type=Path,
+        help="Render from an organization snapshot written by snapshot-org instead of listing repositories on GitHub",
+    )
     parser.add_argument(
         "--dry-run",
         action="store_true",
         help="Print the generated markdown instead of writing the file",
     )
+    parser.add_argument(
+        "--check",
+        action="store_true",
+        help="Probe GitHub first and only regenerate if repositories, custom properties, the config or the template changed since the last --check run",
+    )
+    parser.add_argument(
+        "--state-file",
+        type=Path,
+        default=DEFAULT_STATE_FILE,
+        help=f"Where --check keeps the state of the last render (default: {DEFAULT_STATE_FILE})",
+    )
+    parser.add_argument(
+        "--section-cache",
+        type=Path,
+        default=DEFAULT_SECTION_CACHE,
+        help=f"Where rendered category sections are kept for reuse by the next run (default: {DEFAULT_SECTION_CACHE})",
+    )
+    parser.add_argument(
+        "--unchanged-exit-code",
+        type=int,
+        default=0,
+        help="Exit status when the README was not rewritten because nothing changed (default: 0)",
+    )
     return parser
 
 
 def main() -> int:
     args = build_parser().parse_args()
-    try:
-        from github import Auth, Github
-    except ModuleNotFoundError as exc:
-        raise SystemExit(
-            "Missing PyGithub. Install project dependencies before running the generator."
-        ) from exc
-
-    print_status("Resolving GitHub token")
-    token = resolve_github_token(args.token_env)
-    if not token:
-        message = f"Missing GitHub token. Set {args.token_env} or authenticate with `gh auth login`."
+    if args.check and args.from_snapshot is not None:
+        message = "--check probes GitHub and cannot be combined with --from-snapshot."
         raise SystemExit(message)
-
-    print_status(f"Connecting to GitHub organization {args.org}")
-    github = Github(auth=Auth.Token(token), lazy=True)
-    organization = github.get_organization(args.org)
-    print_status("Fetching repositories and custom properties")
-    repos = fetch_repositories(organization)
-    print_status(f"Loaded {len(repos)} repositories")
     print_status(f"Loading README config from {describe_config_source(args.config)}")
     config = load_config(args.config)
     print_status("Loading README template")
     template = load_template(args.template)
+
+    source_state: SourceState | None = None
+    if args.from_snapshot is not None:
+        repos = load_repositories_from_snapshot(args.from_snapshot, args.org)
+    else:
+        with connect_to_github(args) as client:
+            if args.check:
+                print_status("Probing for changes since the last render")
+                source_state = probe_source_state(
+                    client,
+                    args.org,
+                    inputs_fingerprint=content_fingerprint(
+                        f"{args.org}\n{config!r}\n{template}"
+                    ),
+                )
+                if source_state == load_source_state(args.state_file):
+                    print_status("Nothing changed since the last render")
+                    return args.unchanged_exit_code
+            repos = load_repositories_from_github(client, args)
     print_status("Rendering README")
+    section_cache = load_section_cache(args.section_cache)
     markdown = render_readme(
         repos,
         template=template,
         config=config,
         org_name=args.org,
+        section_cache=section_cache,
+    )
+    print_status(
+        f"Reused {section_cache.hits} cached sections, rendered {section_cache.misses}"
     )
 
     if args.dry_run:
@@ -187,10 +275,76 @@ def main() -> int:
         print(markdown)
         return 0
 
-    print_status(f"Writing {args.output}")
-    args.output.write_text(markdown, encoding="utf-8")
+    exit_code = 0
+    if output_is_current(
+        args.output, markdown, volatile=compile_template(template).volatile_pattern
+    ):
+        print_status(f"{args.output} is unchanged, not rewriting it")
+        exit_code = args.unchanged_exit_code
+    else:
+        print_status(f"Writing {args.output}")
+        args.output.write_text(markdown, encoding="utf-8")
+    save_section_cache(args.section_cache, section_cache)
+    if source_state is not None:
+        save_source_state(args.state_file, source_state)
     print_status("README generation complete")
-    return 0
+    return exit_code
+
+
+def connect_to_github(args: argparse.Namespace) -> GitHubClient:
+    from profile_readme_generator.github_api import GitHubClient
+    from profile_readme_generator.http_cache import ResponseCache
+    from profile_readme_generator.ratelimit import RequestScheduler
+
+    print_status("Resolving GitHub token")
+    token = resolve_github_token(args.token_env)
+    if not token:
+        message = f"Missing GitHub token. Set {args.token_env} or authenticate with `gh auth login`."
+        raise SystemExit(message)
+
+    print_status(f"Connecting to GitHub organization {args.org}")
+    cache = ResponseCache(args.cache_dir) if args.cache_dir is not None else None
+    scheduler = RequestScheduler(notify=print_status)
+    return GitHubClient(token, cache=cache, scheduler=scheduler)
+
+
+def load_repositories_from_github(
+    client: GitHubClient, args: argparse.Namespace
+) -> list[RepoEntry]:
+    from profile_readme_generator.github_api import (
+        GraphQLOrganizationClient,
+        OrganizationClient,
+    )
+
+    organization = (
+        GraphQLOrganizationClient(client, args.org)
+        if args.backend == "graphql"
+        else OrganizationClient(client, args.org)
+    )
+    print_status("Fetching repositories and custom properties")
+    repos = fetch_repositories(organization)
+    print_status(
+        f"Loaded {len(repos)} repositories with {client.requests_sent} requests"
+        f" ({client.not_modified} not modified)"
+    )
+    return repos
+
+
+def load_repositories_from_snapshot(snapshot_path: Path, org: str) -> list[RepoEntry]:
+    from profile_readme_generator.snapshot import SnapshotOrganization, load_snapshot
+
+    print_status(f"Loading repositories from snapshot {snapshot_path}")
+    snapshot = load_snapshot(snapshot_path)
+    if snapshot.org != org:
+        message = (
+            f"Snapshot {snapshot_path} is of organization {snapshot.org}, not {org}."
+        )
+        raise SystemExit(message)
+    repos = fetch_repositories(SnapshotOrganization(snapshot))
+    print_status(
+        f"Loaded {len(repos)} repositories from a snapshot of {snapshot.created_at}"
+    )
+    return repos
 
 
 def resolve_github_token(token_env: str) -> str | None:
@@ -215,14 +369,21 @@ def get_gh_auth_token() -> str | None:
     return token or None
 
 
-def fetch_repositories(organization: Organization) -> list[RepoEntry]:
-    print_status("Loading repository descriptions")
-    descriptions_by_name = fetch_repository_descriptions(organization)
-    print_status("Loading repository custom properties in bulk")
+def fetch_repositories(
+    organization: OrganizationListings,
+) -> list[RepoEntry]:
+    print_status("Loading repository descriptions and custom properties concurrently")
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        descriptions = executor.submit(fetch_repository_descriptions, organization)
+        property_values = executor.submit(
+            lambda: list(organization.list_custom_property_values())
+        )
+        descriptions_by_name = descriptions.result()
+        all_repository_properties = property_values.result()
     active_repository_names = set(descriptions_by_name)
 
     repos_by_name: dict[str, RepoEntry] = {}
-    for repository_properties in organization.list_custom_property_values():
+    for repository_properties in all_repository_properties:
         if repository_properties.repository_name not in active_repository_names:
             continue
         repo_entry = build_repo_entry(
@@ -248,7 +409,9 @@ def fetch_repositories(organization: Organization) -> list[RepoEntry]:
     return sorted(repos_by_name.values(), key=lambda repo: repo.name.casefold())
 
 
-def fetch_repository_descriptions(organization: Organization) -> dict[str, str | None]:
+def fetch_repository_descriptions(
+    organization: OrganizationListings,
+) -> dict[str, str | None]:
     descriptions_by_name: dict[str, str | None] = {}
     for repository in organization.get_repos():
         if repository.archived:
@@ -276,13 +439,16 @@ def build_repo_entry(
 
 
 def load_template(template_path: Path | None) -> str:
-    if template_path is not None:
-        return template_path.read_text(encoding="utf-8")
-    return (
-        files("profile_readme_generator")
+    template = (
+        template_path.read_text(encoding="utf-8")
+        if template_path is not None
+        else files("profile_readme_generator")
         .joinpath("templates/profile_readme.md")
         .read_text(encoding="utf-8")
     )
+    # Rejects unknown placeholders before anything is fetched; renders reuse it.
+    compile_template(template)
+    return template
 
 
 def load_config(config_path: Path | None) -> ReadmeConfig:
@@ -405,14 +571,23 @@ def normalize_group_name(value: str | list[str] | None, fallback: str) -> str:
 
 
 def group_repositories(
-    repos: list[RepoEntry],
+    repos: Iterable[RepoEntry],
     config: ReadmeConfig | None = None,
+    *,
+    config_index: ConfigIndex | None = None,
 ) -> GroupedRepos:
+    """Group ``repos`` by category and subcategory, in README order.
+
+    One pass groups the entries; each group is then sorted on its own, which
+    casefolds every name once. The sorts are stable, so entries, subcategories
+    and categories with equal keys keep their input order.
+    """
     grouped: GroupedRepos = defaultdict(lambda: defaultdict(list))
     for repo in repos:
         grouped[repo.category][repo.subcategory].append(repo)
 
-    config_index = ConfigIndex.from_config(config)
+    if config_index is None:
+        config_index = config_index_for(config)
 
     return {
         category: {
@@ -424,42 +599,216 @@ def group_repositories(
         }
         for category, subcategories in sorted(
             grouped.items(),
-            key=lambda item: (
-                config_index.category_positions.get(
-                    item[0].casefold(),
-                    len(config_index.category_positions),
-                ),
-                item[0].casefold(),
-            ),
+            key=lambda item: category_sort_key(item[0], config_index),
         )
     }
 
 
+def category_sort_key(category: str, config_index: ConfigIndex) -> tuple[int, str]:
+    """Configured categories first, in config order; the rest alphabetically."""
+    return (
+        config_index.category_positions.get(
+            category.casefold(),
+            len(config_index.category_positions),
+        ),
+        category.casefold(),
+    )
+
+
 def render_readme(
     repos: list[RepoEntry],
     template: str,
     config: ReadmeConfig | None = None,
     org_name: str = DEFAULT_ORG,
+    section_cache: SectionCache | None = None,
+    generated_at: datetime | None = None,
 ) -> str:
-    grouped = group_repositories(repos, config=config)
-    config_index = ConfigIndex.from_config(config)
-    lines: list[str] = []
+    """Render the README; with ``section_cache``, unchanged sections are reused."""
+    return "".join(
+        iter_render_readme(
+            repos,
+            template=template,
+            config=config,
+            org_name=org_name,
+            section_cache=section_cache,
+            generated_at=generated_at,
+        )
+    )
 
-    for index, (category, subcategories) in enumerate(grouped.items()):
-        if index > 0:
-            lines.extend(("---", ""))
-        lines.extend(
-            render_category_section(
+
+def render_readme_to(
+    stream: TextIO,
+    repos: list[RepoEntry],
+    template: str,
+    config: ReadmeConfig | None = None,
+    org_name: str = DEFAULT_ORG,
+    section_cache: SectionCache | None = None,
+    generated_at: datetime | None = None,
+) -> None:
+    """Write the README to ``stream`` one category section at a time."""
+    for chunk in iter_render_readme(
+        repos,
+        template=template,
+        config=config,
+        org_name=org_name,
+        section_cache=section_cache,
+        generated_at=generated_at,
+    ):
+        stream.write(chunk)
+
+
+def iter_render_readme(
+    repos: list[RepoEntry],
+    template: str,
+    config: ReadmeConfig | None = None,
+    org_name: str = DEFAULT_ORG,
+    section_cache: SectionCache | None = None,
+    generated_at: datetime | None = None,
+) -> Iterator[str]:
+    """Yield the README in pieces; joined, they are exactly :func:`render_readme`.
+
+    Each category section is rendered when it is reached, so only one section
+    is held at a time besides the grouped entries.
+    """
+    config_index = config_index_for(config)
+    grouped = group_repositories(repos, config_index=config_index)
+
+    def render_section(category: str) -> list[str]:
+        subcategories = grouped[category]
+        return cached_section(
+            section_cache,
+            (
+                "category",
+                org_name,
+                category,
+                config_index.category_entries(category),
+                [
+                    [subcategory, entries_key(entries)]
+                    for subcategory, entries in subcategories.items()
+                ],
+            ),
+            partial(
+                render_category_section,
                 category=category,
                 subcategories=subcategories,
                 config_index=config_index,
                 org_name=org_name,
-            )
+                section_cache=section_cache,
+            ),
+        )
+
+    return iter_category_sections(
+        template,
+        list(grouped),
+        render_section,
+        repo_count=len(repos),
+        generated_at=generated_at,
+    )
+
+
+def cached_section(
+    section_cache: SectionCache | None,
+    key_parts: tuple[object, ...],
+    render: Callable[[], list[str]],
+) -> list[str]:
+    if section_cache is None:
+        return render()
+    return section_cache.get(section_key(section_renderer(), *key_parts), render)
+
+
+@lru_cache(maxsize=1)
+def section_renderer() -> str:
+    return renderer_fingerprint(
+        (
+            render_category_section,
+            render_general_subcategory_table,
+            render_subcategory_section,
+            render_repo_table,
+            render_repo_row,
+            escape_markdown_table_cell,
+        )
+    )
+
+
+def entries_key(entries: list[RepoEntry]) -> list[tuple[str, str]]:
+    return [(entry.name, entry.description) for entry in entries]
+
+
+def join_category_sections(
+    template: str,
+    categories: Sequence[str],
+    render_section: Callable[[str], list[str]],
+    *,
+    repo_count: int,
+    generated_at: datetime | None = None,
+) -> str:
+    """Fill the template with rendered category sections, in order."""
+    return "".join(
+        iter_category_sections(
+            template,
+            categories,
+            render_section,
+            repo_count=repo_count,
+            generated_at=generated_at,
         )
+    )
 
-    repo_sections = "\n".join(lines).rstrip()
-    markdown = template.replace("{{ repo_sections }}", repo_sections)
-    return markdown.rstrip() + "\n"
+
+def iter_category_sections(
+    template: str,
+    categories: Sequence[str],
+    render_section: Callable[[str], list[str]],
+    *,
+    repo_count: int,
+    generated_at: datetime | None = None,
+) -> Iterator[str]:
+    """Yield the template filled in piece by piece.
+
+    ``categories`` are in README order; ``render_section`` renders one of them
+    when its slot is reached. ``{{ repo_sections }}`` lists the categories that
+    no ``{{ category_section: ... }}`` slot places on its own, separated by
+    ``---``. ``generated_at`` defaults to the current time.
+    """
+    compiled = compile_template(template)
+    categories_by_key: dict[str, str] = {}
+    for category in categories:
+        categories_by_key.setdefault(category.casefold(), category)
+    placed = {
+        (slot.argument or "").casefold()
+        for slot in compiled.slots
+        if slot.name == "category_section"
+    }
+    timestamp = (generated_at or datetime.now(UTC)).isoformat(timespec="seconds")
+
+    def slot_text(slot: Slot) -> Iterable[str]:
+        if slot.name == "repo_sections":
+            return iter_section_text(
+                render_section(category)
+                for category in categories
+                if category.casefold() not in placed
+            )
+        if slot.name == "category_section":
+            category = categories_by_key.get((slot.argument or "").casefold())
+            if category is None:
+                return ()
+            return iter_section_text([render_section(category)])
+        if slot.name == "repo_count":
+            return (str(repo_count),)
+        return (timestamp,)
+
+    return compiled.fill(slot_text)
+
+
+def iter_section_text(sections: Iterable[list[str]]) -> Iterator[str]:
+    """Yield the lines of ``sections``, joined by newlines, one section at a time."""
+    first = True
+    for index, section in enumerate(sections):
+        lines = section if index == 0 else ["---", "", *section]
+        if not lines:
+            continue
+        chunk = "\n".join(lines)
+        yield chunk if first else "\n" + chunk
+        first = False
 
 
 def render_category_section(
@@ -468,6 +817,7 @@ def render_category_section(
     subcategories: dict[str, list[RepoEntry]],
     config_index: ConfigIndex,
     org_name: str,
+    section_cache: SectionCache | None = None,
 ) -> list[str]:
     canonical_category = config_index.canonical_category_name(category)
     lines = [f"### {canonical_category}", ""]
@@ -489,12 +839,29 @@ def render_category_section(
 
     for subcategory, entries in subcategories.items():
         lines.extend(
-            render_subcategory_section(
-                category=canonical_category,
-                subcategory=subcategory,
-                entries=entries,
-                config_index=config_index,
-                org_name=org_name,
+            cached_section(
+                section_cache,
+                (
+                    "subcategory",
+                    org_name,
+                    canonical_category,
+                    subcategory,
+                    config_index.canonical_subcategory_name(
+                        canonical_category, subcategory
+                    ),
+                    config_index.subcategory_description(
+                        canonical_category, subcategory
+                    ),
+                    entries_key(entries),
+                ),
+                partial(
+                    render_subcategory_section,
+                    category=canonical_category,
+                    subcategory=subcategory,
+                    entries=entries,
+                    config_index=config_index,
+                    org_name=org_name,
+                ),
             )
         )
 
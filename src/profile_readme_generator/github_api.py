@@ -0,0 +1,495 @@
+"""Minimal GitHub REST and GraphQL client used by the profile tools."""
+
+from __future__ import annotations
+
+import gzip
+import hashlib
+import http.client
+import json
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Self, cast
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from profile_readme_generator.listings import (
+    RepositoryPropertyValues,
+    RepositorySummary,
+)
+from profile_readme_generator.ratelimit import RequestScheduler, resource_for_path
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterator, Mapping
+
+    from profile_readme_generator.http_cache import ResponseCache
+
+DEFAULT_API_URL = "https://api.github.com"
+DEFAULT_TIMEOUT_SECONDS = 30.0
+DEFAULT_PER_PAGE = 100
+DEFAULT_PAGE_WORKERS = 4
+GRAPHQL_PAGE_SIZE = 100
+API_VERSION = "2022-11-28"
+USER_AGENT = "eclipse-score-profile-tools"
+CACHED_HEADERS = ("content-type", "link")
+
+LINK_PATTERN = re.compile(r'<([^>]+)>;\s*rel="([^"]+)"')
+PAGE_PATTERN = re.compile(r"[?&]page=(\d+)")
+
+# An organization defines at most 100 custom properties, so one page holds them all.
+ACTIVE_REPOSITORIES_QUERY = """
+query($org: String!, $first: Int!, $after: String) {
+  organization(login: $org) {
+    repositories(first: $first, after: $after, isArchived: false) {
+      pageInfo { hasNextPage endCursor }
+      nodes {
+        name
+        description
+        repositoryCustomPropertyValues(first: 100) {
+          nodes { propertyName value }
+        }
+      }
+    }
+  }
+}
+"""
+
+
+class GitHubApiError(RuntimeError):
+    def __init__(self, status: int, url: str, message: str) -> None:
+        super().__init__(f"GitHub API request to {url} failed with {status}: {message}")
+        self.status = status
+        self.url = url
+        self.message = message
+
+
+@dataclass(frozen=True, slots=True)
+class ApiResponse:
+    status: int
+    headers: dict[str, str]
+    body: bytes
+    from_cache: bool = False
+
+    def json(self) -> Any:
+        return json.loads(self.body) if self.body else None
+
+    def links(self) -> dict[str, str]:
+        return parse_link_header(self.headers.get("link", ""))
+
+    def per_page_one_count(self) -> int:
+        """Count the items of a list endpoint from its ``per_page=1`` response."""
+        last_url = self.links().get("last")
+        if last_url is not None:
+            match = PAGE_PATTERN.search(last_url)
+            if match is not None:
+                return int(match.group(1))
+        return len(self.json())
+
+
+class GitHubClient:
+    """Thread-safe GitHub API client with persistent connections and an optional response cache.
+
+    Every thread keeps its own keep-alive connection, and every request passes
+    through ``scheduler`` for pacing and rate-limit handling. ``GET`` requests
+    are sent as conditional requests when ``cache`` holds a validator for the
+    URL, and ``304 Not Modified`` answers are served from the cache.
+    """
+
+    def __init__(
+        self,
+        token: str | None,
+        *,
+        api_url: str = DEFAULT_API_URL,
+        cache: ResponseCache | None = None,
+        scheduler: RequestScheduler | None = None,
+        timeout: float = DEFAULT_TIMEOUT_SECONDS,
+    ) -> None:
+        parsed_url = urlsplit(api_url)
+        self.host = parsed_url.netloc
+        self._connection_class = (
+            http.client.HTTPConnection
+            if parsed_url.scheme == "http"
+            else http.client.HTTPSConnection
+        )
+        self.base_path = parsed_url.path.rstrip("/")
+        self.cache = cache
+        self.scheduler = scheduler or RequestScheduler()
+        self.timeout = timeout
+        self.requests_sent = 0
+        self.not_modified = 0
+        self._token = token
+        self._identity = (
+            hashlib.sha256(token.encode("utf-8")).hexdigest()[:16] if token else ""
+        )
+        self._local = threading.local()
+        self._connections: list[http.client.HTTPConnection] = []
+        self._lock = threading.Lock()
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        with self._lock:
+            for connection in self._connections:
+                connection.close()
+            self._connections.clear()
+        if self.cache is not None:
+            self.cache.save()
+
+    def request(
+        self,
+        method: str,
+        url: str,
+        *,
+        params: Mapping[str, str | int] | None = None,
+        json_body: object = None,
+        headers: Mapping[str, str] | None = None,
+    ) -> ApiResponse:
+        """Send one request and raise :class:`GitHubApiError` for error statuses."""
+        path = self._path_for(url, params)
+        request_headers = {
+            "Accept": "application/vnd.github+json",
+            "Accept-Encoding": "gzip",
+            "User-Agent": USER_AGENT,
+            "X-GitHub-Api-Version": API_VERSION,
+        }
+        if self._token:
+            request_headers["Authorization"] = f"Bearer {self._token}"
+        request_headers.update(headers or {})
+
+        cache_key = None
+        cached = None
+        if method == "GET" and self.cache is not None:
+            cache_key = self.cache.key_for(
+                self._identity, path, request_headers["Accept"]
+            )
+            cached = self.cache.get(cache_key)
+            if cached is not None and cached.etag:
+                request_headers["If-None-Match"] = cached.etag
+            elif cached is not None and cached.last_modified:
+                request_headers["If-Modified-Since"] = cached.last_modified
+
+        body = None if json_body is None else json.dumps(json_body).encode("utf-8")
+        status, response_headers, response_body = self.scheduler.run(
+            resource_for_path(path.removeprefix(self.base_path)),
+            lambda: self._send(method, path, body, request_headers),
+        )
+
+        if status == http.client.NOT_MODIFIED and cached is not None:
+            assert cache_key is not None
+            assert self.cache is not None
+            self.cache.mark_validated(cache_key)
+            self.not_modified += 1
+            return ApiResponse(
+                status=http.client.OK,
+                headers={**cached.headers, **response_headers},
+                body=cached.body,
+                from_cache=True,
+            )
+
+        if status >= 400:
+            raise GitHubApiError(status, path, error_message(response_body))
+
+        if cache_key is not None and status == http.client.OK:
+            assert self.cache is not None
+            self.cache.put(
+                cache_key,
+                url=path,
+                body=response_body,
+                headers={
+                    name: response_headers[name]
+                    for name in CACHED_HEADERS
+                    if name in response_headers
+                },
+                etag=response_headers.get("etag"),
+                last_modified=response_headers.get("last-modified"),
+            )
+        return ApiResponse(status=status, headers=response_headers, body=response_body)
+
+    def get_json(self, url: str, params: Mapping[str, str | int] | None = None) -> Any:
+        return self.request("GET", url, params=params).json()
+
+    def paginate(
+        self,
+        url: str,
+        params: Mapping[str, str | int] | None = None,
+        *,
+        workers: int = 1,
+        project: Callable[[Any], Any] | None = None,
+    ) -> Iterator[Any]:
+        """Yield the items of every page of a list endpoint, in page order.
+
+        With ``workers`` above one, the pages after the first are requested
+        concurrently once the first page's ``Link: rel="last"`` tells how many
+        there are. Otherwise ``Link: rel="next"`` is followed page by page.
+
+        ``project`` maps every decoded item to the value that is yielded. It
+        runs as soon as a page is decoded, so only the projected values of
+        pages fetched ahead are kept, not their full JSON objects.
+        """
+        response = self.request(
+            "GET", url, params={"per_page": DEFAULT_PER_PAGE, **(params or {})}
+        )
+        yield from project_items(response.json(), project)
+        links = response.links()
+
+        remaining_urls = (
+            following_page_urls(links["last"])
+            if workers > 1 and "last" in links
+            else []
+        )
+        if remaining_urls:
+            with ThreadPoolExecutor(
+                max_workers=min(workers, len(remaining_urls))
+            ) as executor:
+                for items in executor.map(
+                    lambda page_url: project_items(self.get_json(page_url), project),
+                    remaining_urls,
+                ):
+                    yield from items
+            return
+
+        next_url = links.get("next")
+        while next_url is not None:
+            response = self.request("GET", next_url)
+            yield from project_items(response.json(), project)
+            next_url = response.links().get("next")
+
+    def count(self, url: str, params: Mapping[str, str | int] | None = None) -> int:
+        """Count the items of a list endpoint with a single ``per_page=1`` request."""
+        response = self.request("GET", url, params={**(params or {}), "per_page": 1})
+        return response.per_page_one_count()
+
+    def graphql(self, query: str, variables: Mapping[str, object]) -> Any:
+        response = self.request(
+            "POST",
+            "/graphql",
+            json_body={"query": query, "variables": dict(variables)},
+        ).json()
+        if response.get("errors"):
+            messages = "; ".join(
+                error.get("message", "") for error in response["errors"]
+            )
+            raise GitHubApiError(http.client.OK, "/graphql", messages)
+        return response["data"]
+
+    def _path_for(self, url: str, params: Mapping[str, str | int] | None) -> str:
+        parsed_url = urlsplit(url)
+        if parsed_url.netloc and parsed_url.netloc != self.host:
+            raise ValueError(
+                f"Refusing to send GitHub credentials to {parsed_url.netloc}"
+            )
+        path = (
+            parsed_url.path
+            if parsed_url.netloc
+            else f"{self.base_path}{parsed_url.path}"
+        )
+        query = parsed_url.query
+        if params:
+            encoded_params = urlencode(params)
+            query = f"{query}&{encoded_params}" if query else encoded_params
+        return f"{path}?{query}" if query else path
+
+    def _send(
+        self,
+        method: str,
+        path: str,
+        body: bytes | None,
+        headers: dict[str, str],
+    ) -> tuple[int, dict[str, str], bytes]:
+        for attempt in range(2):
+            connection, reused = self._connection()
+            try:
+                connection.request(method, path, body=body, headers=headers)
+                response = connection.getresponse()
+                response_body = response.read()
+            except (http.client.HTTPException, OSError):
+                self._drop_connection()
+                # A kept-alive connection may have been closed by the server.
+                if reused and attempt == 0:
+                    continue
+                raise
+            with self._lock:
+                self.requests_sent += 1
+            response_headers = {
+                name.lower(): value for name, value in response.getheaders()
+            }
+            if response_headers.get("content-encoding") == "gzip":
+                response_body = gzip.decompress(response_body)
+            if response.will_close:
+                self._drop_connection()
+            return response.status, response_headers, response_body
+        raise AssertionError("unreachable")
+
+    def _connection(self) -> tuple[http.client.HTTPConnection, bool]:
+        connection = getattr(self._local, "connection", None)
+        if connection is not None:
+            return connection, True
+        connection = self._connection_class(self.host, timeout=self.timeout)
+        self._local.connection = connection
+        with self._lock:
+            self._connections.append(connection)
+        return connection, False
+
+    def _drop_connection(self) -> None:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            return
+        connection.close()
+        self._local.connection = None
+        with self._lock:
+            if connection in self._connections:
+                self._connections.remove(connection)
+
+
+class OrganizationClient:
+    """Organization listings used by the README generator."""
+
+    def __init__(
+        self,
+        client: GitHubClient,
+        org: str,
+        *,
+        page_workers: int = DEFAULT_PAGE_WORKERS,
+    ) -> None:
+        self.client = client
+        self.org = org
+        self.page_workers = page_workers
+
+    def get_repos(self) -> Iterator[RepositorySummary]:
+        return self.client.paginate(
+            f"/orgs/{self.org}/repos",
+            workers=self.page_workers,
+            project=repository_summary,
+        )
+
+    def list_custom_property_values(self) -> Iterator[RepositoryPropertyValues]:
+        return self.client.paginate(
+            f"/orgs/{self.org}/properties/values",
+            workers=self.page_workers,
+            project=repository_property_values,
+        )
+
+
+class GraphQLOrganizationClient:
+    """Organization listings from one paged GraphQL query that skips archived repositories.
+
+    Both listings are served from the same query, which runs once, on first use.
+    """
+
+    def __init__(
+        self,
+        client: GitHubClient,
+        org: str,
+        *,
+        page_size: int = GRAPHQL_PAGE_SIZE,
+    ) -> None:
+        self.client = client
+        self.org = org
+        self.page_size = page_size
+        self._lock = threading.Lock()
+        self._repositories: (
+            list[tuple[RepositorySummary, RepositoryPropertyValues]] | None
+        ) = None
+
+    def get_repos(self) -> Iterator[RepositorySummary]:
+        for summary, _ in self._active_repositories():
+            yield summary
+
+    def list_custom_property_values(self) -> Iterator[RepositoryPropertyValues]:
+        for _, property_values in self._active_repositories():
+            if property_values.properties:
+                yield property_values
+
+    def _active_repositories(
+        self,
+    ) -> list[tuple[RepositorySummary, RepositoryPropertyValues]]:
+        with self._lock:
+            if self._repositories is None:
+                self._repositories = list(self._fetch())
+            return self._repositories
+
+    def _fetch(self) -> Iterator[tuple[RepositorySummary, RepositoryPropertyValues]]:
+        after: str | None = None
+        while True:
+            data = self.client.graphql(
+                ACTIVE_REPOSITORIES_QUERY,
+                {"org": self.org, "first": self.page_size, "after": after},
+            )
+            repositories = data["organization"]["repositories"]
+            for node in repositories["nodes"]:
+                yield (
+                    RepositorySummary(
+                        name=node["name"],
+                        description=node.get("description"),
+                        archived=False,
+                    ),
+                    RepositoryPropertyValues(
+                        repository_name=node["name"],
+                        properties={
+                            item["propertyName"]: item.get("value")
+                            for item in node["repositoryCustomPropertyValues"]["nodes"]
+                        },
+                    ),
+                )
+            if not repositories["pageInfo"]["hasNextPage"]:
+                return
+            after = repositories["pageInfo"]["endCursor"]
+
+
+def repository_summary(repository: dict[str, Any]) -> RepositorySummary:
+    return RepositorySummary(
+        name=repository["name"],
+        description=repository.get("description"),
+        archived=bool(repository.get("archived")),
+    )
+
+
+def repository_property_values(repository: dict[str, Any]) -> RepositoryPropertyValues:
+    return RepositoryPropertyValues(
+        repository_name=repository["repository_name"],
+        properties={
+            item["property_name"]: item.get("value")
+            for item in repository.get("properties", [])
+        },
+    )
+
+
+def project_items(items: list[Any], project: Callable[[Any], Any] | None) -> list[Any]:
+    return items if project is None else [project(item) for item in items]
+
+
+def parse_link_header(header: str) -> dict[str, str]:
+    return {rel: url for url, rel in LINK_PATTERN.findall(header)}
+
+
+def following_page_urls(last_url: str) -> list[str]:
+    """Return the URLs of pages 2 to N, given the URL of page N."""
+    parsed_url = urlsplit(last_url)
+    query = parse_qsl(parsed_url.query)
+    last_page = next((int(value) for name, value in query if name == "page"), 1)
+    return [
+        urlunsplit(
+            parsed_url._replace(
+                query=urlencode(
+                    [(name, page if name == "page" else value) for name, value in query]
+                )
+            )
+        )
+        for page in range(2, last_page + 1)
+    ]
+
+
+def error_message(body: bytes) -> str:
+    try:
+        payload = json.loads(body)
+    except ValueError:
+        return body.decode("utf-8", errors="replace").strip()
+    if isinstance(payload, dict):
+        message = cast("dict[str, object]", payload).get("message")
+        if isinstance(message, str):
+            return message
+    return str(payload)
@@ -0,0 +1,89 @@
+"""SQLite time series of per-repository metrics."""
+
+from __future__ import annotations
+
+import sqlite3
+from dataclasses import astuple, dataclass, fields
+from typing import TYPE_CHECKING, Self
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+    from pathlib import Path
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS samples (
+    repo TEXT NOT NULL,
+    date TEXT NOT NULL,
+    open_issues INTEGER NOT NULL,
+    open_prs INTEGER NOT NULL,
+    stars INTEGER NOT NULL,
+    forks INTEGER NOT NULL,
+    latest_release TEXT,
+    PRIMARY KEY (repo, date)
+) WITHOUT ROWID
+"""
+
+
+@dataclass(frozen=True, slots=True)
+class MetricsSample:
+    repo: str
+    date: str
+    open_issues: int
+    open_prs: int
+    stars: int
+    forks: int
+    latest_release: str | None
+
+
+SAMPLE_COLUMNS = ", ".join(field.name for field in fields(MetricsSample))
+
+
+class MetricsHistory:
+    """One sample per repository and day, keyed by ``(repo, date)``.
+
+    Dates are ISO ``YYYY-MM-DD`` strings, so they sort chronologically.
+    Recording a day twice replaces that day's samples.
+    """
+
+    def __init__(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._connection = sqlite3.connect(path)
+        self._connection.execute(SCHEMA)
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._connection.close()
+
+    def record(self, samples: Iterable[MetricsSample]) -> None:
+        with self._connection:
+            self._connection.executemany(
+                f"INSERT OR REPLACE INTO samples ({SAMPLE_COLUMNS})"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (astuple(sample) for sample in samples),
+            )
+
+    def samples_as_of(
+        self, date: str, not_before: str = ""
+    ) -> dict[str, MetricsSample]:
+        """Return the most recent sample at or before ``date`` of every repository.
+
+        Repositories whose most recent such sample is older than
+        ``not_before`` are left out.
+        """
+        rows = self._connection.execute(
+            f"""
+            SELECT {SAMPLE_COLUMNS} FROM samples
+            JOIN (
+                SELECT repo, MAX(date) AS date FROM samples
+                WHERE date <= ? GROUP BY repo
+            ) USING (repo, date)
+            WHERE date >= ?
+            """,
+            (date, not_before),
+        )
+        return {row[0]: MetricsSample(*row) for row in rows}
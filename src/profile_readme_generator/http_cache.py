@@ -0,0 +1,187 @@
+"""On-disk HTTP response cache for conditional GitHub API requests."""
+
+from __future__ import annotations
+
+import contextlib
+import hashlib
+import json
+import os
+import threading
+import time
+from dataclasses import asdict, dataclass
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+DEFAULT_TTL_SECONDS = 7 * 24 * 60 * 60
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+INDEX_FILE_NAME = "index.json"
+INDEX_VERSION = 1
+
+
+@dataclass(frozen=True, slots=True)
+class CachedResponse:
+    body: bytes
+    headers: dict[str, str]
+    etag: str | None
+    last_modified: str | None
+
+
+@dataclass(slots=True)
+class CacheEntry:
+    url: str
+    etag: str | None
+    last_modified: str | None
+    headers: dict[str, str]
+    size: int
+    validated_at: float
+    accessed_at: float
+
+
+class ResponseCache:
+    """Response bodies keyed by request, with the validators needed to revalidate them.
+
+    Entries are revalidated with ``If-None-Match``/``If-Modified-Since`` on every
+    use. Entries that were not validated within ``ttl_seconds`` are dropped, and
+    the least recently used entries are evicted once the bodies exceed
+    ``max_bytes``. Everything lives below ``directory``, so a CI cache step can
+    restore it between runs.
+    """
+
+    def __init__(
+        self,
+        directory: Path,
+        *,
+        ttl_seconds: float = DEFAULT_TTL_SECONDS,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+    ) -> None:
+        self.directory = directory
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries = self._load_index()
+
+    @staticmethod
+    def key_for(*parts: str) -> str:
+        return hashlib.sha256("\0".join(parts).encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> CachedResponse | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if time.time() - entry.validated_at > self.ttl_seconds:
+                self._remove(key)
+                return None
+            try:
+                body = self._body_path(key).read_bytes()
+            except FileNotFoundError:
+                del self._entries[key]
+                return None
+            entry.accessed_at = time.time()
+        return CachedResponse(
+            body=body,
+            headers=dict(entry.headers),
+            etag=entry.etag,
+            last_modified=entry.last_modified,
+        )
+
+    def put(
+        self,
+        key: str,
+        *,
+        url: str,
+        body: bytes,
+        headers: dict[str, str],
+        etag: str | None,
+        last_modified: str | None,
+    ) -> None:
+        if etag is None and last_modified is None:
+            return
+        now = time.time()
+        body_path = self._body_path(key)
+        body_path.parent.mkdir(parents=True, exist_ok=True)
+        temporary_path = body_path.with_name(
+            f"{body_path.name}.{threading.get_ident()}.tmp"
+        )
+        temporary_path.write_bytes(body)
+        with self._lock:
+            os.replace(temporary_path, body_path)
+            self._entries[key] = CacheEntry(
+                url=url,
+                etag=etag,
+                last_modified=last_modified,
+                headers=dict(headers),
+                size=len(body),
+                validated_at=now,
+                accessed_at=now,
+            )
+
+    def mark_validated(self, key: str) -> None:
+        """Record that the server answered ``304 Not Modified`` for ``key``."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry.validated_at = entry.accessed_at = time.time()
+
+    def save(self) -> None:
+        """Evict expired and least recently used entries and write the index."""
+        with self._lock:
+            self._evict()
+            self.directory.mkdir(parents=True, exist_ok=True)
+            index_path = self.directory / INDEX_FILE_NAME
+            temporary_path = index_path.with_name(f"{INDEX_FILE_NAME}.tmp")
+            temporary_path.write_text(
+                json.dumps(
+                    {
+                        "version": INDEX_VERSION,
+                        "entries": {
+                            key: asdict(entry) for key, entry in self._entries.items()
+                        },
+                    }
+                ),
+                encoding="utf-8",
+            )
+            os.replace(temporary_path, index_path)
+
+    def _evict(self) -> None:
+        now = time.time()
+        for key in [
+            key
+            for key, entry in self._entries.items()
+            if now - entry.validated_at > self.ttl_seconds
+        ]:
+            self._remove(key)
+
+        total_size = sum(entry.size for entry in self._entries.values())
+        for key, entry in sorted(
+            self._entries.items(),
+            key=lambda item: item[1].accessed_at,
+        ):
+            if total_size <= self.max_bytes:
+                break
+            total_size -= entry.size
+            self._remove(key)
+
+    def _remove(self, key: str) -> None:
+        self._entries.pop(key, None)
+        with contextlib.suppress(FileNotFoundError):
+            self._body_path(key).unlink()
+
+    def _body_path(self, key: str) -> Path:
+        return self.directory / "bodies" / key[:2] / key
+
+    def _load_index(self) -> dict[str, CacheEntry]:
+        try:
+            raw_index = json.loads(
+                (self.directory / INDEX_FILE_NAME).read_text(encoding="utf-8")
+            )
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+        if raw_index.get("version") != INDEX_VERSION:
+            return {}
+        return {
+            key: CacheEntry(**raw_entry)
+            for key, raw_entry in raw_index.get("entries", {}).items()
+        }
@@ -0,0 +1,33 @@
+"""Organization listing records shared by the API client and snapshots.
+
+Kept free of network imports so rendering from a snapshot stays offline.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Protocol
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+
+@dataclass(frozen=True, slots=True)
+class RepositorySummary:
+    name: str
+    description: str | None
+    archived: bool
+
+
+@dataclass(frozen=True, slots=True)
+class RepositoryPropertyValues:
+    repository_name: str
+    properties: dict[str, str | list[str] | None]
+
+
+class OrganizationListings(Protocol):
+    """The two listings the README generator reads, from the API or a snapshot."""
+
+    def get_repos(self) -> Iterable[RepositorySummary]: ...
+
+    def list_custom_property_values(self) -> Iterable[RepositoryPropertyValues]: ...
@@ -0,0 +1,266 @@
+"""Rate-limit-aware scheduling for GitHub API requests."""
+
+from __future__ import annotations
+
+import http.client
+import random
+import threading
+import time
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+RawResponse = tuple[int, dict[str, str], bytes]
+
+DEFAULT_REQUESTS_PER_SECOND = 15.0
+DEFAULT_BURST = 20
+DEFAULT_INITIAL_CONCURRENCY = 4
+DEFAULT_MAX_CONCURRENCY = 16
+DEFAULT_MAX_RETRIES = 6
+DEFAULT_TARGET_LATENCY_SECONDS = 3.0
+DEFAULT_QUOTA_RESERVE = 10
+BASE_DELAY_SECONDS = 1.0
+SECONDARY_LIMIT_DELAY_SECONDS = 60.0
+MAX_DELAY_SECONDS = 15 * 60.0
+RETRYABLE_STATUSES = frozenset({500, 502, 503, 504})
+
+
+@dataclass(slots=True)
+class QuotaState:
+    remaining: int | None = None
+    reset_at: float | None = None
+
+
+class TokenBucket:
+    """Allows ``rate`` acquisitions per second on average and up to ``capacity`` at once."""
+
+    def __init__(
+        self,
+        rate: float,
+        capacity: int,
+        *,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated_at = clock()
+        self._clock = clock
+        self._sleep = sleep
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        while True:
+            with self._lock:
+                now = self._clock()
+                self._tokens = min(
+                    self.capacity,
+                    self._tokens + (now - self._updated_at) * self.rate,
+                )
+                self._updated_at = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            self._sleep(wait)
+
+
+class AdaptiveConcurrencyLimiter:
+    """Additive-increase/multiplicative-decrease limit on requests in flight.
+
+    The limit grows by one after a full window of fast, successful requests,
+    shrinks by one when latency exceeds ``target_latency`` and is halved when
+    GitHub throttles or a request fails.
+    """
+
+    def __init__(
+        self,
+        *,
+        initial: int = DEFAULT_INITIAL_CONCURRENCY,
+        minimum: int = 1,
+        maximum: int = DEFAULT_MAX_CONCURRENCY,
+        target_latency: float = DEFAULT_TARGET_LATENCY_SECONDS,
+    ) -> None:
+        self.limit = max(minimum, min(initial, maximum))
+        self.minimum = minimum
+        self.maximum = maximum
+        self.target_latency = target_latency
+        self.in_flight = 0
+        self._successes = 0
+        self._condition = threading.Condition()
+
+    def acquire(self) -> None:
+        with self._condition:
+            while self.in_flight >= self.limit:
+                self._condition.wait()
+            self.in_flight += 1
+
+    def release(self, *, latency: float, throttled: bool) -> None:
+        with self._condition:
+            self.in_flight -= 1
+            if throttled:
+                self.limit = max(self.minimum, self.limit // 2)
+                self._successes = 0
+            elif latency > self.target_latency:
+                self.limit = max(self.minimum, self.limit - 1)
+                self._successes = 0
+            else:
+                self._successes += 1
+                if self._successes >= self.limit:
+                    self.limit = min(self.maximum, self.limit + 1)
+                    self._successes = 0
+            self._condition.notify_all()
+
+
+class RequestScheduler:
+    """Gate that every GitHub API request passes through.
+
+    Requests are paced by a token bucket and an adaptive concurrency limit.
+    The scheduler tracks ``X-RateLimit-Remaining``/``X-RateLimit-Reset`` per
+    rate-limit resource and waits for the reset instead of exhausting the
+    quota. Rate-limited (403/429) and transient (5xx, network) failures are
+    retried with exponential backoff and jitter, honouring ``Retry-After``.
+    """
+
+    def __init__(
+        self,
+        *,
+        requests_per_second: float = DEFAULT_REQUESTS_PER_SECOND,
+        burst: int = DEFAULT_BURST,
+        limiter: AdaptiveConcurrencyLimiter | None = None,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+        quota_reserve: int = DEFAULT_QUOTA_RESERVE,
+        notify: Callable[[str], None] | None = None,
+        clock: Callable[[], float] = time.monotonic,
+        wall_clock: Callable[[], float] = time.time,
+        sleep: Callable[[float], None] = time.sleep,
+        jitter: Callable[[], float] = random.random,
+    ) -> None:
+        self.bucket = TokenBucket(requests_per_second, burst, clock=clock, sleep=sleep)
+        self.limiter = limiter or AdaptiveConcurrencyLimiter()
+        self.max_retries = max_retries
+        self.quota_reserve = quota_reserve
+        self.retries = 0
+        self._notify = notify
+        self._clock = clock
+        self._wall_clock = wall_clock
+        self._sleep = sleep
+        self._jitter = jitter
+        self._quotas: dict[str, QuotaState] = {}
+        self._lock = threading.Lock()
+
+    def run(self, resource: str, send: Callable[[], RawResponse]) -> RawResponse:
+        """Call ``send`` once capacity is available, retrying throttled attempts."""
+        attempt = 0
+        while True:
+            self._wait_for_quota(resource)
+            self.bucket.acquire()
+            self.limiter.acquire()
+            started_at = self._clock()
+            try:
+                status, headers, body = send()
+            except (http.client.HTTPException, OSError) as exc:
+                self.limiter.release(latency=self._clock() - started_at, throttled=True)
+                if attempt >= self.max_retries:
+                    raise
+                delay = self._backoff(attempt, BASE_DELAY_SECONDS)
+                self._retry(f"{type(exc).__name__}: {exc}", delay)
+                attempt += 1
+                continue
+
+            self._record_quota(headers)
+            delay = self._retry_delay(status, headers, body, attempt)
+            self.limiter.release(
+                latency=self._clock() - started_at,
+                throttled=delay is not None,
+            )
+            if delay is None or attempt >= self.max_retries:
+                return status, headers, body
+            self._retry(f"HTTP {status}", delay)
+            attempt += 1
+
+    def quota(self, resource: str) -> QuotaState:
+        with self._lock:
+            state = self._quotas.get(resource, QuotaState())
+            return QuotaState(state.remaining, state.reset_at)
+
+    def _retry(self, reason: str, delay: float) -> None:
+        with self._lock:
+            self.retries += 1
+        if self._notify is not None:
+            self._notify(f"GitHub API {reason}; retrying in {delay:.1f}s")
+        self._sleep(delay)
+
+    def _wait_for_quota(self, resource: str) -> None:
+        with self._lock:
+            state = self._quotas.get(resource)
+            if (
+                state is None
+                or state.remaining is None
+                or state.reset_at is None
+                or state.remaining > self.quota_reserve
+            ):
+                return
+            reset_at = state.reset_at
+            delay = reset_at - self._wall_clock() + 1
+        if delay > 0:
+            if self._notify is not None:
+                self._notify(
+                    f"GitHub {resource} rate limit nearly exhausted;"
+                    f" waiting {delay:.0f}s for the reset"
+                )
+            self._sleep(delay)
+        with self._lock:
+            state = self._quotas.get(resource)
+            if state is not None and state.reset_at == reset_at:
+                # The quota is refilled after the reset; the next response corrects it.
+                state.remaining = None
+
+    def _record_quota(self, headers: dict[str, str]) -> None:
+        remaining = headers.get("x-ratelimit-remaining")
+        reset = headers.get("x-ratelimit-reset")
+        if remaining is None or reset is None:
+            return
+        resource = headers.get("x-ratelimit-resource", "core")
+        with self._lock:
+            self._quotas[resource] = QuotaState(int(remaining), float(reset))
+
+    def _retry_delay(
+        self,
+        status: int,
+        headers: dict[str, str],
+        body: bytes,
+        attempt: int,
+    ) -> float | None:
+        if status == 429 or (status == 403 and is_rate_limited(headers, body)):
+            retry_after = headers.get("retry-after")
+            if retry_after is not None and retry_after.isdigit():
+                return float(retry_after)
+            reset = headers.get("x-ratelimit-reset")
+            if headers.get("x-ratelimit-remaining") == "0" and reset is not None:
+                return max(0.0, float(reset) - self._wall_clock()) + 1
+            return self._backoff(attempt, SECONDARY_LIMIT_DELAY_SECONDS)
+        if status in RETRYABLE_STATUSES:
+            return self._backoff(attempt, BASE_DELAY_SECONDS)
+        return None
+
+    def _backoff(self, attempt: int, base: float) -> float:
+        delay = min(MAX_DELAY_SECONDS, base * 2**attempt)
+        return delay / 2 + delay / 2 * self._jitter()
+
+
+def is_rate_limited(headers: dict[str, str], body: bytes) -> bool:
+    if headers.get("x-ratelimit-remaining") == "0" or "retry-after" in headers:
+        return True
+    return b"rate limit" in body.lower()
+
+
+def resource_for_path(path: str) -> str:
+    if path.startswith("/graphql"):
+        return "graphql"
+    if path.startswith("/search/"):
+        return "search"
+    return "core"
@@ -0,0 +1,108 @@
+"""README templates compiled into literal text and placeholder slots.
+
+A placeholder is ``{{ name }}`` or ``{{ name: argument }}``:
+
+* ``{{ repo_sections }}``: all category sections that are not placed on their own.
+* ``{{ category_section: Name }}``: the section of one category (case-insensitive).
+* ``{{ repo_count }}``: the number of repositories listed.
+* ``{{ generated_at }}``: when the README was rendered (UTC, ISO 8601).
+
+Other ``{{ word }}`` placeholders are rejected; text such as ``${{ secrets.X }}``
+is not a placeholder and stays as it is.
+"""
+
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable, Iterator
+
+PLACEHOLDER_PATTERN = re.compile(r"\{\{\s*(\w+)\s*(?::\s*([^{}]*?)\s*)?\}\}")
+SLOT_NAMES = frozenset(
+    {"repo_sections", "category_section", "repo_count", "generated_at"}
+)
+SLOTS_WITH_ARGUMENT = frozenset({"category_section"})
+# What ``{{ generated_at }}`` renders to, as written by ``datetime.isoformat``.
+GENERATED_AT_PATTERN = re.compile(
+    r"\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}(?:[+-]\d{2}:\d{2})?"
+)
+
+
+@dataclass(frozen=True, slots=True)
+class Slot:
+    name: str
+    argument: str | None = None
+
+
+@dataclass(frozen=True, slots=True)
+class CompiledTemplate:
+    segments: tuple[str | Slot, ...]
+
+    @property
+    def slots(self) -> tuple[Slot, ...]:
+        return tuple(segment for segment in self.segments if isinstance(segment, Slot))
+
+    @property
+    def volatile_pattern(self) -> re.Pattern[str] | None:
+        """What differs between two renders of the same content, if anything."""
+        if any(slot.name == "generated_at" for slot in self.slots):
+            return GENERATED_AT_PATTERN
+        return None
+
+    def fill(self, slot_text: Callable[[Slot], Iterable[str]]) -> Iterator[str]:
+        """Yield the template with every slot replaced by ``slot_text(slot)``.
+
+        Each slot's text and the whole document lose their trailing
+        whitespace, and the document ends with one newline. Trailing
+        whitespace is held back until more text follows it, so the pieces can
+        be written as they come.
+        """
+        pending = ""
+        for segment in self.segments:
+            if isinstance(segment, Slot):
+                trailing = ""
+                for chunk in slot_text(segment):
+                    text = chunk.rstrip()
+                    if text:
+                        yield pending + trailing + text
+                        pending = ""
+                        trailing = chunk[len(text) :]
+                    else:
+                        trailing += chunk
+                continue
+            text = segment.rstrip()
+            if text:
+                yield pending + text
+                pending = segment[len(text) :]
+            else:
+                pending += segment
+        yield "\n"
+
+
+@lru_cache(maxsize=32)
+def compile_template(template: str) -> CompiledTemplate:
+    """Split ``template`` into literal text and slots; compiled once per template."""
+    segments: list[str | Slot] = []
+    position = 0
+    for match in PLACEHOLDER_PATTERN.finditer(template):
+        name, argument = match.group(1), match.group(2)
+        if name not in SLOT_NAMES:
+            message = f"Unknown template placeholder {match.group(0)!r}; expected one of {', '.join(sorted(SLOT_NAMES))}."
+            raise ValueError(message)
+        if name in SLOTS_WITH_ARGUMENT and not argument:
+            message = f"Template placeholder {match.group(0)!r} needs an argument: {{{{ {name}: ... }}}}."
+            raise ValueError(message)
+        if name not in SLOTS_WITH_ARGUMENT and argument is not None:
+            message = f"Template placeholder {match.group(0)!r} takes no argument."
+            raise ValueError(message)
+        if match.start() > position:
+            segments.append(template[position : match.start()])
+        segments.append(Slot(name, argument))
+        position = match.end()
+    if position < len(template):
+        segments.append(template[position:])
+    return CompiledTemplate(tuple(segments))
@@ -0,0 +1,94 @@
+"""Rendered README sections, memoized by a hash of what they were rendered from."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable
+    from pathlib import Path
+    from types import FunctionType
+
+# Bump when the format of the cache file changes. Changes to the markdown of a
+# section are covered by the renderer fingerprint in every key.
+SECTION_CACHE_VERSION = 1
+
+
+def section_key(*parts: object) -> str:
+    """Hash JSON-serializable ``parts`` into a cache key."""
+    encoded = json.dumps(parts, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+def renderer_fingerprint(renderers: Iterable[FunctionType]) -> str:
+    """Hash the code of ``renderers``.
+
+    Part of every section key, so sections rendered by an older version of the
+    render functions are never spliced into a new README.
+    """
+    import inspect
+
+    digest = hashlib.sha256()
+    for renderer in renderers:
+        try:
+            digest.update(inspect.getsource(renderer).encode("utf-8"))
+        except (OSError, TypeError):
+            digest.update(renderer.__code__.co_code)
+    return digest.hexdigest()
+
+
+class SectionCache:
+    """Rendered section lines by :func:`section_key`.
+
+    Only sections looked up since loading are saved, so sections of
+    categories that changed or disappeared do not accumulate.
+    """
+
+    def __init__(self, sections: dict[str, list[str]] | None = None) -> None:
+        self._loaded = sections or {}
+        self._used: dict[str, list[str]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str, render: Callable[[], list[str]]) -> list[str]:
+        """Return the section stored under ``key``, rendering it on a miss."""
+        lines = self._used.get(key)
+        if lines is None:
+            lines = self._loaded.get(key)
+        if lines is None:
+            self.misses += 1
+            lines = render()
+        else:
+            self.hits += 1
+        self._used[key] = lines
+        return list(lines)
+
+    def sections(self) -> dict[str, list[str]]:
+        return dict(self._used)
+
+
+def load_section_cache(path: Path) -> SectionCache:
+    """Read the sections saved by :func:`save_section_cache`; empty if there are none usable."""
+    try:
+        raw_cache = json.loads(path.read_text(encoding="utf-8"))
+    except (FileNotFoundError, json.JSONDecodeError):
+        return SectionCache()
+    if raw_cache.get("version") != SECTION_CACHE_VERSION:
+        return SectionCache()
+    return SectionCache(raw_cache["sections"])
+
+
+def save_section_cache(path: Path, cache: SectionCache) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temporary_path = path.with_name(f"{path.name}.tmp")
+    temporary_path.write_text(
+        json.dumps(
+            {"version": SECTION_CACHE_VERSION, "sections": cache.sections()},
+            ensure_ascii=False,
+        ),
+        encoding="utf-8",
+    )
+    os.replace(temporary_path, path)
@@ -0,0 +1,215 @@
+"""Versioned snapshot of an organization's repositories and custom properties."""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field, replace
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+from profile_readme_generator.listings import (
+    RepositoryPropertyValues,
+    RepositorySummary,
+)
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+    from profile_readme_generator.github_api import GitHubClient
+
+SNAPSHOT_VERSION = 1
+DEFAULT_ORG = "eclipse-score"
+DEFAULT_OUTPUT = Path(".cache/org-snapshot.json")
+
+PropertyValue = str | list[str] | None
+
+
+@dataclass(frozen=True, slots=True)
+class RepositoryRecord:
+    name: str
+    full_name: str
+    description: str | None
+    archived: bool
+    visibility: str
+    pushed_at: str | None
+    default_branch: str | None
+    open_issues_count: int
+    stargazers_count: int
+    forks_count: int
+    size: int
+    custom_properties: dict[str, PropertyValue] = field(default_factory=dict)
+
+
+@dataclass(frozen=True, slots=True)
+class OrgSnapshot:
+    org: str
+    created_at: str
+    repositories: tuple[RepositoryRecord, ...]
+
+
+class SnapshotOrganization:
+    """Serves the listings of :class:`~profile_readme_generator.github_api.OrganizationClient` from a snapshot."""
+
+    def __init__(self, snapshot: OrgSnapshot) -> None:
+        self.snapshot = snapshot
+
+    def get_repos(self) -> Iterator[RepositorySummary]:
+        for repository in self.snapshot.repositories:
+            yield RepositorySummary(
+                name=repository.name,
+                description=repository.description,
+                archived=repository.archived,
+            )
+
+    def list_custom_property_values(self) -> Iterator[RepositoryPropertyValues]:
+        for repository in self.snapshot.repositories:
+            if repository.custom_properties:
+                yield RepositoryPropertyValues(
+                    repository_name=repository.name,
+                    properties=dict(repository.custom_properties),
+                )
+
+
+def fetch_snapshot(client: GitHubClient, org: str) -> OrgSnapshot:
+    """List every repository of ``org`` and its custom property values once."""
+    from profile_readme_generator.github_api import (
+        DEFAULT_PAGE_WORKERS,
+        repository_property_values,
+    )
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        property_values = executor.submit(
+            list,
+            client.paginate(
+                f"/orgs/{org}/properties/values",
+                workers=DEFAULT_PAGE_WORKERS,
+                project=repository_property_values,
+            ),
+        )
+        records = executor.submit(
+            list,
+            client.paginate(
+                f"/orgs/{org}/repos",
+                workers=DEFAULT_PAGE_WORKERS,
+                project=repository_record,
+            ),
+        )
+        properties_by_name = {
+            values.repository_name: values.properties
+            for values in property_values.result()
+        }
+        repositories = tuple(
+            replace(record, custom_properties=properties_by_name.get(record.name, {}))
+            for record in records.result()
+        )
+
+    return OrgSnapshot(
+        org=org,
+        created_at=datetime.now(UTC).isoformat(),
+        repositories=repositories,
+    )
+
+
+def repository_record(repository: dict[str, Any]) -> RepositoryRecord:
+    """Keep the fields of a ``/orgs/{org}/repos`` item that the profile tools use."""
+    return RepositoryRecord(
+        name=repository["name"],
+        full_name=repository["full_name"],
+        description=repository.get("description"),
+        archived=bool(repository.get("archived")),
+        visibility=repository.get("visibility")
+        or ("private" if repository.get("private") else "public"),
+        pushed_at=repository.get("pushed_at"),
+        default_branch=repository.get("default_branch"),
+        open_issues_count=repository.get("open_issues_count", 0),
+        stargazers_count=repository.get("stargazers_count", 0),
+        forks_count=repository.get("forks_count", 0),
+        size=repository.get("size", 0),
+    )
+
+
+def write_snapshot(snapshot: OrgSnapshot, path: Path) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temporary_path = path.with_name(f"{path.name}.tmp")
+    temporary_path.write_text(
+        json.dumps({"version": SNAPSHOT_VERSION, **asdict(snapshot)}, indent=1),
+        encoding="utf-8",
+    )
+    os.replace(temporary_path, path)
+
+
+def load_snapshot(path: Path) -> OrgSnapshot:
+    """Read a snapshot written by :func:`write_snapshot`; raise ``ValueError`` if it is not one."""
+    raw_snapshot: dict[str, Any] = json.loads(path.read_text(encoding="utf-8"))
+    if raw_snapshot.get("version") != SNAPSHOT_VERSION:
+        message = (
+            f"Unsupported snapshot version {raw_snapshot.get('version')!r} in {path};"
+            f" expected {SNAPSHOT_VERSION}."
+        )
+        raise ValueError(message)
+    return OrgSnapshot(
+        org=raw_snapshot["org"],
+        created_at=raw_snapshot["created_at"],
+        repositories=tuple(
+            RepositoryRecord(**raw_repository)
+            for raw_repository in raw_snapshot["repositories"]
+        ),
+    )
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description="Write a snapshot of an organization's repositories and custom properties",
+    )
+    parser.add_argument("--org", default=DEFAULT_ORG, help="GitHub organization name")
+    parser.add_argument(
+        "--output",
+        type=Path,
+        default=DEFAULT_OUTPUT,
+        help=f"Snapshot file to write (default: {DEFAULT_OUTPUT})",
+    )
+    parser.add_argument(
+        "--token-env",
+        default="GITHUB_TOKEN",
+        help="Environment variable that contains the GitHub token",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        type=Path,
+        help="Directory for the persistent GitHub API response cache (disabled by default)",
+    )
+    return parser
+
+
+def main() -> int:
+    args = build_parser().parse_args()
+    from profile_readme_generator.generator import resolve_github_token
+    from profile_readme_generator.github_api import GitHubClient
+    from profile_readme_generator.http_cache import ResponseCache
+    from profile_readme_generator.ratelimit import RequestScheduler
+
+    token = resolve_github_token(args.token_env)
+    if not token:
+        message = f"Missing GitHub token. Set {args.token_env} or authenticate with `gh auth login`."
+        raise SystemExit(message)
+
+    cache = ResponseCache(args.cache_dir) if args.cache_dir is not None else None
+    with GitHubClient(
+        token, cache=cache, scheduler=RequestScheduler(notify=print_status)
+    ) as client:
+        snapshot = fetch_snapshot(client, args.org)
+    write_snapshot(snapshot, args.output)
+    print_status(
+        f"Wrote {len(snapshot.repositories)} repositories to {args.output}"
+        f" with {client.requests_sent} requests ({client.not_modified} not modified)"
+    )
+    return 0
+
+
+def print_status(message: str) -> None:
+    print(f"[snapshot-org] {message}", file=sys.stderr)
@@ -0,0 +1,578 @@
+"""Long-running README updater fed by GitHub webhooks.
+
+``serve`` keeps the organization's repositories in memory, applies
+``repository`` and ``custom_property_values`` deliveries to them, renders
+only the category sections they touched and writes the README once
+deliveries have stopped for a moment. ``replay`` posts recorded deliveries
+to a running server.
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import hmac
+import json
+import os
+import sys
+import threading
+import time
+import urllib.request
+from dataclasses import replace
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, cast
+
+from profile_readme_generator.freshness import output_is_current
+from profile_readme_generator.generator import (
+    DEFAULT_CATEGORY,
+    DEFAULT_ORG,
+    DEFAULT_OUTPUT,
+    DEFAULT_SUBCATEGORY,
+    ReadmeConfig,
+    RepoEntry,
+    build_repo_entry,
+    category_sort_key,
+    config_index_for,
+    connect_to_github,
+    group_repositories,
+    join_category_sections,
+    load_config,
+    load_repositories_from_github,
+    load_repositories_from_snapshot,
+    load_template,
+    normalize_group_name,
+    render_category_section,
+)
+from profile_readme_generator.readme_template import compile_template
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable
+
+    from profile_readme_generator.generator import CustomPropertyValue
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8080
+DEFAULT_DEBOUNCE_SECONDS = 5.0
+DEFAULT_MAX_DELAY_SECONDS = 60.0
+SIGNATURE_HEADER = "X-Hub-Signature-256"
+
+
+class ReadmeIndex:
+    """Repositories of an organization with their rendered category sections.
+
+    Changes mark the categories they touch; :meth:`render` renders only
+    those again and splices them between the sections it kept.
+    """
+
+    def __init__(
+        self,
+        repos: Iterable[RepoEntry],
+        *,
+        template: str,
+        config: ReadmeConfig | None = None,
+        org_name: str = DEFAULT_ORG,
+    ) -> None:
+        self.template = template
+        self.config = config
+        self.config_index = config_index_for(config)
+        self.org_name = org_name
+        self.sections_rendered = 0
+        self._entries: dict[str, RepoEntry] = {}
+        self._members: dict[str, dict[str, RepoEntry]] = {}
+        self._sections: dict[str, list[str]] = {}
+        self._stale: set[str] = set()
+        self._lock = threading.Lock()
+        for repo in repos:
+            self._put(repo)
+
+    def entries(self) -> list[RepoEntry]:
+        with self._lock:
+            return list(self._entries.values())
+
+    def apply(self, event: str, payload: dict[str, Any]) -> bool:
+        """Apply one webhook delivery and return whether a repository changed.
+
+        Raises ``ValueError``, without changing anything, if a field the
+        delivery is applied from does not have the documented type.
+        """
+        repository = json_object(payload.get("repository"), "repository")
+        name = json_string(repository.get("name"), "repository.name")
+        if name is None:
+            return False
+        with self._lock:
+            if event == "repository":
+                return self._apply_repository(payload, repository)
+            if event == "custom_property_values":
+                return self._apply_property_values(name, payload)
+            return False
+
+    def render(self) -> str:
+        with self._lock:
+            for category in self._stale:
+                members = self._members.get(category)
+                if not members:
+                    self._sections.pop(category, None)
+                    continue
+                grouped = group_repositories(
+                    members.values(), config_index=self.config_index
+                )
+                self._sections[category] = render_category_section(
+                    category=category,
+                    subcategories=grouped[category],
+                    config_index=self.config_index,
+                    org_name=self.org_name,
+                )
+                self.sections_rendered += 1
+            self._stale.clear()
+            categories = sorted(
+                self._sections,
+                key=lambda category: category_sort_key(category, self.config_index),
+            )
+            return join_category_sections(
+                self.template,
+                categories,
+                self._sections.__getitem__,
+                repo_count=len(self._entries),
+            )
+
+    def _apply_repository(
+        self,
+        payload: dict[str, Any],
+        repository: dict[str, Any],
+    ) -> bool:
+        name = repository["name"]
+        changes = json_object(payload.get("changes"), "changes")
+        renamed_repository = json_object(
+            changes.get("repository"), "changes.repository"
+        )
+        renamed = json_object(renamed_repository.get("name"), "changes.repository.name")
+        previous_name = json_string(renamed.get("from"), "changes.repository.name.from")
+        description = json_string(
+            repository.get("description"), "repository.description"
+        )
+        custom_properties = property_values(
+            json_object(
+                repository.get("custom_properties"), "repository.custom_properties"
+            ).items(),
+            "repository.custom_properties",
+        )
+
+        current = self._entries.get(previous_name or name)
+        changed = previous_name is not None and self._remove(previous_name)
+        if payload.get("action") == "deleted" or repository.get("archived"):
+            return self._remove(name) or changed
+
+        entry = build_repo_entry(
+            repository_name=name,
+            description=description,
+            custom_properties=custom_properties,
+        )
+        if current is not None and "custom_properties" not in repository:
+            entry = replace(
+                entry,
+                category=current.category,
+                subcategory=current.subcategory,
+            )
+        return self._put(entry) or changed
+
+    def _apply_property_values(self, name: str, payload: dict[str, Any]) -> bool:
+        items: object = payload.get("new_property_values") or []
+        if not isinstance(items, list):
+            message = "new_property_values is not an array"
+            raise ValueError(message)
+        pairs: list[tuple[str | None, object]] = []
+        for raw_item in cast("list[object]", items):
+            item = json_object(raw_item, "new_property_values[]")
+            property_name = json_string(
+                item.get("property_name"), "new_property_values[].property_name"
+            )
+            pairs.append((property_name, item.get("value")))
+        values = property_values(pairs, "new_property_values")
+
+        current = self._entries.get(name)
+        if current is None:
+            return False
+        return self._put(
+            replace(
+                current,
+                category=normalize_group_name(values["category"], DEFAULT_CATEGORY)
+                if "category" in values
+                else current.category,
+                subcategory=normalize_group_name(
+                    values["subcategory"],
+                    DEFAULT_SUBCATEGORY,
+                )
+                if "subcategory" in values
+                else current.subcategory,
+            )
+        )
+
+    def _put(self, entry: RepoEntry) -> bool:
+        previous = self._entries.get(entry.name)
+        if previous == entry:
+            return False
+        if previous is not None:
+            self._remove(previous.name)
+        self._entries[entry.name] = entry
+        self._members.setdefault(entry.category, {})[entry.name] = entry
+        self._stale.add(entry.category)
+        return True
+
+    def _remove(self, name: str) -> bool:
+        previous = self._entries.pop(name, None)
+        if previous is None:
+            return False
+        del self._members[previous.category][name]
+        self._stale.add(previous.category)
+        return True
+
+
+def json_object(value: object, field: str) -> dict[str, Any]:
+    """Return the JSON object ``value`` of a delivery (``{}`` for null)."""
+    if value is None:
+        return {}
+    if not isinstance(value, dict):
+        message = f"{field} is not an object"
+        raise ValueError(message)
+    return cast("dict[str, Any]", value)
+
+
+def json_string(value: object, field: str) -> str | None:
+    if value is not None and not isinstance(value, str):
+        message = f"{field} is not a string"
+        raise ValueError(message)
+    return value
+
+
+def property_values(
+    items: Iterable[tuple[str | None, object]],
+    field: str,
+) -> dict[str, CustomPropertyValue]:
+    """Return custom property values by name; each is a string, a list of strings or null."""
+    values: dict[str, CustomPropertyValue] = {}
+    for name, value in items:
+        if name is None:
+            message = f"{field} has a property without a name"
+            raise ValueError(message)
+        if isinstance(value, list) and all(
+            isinstance(item, str) for item in cast("list[object]", value)
+        ):
+            values[name] = cast("list[str]", value)
+        elif value is None or isinstance(value, str):
+            values[name] = value
+        else:
+            message = f"{field}.{name} is not a string or a list of strings"
+            raise ValueError(message)
+    return values
+
+
+class DebouncedWriter:
+    """Runs ``flush`` once no change was scheduled for ``delay`` seconds.
+
+    Changes arriving within the delay are coalesced into one flush, which is
+    never postponed by more than ``max_delay`` seconds after the first of them.
+    Flushes never overlap: :meth:`close` waits for one that a timer has
+    already started.
+    """
+
+    def __init__(
+        self,
+        flush: Callable[[], None],
+        *,
+        delay: float = DEFAULT_DEBOUNCE_SECONDS,
+        max_delay: float = DEFAULT_MAX_DELAY_SECONDS,
+    ) -> None:
+        self.flush = flush
+        self.delay = delay
+        self.max_delay = max_delay
+        self.flushes = 0
+        self._timer: threading.Timer | None = None
+        self._first_scheduled_at: float | None = None
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+
+    def schedule(self) -> None:
+        with self._lock:
+            now = time.monotonic()
+            if self._first_scheduled_at is None:
+                self._first_scheduled_at = now
+            if self._timer is not None:
+                self._timer.cancel()
+            remaining = self._first_scheduled_at + self.max_delay - now
+            self._timer = threading.Timer(
+                max(0.0, min(self.delay, remaining)), self._run
+            )
+            self._timer.daemon = True
+            self._timer.start()
+
+    def close(self) -> None:
+        """Flush a pending change right away."""
+        with self._lock:
+            timer, self._timer = self._timer, None
+        if timer is not None:
+            timer.cancel()
+            self._run()
+
+    def _run(self) -> None:
+        with self._lock:
+            self._timer = None
+            self._first_scheduled_at = None
+        with self._flush_lock:
+            self.flush()
+            self.flushes += 1
+
+
+class WebhookServer(ThreadingHTTPServer):
+    """Accepts webhook deliveries for ``org`` and applies them to ``index``."""
+
+    def __init__(
+        self,
+        address: tuple[str, int],
+        *,
+        index: ReadmeIndex,
+        writer: DebouncedWriter,
+        org: str,
+        secret: bytes | None = None,
+    ) -> None:
+        super().__init__(address, WebhookHandler)
+        self.index = index
+        self.writer = writer
+        self.org = org
+        self.secret = secret
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host!s}:{port}/"
+
+
+class WebhookHandler(BaseHTTPRequestHandler):
+    def do_POST(self) -> None:
+        server = cast("WebhookServer", self.server)
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+        except ValueError:
+            length = -1
+        if length < 0:
+            self.respond(400)
+            return
+        body = self.rfile.read(length)
+        if server.secret is not None and not has_valid_signature(
+            server.secret,
+            body,
+            self.headers.get(SIGNATURE_HEADER),
+        ):
+            self.respond(401)
+            return
+
+        event = self.headers.get("X-GitHub-Event", "")
+        try:
+            decoded: object = json.loads(body or b"{}")
+        except ValueError:
+            # Also covers UnicodeDecodeError.
+            decoded = None
+        if not isinstance(decoded, dict):
+            self.respond(400)
+            return
+        payload = cast("dict[str, Any]", decoded)
+        try:
+            organization = json_object(payload.get("organization"), "organization")
+            login = json_string(organization.get("login"), "organization.login")
+            if login is not None and login.casefold() != server.org.casefold():
+                self.respond(202)
+                return
+            changed = server.index.apply(event, payload)
+        except ValueError as error:
+            print_status(f"Rejected {event} delivery: {error}")
+            self.respond(400)
+            return
+
+        if changed:
+            print_status(f"Applied {event}.{payload.get('action')} delivery")
+            server.writer.schedule()
+        self.respond(202)
+
+    def respond(self, status: int) -> None:
+        self.send_response(status)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, format: str, *args: object) -> None:
+        pass
+
+
+def signature_for(secret: bytes, body: bytes) -> str:
+    return "sha256=" + hmac.new(secret, body, hashlib.sha256).hexdigest()
+
+
+def has_valid_signature(secret: bytes, body: bytes, signature: str | None) -> bool:
+    return signature is not None and hmac.compare_digest(
+        signature_for(secret, body),
+        signature,
+    )
+
+
+def write_readme(index: ReadmeIndex, output: Path) -> None:
+    markdown = index.render()
+    volatile = compile_template(index.template).volatile_pattern
+    if output_is_current(output, markdown, volatile=volatile):
+        print_status(f"{output} is unchanged")
+        return
+    output.parent.mkdir(parents=True, exist_ok=True)
+    temporary_path = output.with_name(f"{output.name}.tmp")
+    temporary_path.write_text(markdown, encoding="utf-8")
+    os.replace(temporary_path, output)
+    print_status(f"Wrote {output} ({index.sections_rendered} sections rendered so far)")
+
+
+def replay(url: str, deliveries: Iterable[Path], secret: bytes | None = None) -> None:
+    """POST recorded deliveries to a running server, in order.
+
+    Every file holds ``{"event": <X-GitHub-Event>, "payload": <body>}``.
+    """
+    for path in deliveries:
+        delivery = json.loads(path.read_text(encoding="utf-8"))
+        body = json.dumps(delivery["payload"]).encode("utf-8")
+        headers: dict[str, str] = {
+            "Content-Type": "application/json",
+            "X-GitHub-Event": delivery["event"],
+        }
+        if secret is not None:
+            headers[SIGNATURE_HEADER] = signature_for(secret, body)
+        request = urllib.request.Request(url, data=body, headers=headers, method="POST")
+        with urllib.request.urlopen(request) as response:
+            print_status(f"Replayed {path.name}: {response.status}")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description="Keep the profile README up to date from GitHub webhook deliveries",
+    )
+    parser.add_argument(
+        "--secret-env",
+        default="GITHUB_WEBHOOK_SECRET",
+        help="Environment variable that contains the webhook secret (deliveries are not verified if it is unset)",
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    serve_parser = subparsers.add_parser("serve", help="Listen for webhook deliveries")
+    serve_parser.add_argument(
+        "--org", default=DEFAULT_ORG, help="GitHub organization name"
+    )
+    serve_parser.add_argument(
+        "--output",
+        type=Path,
+        default=DEFAULT_OUTPUT,
+        help="Markdown file to write",
+    )
+    serve_parser.add_argument(
+        "--template",
+        type=Path,
+        help="Optional markdown template file with a {{ repo_sections }} placeholder",
+    )
+    serve_parser.add_argument(
+        "--config",
+        type=Path,
+        help="Optional category config file that defines order and descriptions",
+    )
+    serve_parser.add_argument(
+        "--from-snapshot",
+        type=Path,
+        help="Start from an organization snapshot written by snapshot-org instead of listing repositories on GitHub",
+    )
+    serve_parser.add_argument(
+        "--backend",
+        choices=("rest", "graphql"),
+        default="rest",
+        help="API used for the initial repository listing (default: rest)",
+    )
+    serve_parser.add_argument(
+        "--token-env",
+        default="GITHUB_TOKEN",
+        help="Environment variable that contains the GitHub token",
+    )
+    serve_parser.add_argument(
+        "--cache-dir",
+        type=Path,
+        help="Directory for the persistent GitHub API response cache (disabled by default)",
+    )
+    serve_parser.add_argument(
+        "--host", default=DEFAULT_HOST, help="Address to listen on"
+    )
+    serve_parser.add_argument(
+        "--port",
+        type=int,
+        default=DEFAULT_PORT,
+        help=f"Port to listen on (default: {DEFAULT_PORT})",
+    )
+    serve_parser.add_argument(
+        "--debounce",
+        type=float,
+        default=DEFAULT_DEBOUNCE_SECONDS,
+        metavar="SECONDS",
+        help=f"Write once no delivery arrived for this long (default: {DEFAULT_DEBOUNCE_SECONDS:g})",
+    )
+
+    replay_parser = subparsers.add_parser(
+        "replay",
+        help="POST recorded deliveries to a running server",
+    )
+    replay_parser.add_argument(
+        "--url",
+        default=f"http://{DEFAULT_HOST}:{DEFAULT_PORT}/",
+        help="Webhook endpoint of the server",
+    )
+    replay_parser.add_argument(
+        "deliveries",
+        nargs="+",
+        type=Path,
+        help='Files with {"event": ..., "payload": ...}',
+    )
+    return parser
+
+
+def main() -> int:
+    args = build_parser().parse_args()
+    secret_value = os.getenv(args.secret_env)
+    secret = secret_value.encode("utf-8") if secret_value else None
+    if args.command == "replay":
+        replay(args.url, args.deliveries, secret)
+        return 0
+
+    config = load_config(args.config)
+    template = load_template(args.template)
+    if args.from_snapshot is not None:
+        repos = load_repositories_from_snapshot(args.from_snapshot, args.org)
+    else:
+        with connect_to_github(args) as client:
+            repos = load_repositories_from_github(client, args)
+    index = ReadmeIndex(repos, template=template, config=config, org_name=args.org)
+    write_readme(index, args.output)
+
+    writer = DebouncedWriter(
+        lambda: write_readme(index, args.output),
+        delay=args.debounce,
+    )
+    server = WebhookServer(
+        (args.host, args.port),
+        index=index,
+        writer=writer,
+        org=args.org,
+        secret=secret,
+    )
+    if secret is None:
+        print_status(f"{args.secret_env} is not set; deliveries are not verified")
+    print_status(f"Listening for webhook deliveries on {server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        writer.close()
+    return 0
+
+
+def print_status(message: str) -> None:
+    print(f"[profile-readme-webhook] {message}", file=sys.stderr)
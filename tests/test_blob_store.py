@@ -0,0 +1,38 @@
+from pathlib import Path
+
+import pytest
+
+from profile_readme_generator.blob_store import BlobStore
+
+
+def test_blob_store_keeps_texts_by_sha(tmp_path: Path) -> None:
+    BlobStore(tmp_path).put_text("abc123", "8.1.0\n")
+
+    store = BlobStore(tmp_path)
+
+    assert store.get_text("abc123") == "8.1.0\n"
+    assert store.get_text("def456") is None
+
+
+def test_blob_store_persists_results_per_namespace(tmp_path: Path) -> None:
+    store = BlobStore(tmp_path)
+    store.put_result("bazelversion/1", "abc123", "8.1.0")
+    store.put_result("workspace/1", "abc123", None)
+    store.save()
+
+    reloaded = BlobStore(tmp_path)
+
+    assert reloaded.result("bazelversion/1", "abc123") == "8.1.0"
+    assert reloaded.has_result("workspace/1", "abc123")
+    assert reloaded.result("workspace/1", "abc123") is None
+    assert not reloaded.has_result("bazelversion/2", "abc123")
+    with pytest.raises(KeyError):
+        reloaded.result("bazelversion/2", "abc123")
+
+
+def test_blob_store_ignores_results_of_other_versions(tmp_path: Path) -> None:
+    (tmp_path / "results.json").write_text(
+        '{"version": 0, "results": {"x": {"abc": 1}}}', encoding="utf-8"
+    )
+
+    assert not BlobStore(tmp_path).has_result("x", "abc")
@@ -0,0 +1,1034 @@
+import argparse
+import base64
+import json
+import re
+import threading
+import time
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field, replace
+from datetime import timedelta
+from pathlib import Path
+from typing import Any, cast
+from urllib.parse import unquote
+
+import pytest
+
+import collect_metrics
+from profile_readme_generator.blob_store import BlobStore
+from profile_readme_generator.github_api import (
+    ApiResponse,
+    GitHubApiError,
+    GitHubClient,
+)
+from profile_readme_generator.history import MetricsHistory, MetricsSample
+from profile_readme_generator.snapshot import (
+    OrgSnapshot,
+    RepositoryRecord,
+    write_snapshot,
+)
+
+REPORT_OPTIONS = [
+    *("--org", "acme"),
+    *("--output", "x.md"),
+    *("--state-dir", "state"),
+    *("--unchanged-exit-code", "3"),
+]
+
+
+def repo_data(name: str, **overrides: object) -> collect_metrics.RepoData:
+    values: dict[str, object] = {
+        "name": name,
+        "description": f"{name} repo",
+        "last_commit": "2025-01-02",
+        "open_issues": 1,
+        "open_prs": 2,
+        "bazel_version": "7.4.1",
+        "lint_config": "✅ yes",
+        "ci_setup": "✅ yes",
+        "test_coverage": "❌ no",
+        "latest_release": None,
+        "stars": 3,
+        "forks": 4,
+        "pushed_at": "2025-01-02T03:04:05Z",
+        "head_sha": f"{name}-sha",
+        "collected_at": collect_metrics.NOW.isoformat(),
+        "detectors": collect_metrics.detector_fingerprint(),
+    }
+    values.update(overrides)
+    return collect_metrics.RepoData(**values)  # type: ignore[arg-type]
+
+
+def write_records(path: Path, *records: collect_metrics.RepoData) -> Path:
+    path.write_text(
+        "".join(json.dumps(asdict(record)) + "\n" for record in records),
+        encoding="utf-8",
+    )
+    return path
+
+
+def write_org_snapshot(path: Path, *names: str) -> Path:
+    repositories = tuple(
+        RepositoryRecord(
+            name=name,
+            full_name=f"{collect_metrics.ORG}/{name}",
+            description=None,
+            archived=False,
+            visibility="public",
+            pushed_at="2025-01-02T03:04:05Z",
+            default_branch="main",
+            open_issues_count=0,
+            stargazers_count=0,
+            forks_count=0,
+            size=10 ** len(name),
+        )
+        for name in names
+    )
+    write_snapshot(
+        OrgSnapshot(collect_metrics.ORG, "2025-01-02T00:00:00+00:00", repositories),
+        path,
+    )
+    return path
+
+
+def report_rows(path: Path) -> list[str]:
+    return [
+        line
+        for line in path.read_text(encoding="utf-8").splitlines()
+        if line.startswith("| [")
+    ]
+
+
+@dataclass
+class FakeRepo:
+    name: str
+    files: dict[str, str] = field(default_factory=dict)
+    pushed_at: str = "2025-01-02T03:04:05Z"
+    head_sha: str = "head-1"
+    size: int = 100
+    open_issues: int = 1
+    open_prs: int = 2
+    stars: int = 3
+    forks: int = 4
+    release: str | None = "2025-01-01T12:00:00Z"
+    # The listing's open_issues_count, which includes pull requests.
+    listed_open_issues: int | None = None
+    tree_status: int = 200
+    tree_truncated: bool = False
+
+    def blob_sha(self, path: str) -> str:
+        return f"{self.name}:{path}:{len(self.files[path])}"
+
+    def directories(self) -> set[str]:
+        return {
+            "/".join(parts[:index])
+            for parts in (path.split("/") for path in self.files)
+            for index in range(1, len(parts))
+        }
+
+
+class FakeClient:
+    """Answers the collector's REST and GraphQL calls from a list of ``FakeRepo``."""
+
+    def __init__(
+        self,
+        repos: list[FakeRepo],
+        org: str = "acme",
+        *,
+        graphql_available: bool = True,
+        delays: dict[str, float] | None = None,
+    ) -> None:
+        self.repos = {repo.name: repo for repo in repos}
+        self.org = org
+        self.graphql_available = graphql_available
+        self.delays = delays or {}
+        self.requests: list[str] = []
+
+    def requests_to(self, repo: str, kind: str) -> list[str]:
+        prefix = f"/repos/{self.org}/{repo}/{kind}"
+        return [request for request in self.requests if request.startswith(prefix)]
+
+    def paginate(
+        self,
+        url: str,
+        params: object = None,
+        *,
+        workers: int = 1,
+        project: object = None,
+    ) -> Iterator[dict[str, Any]]:
+        self.requests.append(url)
+        for repo in self.repos.values():
+            listed_open_issues = repo.listed_open_issues
+            if listed_open_issues is None:
+                listed_open_issues = repo.open_issues + repo.open_prs
+            yield {
+                "name": repo.name,
+                "full_name": f"{self.org}/{repo.name}",
+                "description": f"{repo.name} repo",
+                "pushed_at": repo.pushed_at,
+                "default_branch": "main",
+                "open_issues_count": listed_open_issues,
+                "stargazers_count": repo.stars,
+                "forks_count": repo.forks,
+                "size": repo.size,
+            }
+
+    def get_json(self, url: str, params: object = None) -> Any:
+        self.requests.append(url)
+        repo, kind, rest = self._route(url)
+        if kind == "git/trees":
+            if repo.tree_status != 200:
+                raise GitHubApiError(repo.tree_status, url, "tree unavailable")
+            tree = [{"path": path, "type": "tree"} for path in repo.directories()]
+            tree += [
+                {"path": path, "type": "blob", "sha": repo.blob_sha(path)}
+                for path in repo.files
+            ]
+            return {"tree": tree, "truncated": repo.tree_truncated}
+        if kind == "git/blobs":
+            path = next(path for path in repo.files if repo.blob_sha(path) == rest)
+            return self._blob(repo, path)
+        if kind == "contents":
+            path = unquote(rest)
+            if path in repo.files:
+                return self._blob(repo, path)
+            if path in repo.directories():
+                return []
+            raise GitHubApiError(404, url, "Not Found")
+        if kind == "releases" and repo.release is not None:
+            return {"published_at": repo.release}
+        raise GitHubApiError(404, url, "Not Found")
+
+    def request(
+        self, method: str, url: str, *, headers: object = None, **kwargs: object
+    ) -> ApiResponse:
+        self.requests.append(url)
+        repo, kind, _ = self._route(url)
+        assert kind == "commits"
+        time.sleep(self.delays.get(repo.name, 0))
+        return ApiResponse(200, {}, repo.head_sha.encode())
+
+    def count(self, url: str, params: object = None) -> int:
+        self.requests.append(url)
+        repo, kind, _ = self._route(url)
+        assert kind == "pulls"
+        return repo.open_prs
+
+    def graphql(self, query: str, variables: dict[str, Any]) -> Any:
+        self.requests.append("/graphql")
+        if not self.graphql_available:
+            raise GitHubApiError(401, "/graphql", "Bad credentials")
+        if variables["owner"] != self.org:
+            return {"repositoryOwner": None}
+        if "object(expression:" in query:
+            return {
+                f"r{index}": self._files_node(self.repos[variables[f"n{index}"]])
+                for index in range(len(variables) - 1)
+            }
+        start = int(variables["after"] or 0)
+        end = start + variables["first"]
+        repos = list(self.repos.values())
+        nodes = [self._repository_node(repo) for repo in repos[start:end]]
+        return {
+            "repositoryOwner": {
+                "repositories": {
+                    "pageInfo": {
+                        "hasNextPage": end < len(repos),
+                        "endCursor": str(end),
+                    },
+                    "nodes": nodes,
+                }
+            }
+        }
+
+    def _route(self, url: str) -> tuple[FakeRepo, str, str]:
+        """Split ``/repos/{org}/{name}/{kind}/{rest}`` into the repository, kind and rest."""
+        prefix = f"/repos/{self.org}/"
+        assert url.startswith(prefix), url
+        name, _, path = url.removeprefix(prefix).partition("/")
+        for kind in (
+            "git/trees",
+            "git/blobs",
+            "contents",
+            "commits",
+            "releases",
+            "pulls",
+        ):
+            if path == kind or path.startswith(f"{kind}/"):
+                return self.repos[name], kind, path[len(kind) + 1 :]
+        raise AssertionError(url)
+
+    def _blob(self, repo: FakeRepo, path: str) -> dict[str, str]:
+        content = base64.b64encode(repo.files[path].encode()).decode()
+        return {"content": content, "sha": repo.blob_sha(path)}
+
+    def _files_node(self, repo: FakeRepo) -> dict[str, Any]:
+        node: dict[str, Any] = {}
+        for index, path in enumerate(collect_metrics.required_paths()):
+            if path in repo.files:
+                node[f"f{index}"] = {"__typename": "Blob", "oid": repo.blob_sha(path)}
+            elif path in repo.directories():
+                node[f"f{index}"] = {"__typename": "Tree"}
+            else:
+                node[f"f{index}"] = None
+        return node
+
+    def _repository_node(self, repo: FakeRepo) -> dict[str, Any]:
+        return {
+            "name": repo.name,
+            "description": f"{repo.name} repo",
+            "pushedAt": repo.pushed_at,
+            "stargazerCount": repo.stars,
+            "forkCount": repo.forks,
+            "issues": {"totalCount": repo.open_issues},
+            "pullRequests": {"totalCount": repo.open_prs},
+            "latestRelease": {"publishedAt": repo.release} if repo.release else None,
+            "defaultBranchRef": {"target": {"oid": repo.head_sha}},
+        }
+
+
+def fake_org() -> list[FakeRepo]:
+    return [
+        FakeRepo(
+            "bazel-repo",
+            files={
+                ".bazelversion": "7.4.1\n",
+                ".github/workflows/ci.yml": "on: push\n",
+                ".pre-commit-config.yaml": "repos: []\n",
+            },
+        ),
+        FakeRepo(
+            "workspace-repo",
+            files={"WORKSPACE": 'bazel_version = "6.5.0"\n', "pytest.ini": ""},
+            release=None,
+        ),
+        FakeRepo(
+            "docs-repo", files={"README.md": "# Docs\n"}, release=None, open_prs=0
+        ),
+        *(
+            FakeRepo(f"repo-{index:02d}", files={"Jenkinsfile": "pipeline {}\n"})
+            for index in range(9)
+        ),
+    ]
+
+
+@pytest.mark.parametrize(
+    "argv",
+    [
+        [*REPORT_OPTIONS, "merge", "a.jsonl"],
+        ["merge", *REPORT_OPTIONS, "a.jsonl"],
+    ],
+)
+def test_merge_keeps_report_options_given_before_or_after_the_subcommand(
+    argv: list[str],
+) -> None:
+    args = collect_metrics.parse_args(argv)
+
+    assert args.command == "merge"
+    assert args.org == "acme"
+    assert args.output == Path("x.md")
+    assert args.state_dir == Path("state")
+    assert args.unchanged_exit_code == 3
+    assert args.snapshots == [Path("a.jsonl")]
+
+
+def test_merge_uses_the_report_defaults() -> None:
+    args = collect_metrics.parse_args(["merge", "a.jsonl"])
+
+    assert args.org == collect_metrics.ORG
+    assert args.output == collect_metrics.OUTPUT_FILE
+    assert args.state_dir == collect_metrics.STATE_DIR
+    assert args.unchanged_exit_code == 0
+
+
+@pytest.mark.parametrize(
+    "options",
+    [["--shard", "1/4"], ["--workers", "8"], ["--backend", "graphql"], ["--resume"]],
+)
+def test_merge_rejects_collection_options(
+    options: list[str],
+    capsys: pytest.CaptureFixture[str],
+) -> None:
+    with pytest.raises(SystemExit):
+        collect_metrics.parse_args([*options, "merge", "a.jsonl"])
+
+    assert f"{options[0]} cannot be used with merge" in capsys.readouterr().err
+
+
+def test_assign_shards_balances_cost_and_covers_every_repository_once() -> None:
+    summaries: list[dict[str, Any]] = [
+        {"name": f"repo-{index}", "size": 10**index} for index in range(6)
+    ]
+
+    assignment = cast("dict[str, int]", collect_metrics.assign_shards(summaries, 2))
+
+    assert assignment == collect_metrics.assign_shards(summaries[::-1], 2)
+    assert set(assignment) == {summary["name"] for summary in summaries}
+    loads = [0, 0]
+    for summary in summaries:
+        loads[assignment[summary["name"]]] += collect_metrics.estimate_cost(summary)
+    assert loads == [20, 19]
+
+
+@pytest.mark.parametrize(("value", "shard"), [("1/4", (0, 4)), ("4/4", (3, 4))])
+def test_parse_shard_is_one_based(value: str, shard: tuple[int, int]) -> None:
+    assert collect_metrics.parse_shard(value) == shard
+
+
+@pytest.mark.parametrize("value", ["0/4", "5/4", "1", "a/b"])
+def test_parse_shard_rejects_invalid_values(value: str) -> None:
+    with pytest.raises(argparse.ArgumentTypeError):
+        collect_metrics.parse_shard(value)
+
+
+def test_merge_writes_the_report_for_all_shards(tmp_path: Path) -> None:
+    org_snapshot = write_org_snapshot(tmp_path / "org.json", "alpha", "beta", "gamma")
+    output = tmp_path / "metrics.md"
+    args = collect_metrics.parse_args(
+        [
+            *("--output", str(output), "--state-dir", str(tmp_path / "state")),
+            "merge",
+            str(write_records(tmp_path / "1.jsonl", repo_data("gamma"))),
+            str(
+                write_records(
+                    tmp_path / "2.jsonl", repo_data("beta"), repo_data("alpha")
+                )
+            ),
+            *("--from-snapshot", str(org_snapshot)),
+        ]
+    )
+
+    assert collect_metrics.merge_snapshots(args) == 0
+
+    assert [collect_metrics.row_sort_key(row) for row in report_rows(output)] == [
+        "alpha",
+        "beta",
+        "gamma",
+    ]
+    snapshot = tmp_path / "state" / collect_metrics.SNAPSHOT_FILE_NAME
+    assert sorted(
+        record.name for record in collect_metrics.iter_snapshot(snapshot)
+    ) == [
+        "alpha",
+        "beta",
+        "gamma",
+    ]
+
+
+@pytest.mark.parametrize(
+    ("shards", "error"),
+    [
+        ([["alpha", "beta"], ["beta", "gamma"]], "1 in more than one shard (beta)"),
+        ([["alpha"], ["gamma"]], "1 missing (beta)"),
+        ([["alpha", "beta"], ["gamma", "delta"]], "1 not in the listing (delta)"),
+    ],
+)
+def test_merge_requires_the_shards_to_cover_the_listing_exactly_once(
+    tmp_path: Path,
+    shards: list[list[str]],
+    error: str,
+) -> None:
+    org_snapshot = write_org_snapshot(tmp_path / "org.json", "alpha", "beta", "gamma")
+    paths = [
+        str(write_records(tmp_path / f"{index}.jsonl", *map(repo_data, names)))
+        for index, names in enumerate(shards)
+    ]
+    output = tmp_path / "metrics.md"
+    args = collect_metrics.parse_args(
+        [
+            *("--output", str(output), "--state-dir", str(tmp_path / "state")),
+            *("merge", "--from-snapshot", str(org_snapshot), *paths),
+        ]
+    )
+
+    with pytest.raises(SystemExit, match=re.escape(error)):
+        collect_metrics.merge_snapshots(args)
+    assert not output.exists()
+
+
+def test_merge_requires_the_org_snapshot(tmp_path: Path) -> None:
+    args = collect_metrics.parse_args(
+        ["merge", str(write_records(tmp_path / "1.jsonl", repo_data("alpha")))]
+    )
+
+    with pytest.raises(SystemExit, match="requires --from-snapshot"):
+        collect_metrics.merge_snapshots(args)
+
+
+def test_snapshot_records_of_other_detectors_are_not_reused(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    current = collect_metrics.detector_fingerprint()
+    path = write_records(
+        tmp_path / "snapshot.jsonl",
+        repo_data("alpha", detectors=current),
+        repo_data("beta", detectors=None),
+    )
+
+    assert sorted(collect_metrics.load_snapshot(path)) == ["alpha"]
+
+    bumped = replace(collect_metrics.DETECTORS[0], version=2)
+    monkeypatch.setattr(
+        collect_metrics, "DETECTORS", [bumped, *collect_metrics.DETECTORS[1:]]
+    )
+
+    assert collect_metrics.detector_fingerprint() != current
+    assert collect_metrics.load_snapshot(path) == {}
+    assert collect_metrics.load_checkpoint(path, timedelta(hours=1)) == {}
+
+
+def test_report_writer_streams_partial_files_and_renames_them_at_the_end(
+    tmp_path: Path,
+) -> None:
+    output = tmp_path / "profile" / "metrics.md"
+    snapshot_file = tmp_path / "state" / "snapshot.jsonl"
+
+    with collect_metrics.ReportWriter(output, snapshot_file) as writer:
+        writer.add(repo_data("beta"))
+        writer.add(repo_data("Alpha"))
+
+        # Rows are readable in collection order while the run goes on.
+        assert [
+            collect_metrics.row_sort_key(row)
+            for row in report_rows(writer.partial_report)
+        ] == ["beta", "alpha"]
+        assert not output.exists()
+        assert not snapshot_file.exists()
+
+        writer.finish()
+
+    assert writer.changed
+    assert writer.count == 2
+    assert [collect_metrics.row_sort_key(row) for row in report_rows(output)] == [
+        "alpha",
+        "beta",
+    ]
+    assert [record.name for record in collect_metrics.iter_snapshot(snapshot_file)] == [
+        "beta",
+        "Alpha",
+    ]
+    assert sorted(path.name for path in output.parent.iterdir()) == ["metrics.md"]
+    assert sorted(path.name for path in snapshot_file.parent.iterdir()) == [
+        "snapshot.jsonl"
+    ]
+
+
+def test_report_writer_keeps_the_previous_report_when_a_run_fails(
+    tmp_path: Path,
+) -> None:
+    output = tmp_path / "metrics.md"
+    output.write_text("previous report", encoding="utf-8")
+    snapshot_file = tmp_path / "snapshot.jsonl"
+
+    writer = collect_metrics.ReportWriter(output, snapshot_file)
+
+    def fail_after_one_repository() -> None:
+        with writer:
+            writer.add(repo_data("alpha"))
+            raise RuntimeError
+
+    with pytest.raises(RuntimeError):
+        fail_after_one_repository()
+
+    assert output.read_text(encoding="utf-8") == "previous report"
+    assert not snapshot_file.exists()
+    assert len(report_rows(writer.partial_report)) == 1
+    assert list(
+        collect_metrics.load_checkpoint(writer.partial_snapshot, timedelta(hours=1))
+    ) == ["alpha"]
+
+
+def test_report_writer_does_not_rewrite_a_report_that_only_aged(
+    tmp_path: Path,
+) -> None:
+    output = tmp_path / "metrics.md"
+    snapshot_file = tmp_path / "snapshot.jsonl"
+    record = repo_data("alpha", latest_release="2025-01-01")
+    with collect_metrics.ReportWriter(output, snapshot_file) as writer:
+        writer.add(record)
+        writer.finish()
+    previous = (
+        output.read_text(encoding="utf-8")
+        .replace("Generated on ", "Generated on 1999-01-01 / ")
+        .replace(f" {collect_metrics.days_since('2025-01-01')} |", " 1 |")
+    )
+    output.write_text(previous, encoding="utf-8")
+
+    with collect_metrics.ReportWriter(output, snapshot_file) as writer:
+        writer.add(record)
+        writer.finish()
+
+    assert not writer.changed
+    assert output.read_text(encoding="utf-8") == previous
+
+    with collect_metrics.ReportWriter(output, snapshot_file) as writer:
+        writer.add(replace(record, open_issues=7))
+        writer.finish()
+
+    assert writer.changed
+
+
+def test_report_fingerprint_ignores_the_timestamp_and_volatile_columns() -> None:
+    record = repo_data("alpha", latest_release="2025-01-01")
+    report = collect_metrics.render_markdown([record])
+    days = collect_metrics.days_since("2025-01-01")
+
+    assert collect_metrics.report_fingerprint(
+        report
+    ) == collect_metrics.report_fingerprint(
+        report.replace(
+            collect_metrics.NOW.isoformat(), "2000-01-01T00:00:00+00:00"
+        ).replace(f" {days} |", " 12345 |")
+    )
+    assert collect_metrics.report_fingerprint(
+        report
+    ) != collect_metrics.report_fingerprint(
+        collect_metrics.render_markdown([replace(record, stars=99)])
+    )
+
+
+def test_load_checkpoint_skips_incomplete_and_old_records(tmp_path: Path) -> None:
+    old = (collect_metrics.NOW - timedelta(hours=7)).isoformat()
+    path = write_records(
+        tmp_path / "snapshot.jsonl.partial",
+        repo_data("alpha"),
+        repo_data("beta", collected_at=old),
+    )
+    with path.open("a", encoding="utf-8") as records:
+        records.write('{"name": "gamma", "descr')
+
+    checkpoint = collect_metrics.load_checkpoint(path, timedelta(hours=6))
+
+    assert list(checkpoint) == ["alpha"]
+    assert checkpoint["alpha"] == repo_data("alpha")
+    assert (
+        collect_metrics.load_checkpoint(tmp_path / "missing", timedelta(hours=6)) == {}
+    )
+
+
+def test_no_release_cache_is_trusted_until_a_push_or_the_ttl(tmp_path: Path) -> None:
+    path = tmp_path / "no-releases.json"
+    cache = collect_metrics.NoReleaseCache(path)
+    cache.add("acme/alpha", "2025-01-02T03:04:05Z")
+    cache.add("acme/beta", "2025-01-02T03:04:05Z")
+    cache.discard("acme/beta")
+    cache.save()
+
+    reloaded = collect_metrics.NoReleaseCache(path)
+    assert reloaded.known_missing("acme/alpha", "2025-01-02T03:04:05Z")
+    assert not reloaded.known_missing("acme/alpha", "2025-02-01T00:00:00Z")
+    assert not reloaded.known_missing("acme/beta", "2025-01-02T03:04:05Z")
+    assert reloaded.skipped == 1
+
+    expired = collect_metrics.NoReleaseCache(path, ttl=timedelta(seconds=-1))
+    assert not expired.known_missing("acme/alpha", "2025-01-02T03:04:05Z")
+
+
+def test_no_release_cache_can_be_shared_by_worker_threads(tmp_path: Path) -> None:
+    cache = collect_metrics.NoReleaseCache(tmp_path / "no-releases.json")
+    names = [f"acme/repo-{index}" for index in range(2000)]
+
+    def probe(name: str) -> bool:
+        cache.add(name, "2025-01-02T03:04:05Z")
+        return cache.known_missing(name, "2025-01-02T03:04:05Z")
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        assert all(executor.map(probe, names))
+
+    assert cache.skipped == len(names)
+    assert sorted(cache.entries) == sorted(names)
+
+
+def test_required_paths_is_the_union_of_the_declared_paths(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(collect_metrics, "DETECTORS", [])
+
+    @collect_metrics.register_detector(
+        "lint_config", presence_paths=["a", "b"], content_paths=["c"]
+    )
+    def detect_first(files: collect_metrics.RepoFiles) -> str:
+        return "first"
+
+    @collect_metrics.register_detector(
+        "ci_setup", presence_paths=["c", "d"], content_paths=["b"]
+    )
+    def detect_second(files: collect_metrics.RepoFiles) -> str:
+        return "second"
+
+    assert [detector.detect for detector in collect_metrics.DETECTORS] == [
+        detect_first,
+        detect_second,
+    ]
+    assert collect_metrics.required_paths() == {
+        "a": False,
+        "b": True,
+        "c": True,
+        "d": False,
+    }
+
+
+def test_detectors_run_on_the_files_in_memory(tmp_path: Path) -> None:
+    blob_store = BlobStore(tmp_path / "blobs")
+    blob_store.put_text("bazelversion-sha", "# pinned\n7.4.1\n")
+    files = collect_metrics.RepoFiles(
+        None,
+        "acme/alpha",
+        paths={".bazelversion", ".github/workflows", "pytest.ini"},
+        blob_shas={".bazelversion": "bazelversion-sha"},
+        blob_store=blob_store,
+    )
+
+    assert collect_metrics.detect_repo_files(files) == {
+        "bazel_version": "7.4.1",
+        "lint_config": "❌ no",
+        "ci_setup": "✅ yes",
+        "test_coverage": "✅ yes",
+    }
+    assert (
+        blob_store.result(collect_metrics.BAZELVERSION_PARSER, "bazelversion-sha")
+        == "7.4.1"
+    )
+
+
+def test_graphql_files_query_selects_every_required_path_per_repository() -> None:
+    paths = collect_metrics.required_paths()
+
+    query = collect_metrics.build_graphql_files_query(2)
+
+    assert query.startswith("query($owner: String!, $n0: String!, $n1: String!) {")
+    assert query.count("repository(owner: $owner, name: $n") == 2
+    assert query.count("object(expression:") == 2 * len(paths)
+    assert query.count("... on Blob { oid }") == 2 * sum(paths.values())
+    for index, path in enumerate(paths):
+        assert f"f{index}: object(expression: {json.dumps(f'HEAD:{path}')})" in query
+
+
+def test_files_from_graphql_maps_the_aliases_back_to_paths() -> None:
+    paths = list(collect_metrics.required_paths())
+    node = {
+        "f0": {"__typename": "Blob", "oid": "first-sha"},
+        f"f{len(paths) - 1}": {"__typename": "Tree"},
+    }
+
+    files = collect_metrics.files_from_graphql(None, "acme/alpha", node)
+
+    assert files.paths == {paths[0], paths[-1]}
+    assert files.blob_shas == {paths[0]: "first-sha"}
+
+
+def test_run_bounded_yields_in_completion_order() -> None:
+    release_slow = threading.Event()
+
+    def run(item: str) -> str:
+        if item == "slow":
+            assert release_slow.wait(timeout=5)
+        return item
+
+    results = cast(
+        "Iterator[str]", collect_metrics.run_bounded(run, ["slow", "fast"], 2)
+    )
+
+    assert next(results) == "fast"
+    release_slow.set()
+    assert list(results) == ["slow"]
+
+    assert list(collect_metrics.run_bounded(str.upper, ["a", "b", "c"], 1)) == [
+        "A",
+        "B",
+        "C",
+    ]
+
+
+def test_run_bounded_consumes_items_lazily() -> None:
+    consumed: list[int] = []
+
+    def items() -> Iterator[int]:
+        for item in range(100):
+            consumed.append(item)
+            yield item
+
+    results = cast(
+        "Iterator[int]", collect_metrics.run_bounded(lambda item: item, items(), 3)
+    )
+    first = next(results)
+
+    assert len(consumed) <= 2 * 3
+    assert sorted([first, *results]) == list(range(100))
+
+
+def collect_rest(
+    client: FakeClient, **options: Any
+) -> list[tuple[collect_metrics.RepoData, bool]]:
+    return list(
+        collect_metrics.iter_org_repo_data(
+            cast("GitHubClient", client), client.org, **options
+        )
+    )
+
+
+def collect_report(
+    tmp_path: Path, client: FakeClient, workers: int
+) -> tuple[list[str], bytes]:
+    """Collect ``client``'s org into a report; return the collection order and the report."""
+    output = tmp_path / f"metrics-{workers}.md"
+    snapshot_file = tmp_path / f"snapshot-{workers}.jsonl"
+    order: list[str] = []
+    with collect_metrics.ReportWriter(output, snapshot_file, org=client.org) as writer:
+        for record, _ in collect_rest(client, workers=workers):
+            writer.add(record)
+            order.append(record.name)
+        writer.finish()
+    return order, output.read_bytes()
+
+
+def test_concurrent_collection_writes_the_same_report_as_a_sequential_run(
+    tmp_path: Path,
+) -> None:
+    repos = fake_org()
+    # Later repositories answer faster, so workers finish them out of order.
+    delays = {
+        repo.name: 0.003 * (len(repos) - index) for index, repo in enumerate(repos)
+    }
+
+    sequential_order, sequential = collect_report(
+        tmp_path, FakeClient(repos, delays=delays), 1
+    )
+    concurrent_order, concurrent = collect_report(
+        tmp_path, FakeClient(repos, delays=delays), 4
+    )
+
+    assert sequential_order == [repo.name for repo in repos]
+    assert concurrent_order != sequential_order
+    assert sorted(concurrent_order) == sorted(sequential_order)
+    assert concurrent == sequential
+
+
+def load_files(client: FakeClient, name: str) -> collect_metrics.RepoFiles:
+    return collect_metrics.load_repo_files(client, f"{client.org}/{name}", "main")
+
+
+@pytest.mark.parametrize("status", [404, 409])
+def test_missing_branch_or_empty_repository_has_no_files(status: int) -> None:
+    client = FakeClient([FakeRepo("empty", tree_status=status)])
+
+    files = load_files(client, "empty")
+
+    assert files.paths == set()
+    assert collect_metrics.detect_repo_files(files) == {
+        "bazel_version": "⚠️ missing",
+        "lint_config": "❌ no",
+        "ci_setup": "❌ no",
+        "test_coverage": "❌ no",
+    }
+    assert client.requests == ["/repos/acme/empty/git/trees/main"]
+
+
+@pytest.mark.parametrize(
+    "repo",
+    [
+        FakeRepo("big", tree_truncated=True, files={".github/workflows/ci.yml": ""}),
+        FakeRepo("broken", tree_status=502, files={".github/workflows/ci.yml": ""}),
+    ],
+    ids=["truncated", "server-error"],
+)
+def test_unusable_tree_falls_back_to_contents_probes(repo: FakeRepo) -> None:
+    client = FakeClient([repo])
+
+    files = load_files(client, repo.name)
+
+    assert files.paths is None
+    assert files.exists(".github/workflows")
+    assert not files.exists("Jenkinsfile")
+    assert client.requests_to(repo.name, "contents") == [
+        f"/repos/acme/{repo.name}/contents/.github/workflows",
+        f"/repos/acme/{repo.name}/contents/Jenkinsfile",
+    ]
+
+
+def test_tree_answers_presence_checks_and_only_bazel_files_are_downloaded() -> None:
+    client = FakeClient(
+        [
+            FakeRepo(
+                "alpha",
+                files={
+                    "WORKSPACE": 'bazel_version = "6.5.0"\n',
+                    "WORKSPACE.bzlmod": "",
+                    ".github/workflows/ci.yml": "on: push\n",
+                    ".editorconfig": "root = true\n",
+                    "coverage.xml": "<coverage/>\n",
+                    "src/main.py": "print()\n",
+                },
+            )
+        ]
+    )
+
+    files = load_files(client, "alpha")
+
+    assert files.exists(".github/workflows")
+    assert collect_metrics.detect_repo_files(files) == {
+        "bazel_version": "6.5.0",
+        "lint_config": "✅ yes",
+        "ci_setup": "✅ yes",
+        "test_coverage": "✅ yes",
+    }
+    assert client.requests_to("alpha", "contents") == []
+    repo = client.repos["alpha"]
+    assert client.requests_to("alpha", "git/blobs") == [
+        f"/repos/acme/alpha/git/blobs/{repo.blob_sha('WORKSPACE')}"
+    ]
+
+
+def collect_graphql(
+    client: FakeClient, org: str | None = None, **options: Any
+) -> list[tuple[collect_metrics.RepoData, bool]]:
+    return list(
+        collect_metrics.iter_org_repo_data_graphql(
+            cast("GitHubClient", client), org or client.org, **options
+        )
+    )
+
+
+def test_graphql_backend_collects_the_same_data_as_the_rest_backend() -> None:
+    rest = collect_rest(FakeClient(fake_org()))
+    graphql = collect_graphql(FakeClient(fake_org()))
+
+    assert {record.name: record for record, _ in graphql} == {
+        record.name: record for record, _ in rest
+    }
+
+
+def test_graphql_backend_follows_the_page_cursor() -> None:
+    repos = fake_org()
+    client = FakeClient(repos)
+
+    records = collect_graphql(client, page_size=5)
+
+    assert [record.name for record, _ in records] == [repo.name for repo in repos]
+    # Three pages of repositories, each followed by one files query.
+    assert client.requests.count("/graphql") == 6
+
+
+def test_graphql_backend_rejects_an_unknown_organization() -> None:
+    with pytest.raises(SystemExit, match="Unknown GitHub organization other"):
+        collect_graphql(FakeClient(fake_org()), "other")
+
+
+def collect_one(
+    client: FakeClient, previous: collect_metrics.RepoData | None = None
+) -> tuple[collect_metrics.RepoData, bool]:
+    """Collect the only repository of ``client`` and forget the listing request."""
+    summary = next(client.paginate(f"/users/{client.org}/repos"))
+    client.requests.clear()
+    return collect_metrics.collect_repo_data(client, summary, previous, counts=(1, 2))
+
+
+def test_unchanged_pushed_at_reuses_detectors_without_commit_or_tree_requests() -> None:
+    repo = FakeRepo("alpha", files={"Jenkinsfile": ""})
+    client = FakeClient([repo])
+    previous, _ = collect_one(client)
+    repo.files = {}
+    repo.stars = 30
+    repo.release = "2025-03-01T00:00:00Z"
+
+    record, reused = collect_one(client, previous)
+
+    assert reused
+    assert record.ci_setup == "✅ yes"
+    assert (record.stars, record.latest_release) == (30, "2025-03-01")
+    assert client.requests_to("alpha", "commits") == []
+    assert client.requests_to("alpha", "git/trees") == []
+
+
+def test_moved_pushed_at_with_the_same_head_skips_the_tree() -> None:
+    repo = FakeRepo("alpha", files={"Jenkinsfile": ""})
+    client = FakeClient([repo])
+    previous, _ = collect_one(client)
+    repo.pushed_at = "2025-02-01T00:00:00Z"
+
+    record, reused = collect_one(client, previous)
+
+    assert reused
+    assert record.pushed_at == "2025-02-01T00:00:00Z"
+    assert client.requests_to("alpha", "commits") == ["/repos/acme/alpha/commits/main"]
+    assert client.requests_to("alpha", "git/trees") == []
+
+
+def test_changed_head_runs_the_detectors_again() -> None:
+    repo = FakeRepo("alpha", files={"Jenkinsfile": ""})
+    client = FakeClient([repo])
+    previous, _ = collect_one(client)
+    repo.pushed_at = "2025-02-01T00:00:00Z"
+    repo.head_sha = "head-2"
+    repo.files = {".coveragerc": ""}
+
+    record, reused = collect_one(client, previous)
+
+    assert not reused
+    assert (record.ci_setup, record.test_coverage) == ("❌ no", "✅ yes")
+    assert record.head_sha == "head-2"
+    assert client.requests_to("alpha", "git/trees") == [
+        "/repos/acme/alpha/git/trees/head-2"
+    ]
+
+
+def test_open_issue_and_pr_counts_are_aggregated_over_all_pages() -> None:
+    repos = fake_org()
+    repos[0].open_issues = 7
+    client = FakeClient(repos)
+
+    counts = collect_metrics.count_open_issues_and_prs(client, "acme", page_size=5)
+
+    assert counts == {repo.name: (repo.open_issues, repo.open_prs) for repo in repos}
+    assert counts["bazel-repo"] == (7, 2)
+    assert client.requests == ["/graphql"] * 3
+
+
+@pytest.mark.parametrize(
+    ("listed_open_issues", "open_prs", "open_issues"),
+    [(5, 2, 3), (1, 2, 0)],
+)
+def test_repositories_without_bulk_counts_count_their_pull_requests(
+    listed_open_issues: int,
+    open_prs: int,
+    open_issues: int,
+) -> None:
+    client = FakeClient(
+        [FakeRepo("alpha", listed_open_issues=listed_open_issues, open_prs=open_prs)],
+        graphql_available=False,
+    )
+
+    [(record, _)] = collect_rest(client)
+
+    assert (record.open_issues, record.open_prs) == (open_issues, open_prs)
+    assert client.requests_to("alpha", "pulls") == ["/repos/acme/alpha/pulls"]
+
+
+def test_trend_baselines_ignore_samples_older_than_twice_the_window(
+    tmp_path: Path,
+) -> None:
+    def sample(repo: str, days_ago: int, open_issues: int) -> MetricsSample:
+        date = (collect_metrics.NOW - timedelta(days=days_ago)).date().isoformat()
+        return MetricsSample(repo, date, open_issues, 0, 0, 0, None)
+
+    with MetricsHistory(tmp_path / "history.sqlite3") as history:
+        history.record(
+            [
+                sample("fresh", 9, 4),
+                sample("fresh", 40, 1),
+                # The history of "stale" has a gap of several months.
+                sample("stale", 120, 50),
+            ]
+        )
+
+        baselines = collect_metrics.load_trend_baselines(history)
+
+    fresh = collect_metrics.render_row(
+        repo_data("fresh", open_issues=6), baselines=baselines
+    )
+    stale = collect_metrics.render_row(
+        repo_data("stale", open_issues=6), baselines=baselines
+    )
+    assert "| 6 | +2 | +5 |" in fresh
+    assert "| 6 | - | - |" in stale
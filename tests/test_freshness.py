@@ -0,0 +1,82 @@
+from pathlib import Path
+from types import SimpleNamespace
+
+from profile_readme_generator.freshness import (
+    SourceState,
+    load_source_state,
+    output_is_current,
+    probe_source_state,
+    save_source_state,
+)
+from profile_readme_generator.github_api import ApiResponse
+
+
+def test_output_is_current_ignores_line_endings(tmp_path: Path) -> None:
+    path = tmp_path / "README.md"
+
+    assert not output_is_current(path, "# Title\n")
+
+    path.write_bytes(b"# Title\r\nBody\r\n")
+
+    assert output_is_current(path, "# Title\nBody\n")
+    assert not output_is_current(path, "# Title\nOther body\n")
+
+
+def test_source_state_round_trips_and_ignores_other_versions(tmp_path: Path) -> None:
+    path = tmp_path / "state.json"
+    state = SourceState(
+        repository_count=2,
+        latest_updated_at="2025-01-02T00:00:00Z",
+        properties_fingerprint="p",
+        inputs_fingerprint="i",
+    )
+
+    assert load_source_state(path) is None
+
+    save_source_state(path, state)
+
+    assert load_source_state(path) == state
+
+    path.write_text('{"version": 999}', encoding="utf-8")
+
+    assert load_source_state(path) is None
+
+
+def test_probe_source_state_reads_count_latest_update_and_properties() -> None:
+    def request(method: str, url: str, **kwargs: object) -> ApiResponse:
+        assert (method, url) == ("GET", "/orgs/o/repos")
+        assert kwargs["params"] == {
+            "sort": "updated",
+            "direction": "desc",
+            "per_page": 1,
+        }
+        return ApiResponse(
+            status=200,
+            headers={"link": '<https://x/orgs/o/repos?per_page=1&page=42>; rel="last"'},
+            body=b'[{"name": "tools", "updated_at": "2025-01-02T00:00:00Z"}]',
+        )
+
+    def paginate(url: str, **kwargs: object) -> list[object]:
+        assert url == "/orgs/o/properties/values"
+        return [
+            SimpleNamespace(repository_name="tools", properties={"category": "A"}),
+            SimpleNamespace(repository_name="docs", properties={}),
+        ]
+
+    client = SimpleNamespace(request=request, paginate=paginate)
+
+    state = probe_source_state(client, "o", inputs_fingerprint="i")  # type: ignore[arg-type]
+    changed = probe_source_state(
+        SimpleNamespace(
+            request=request,
+            paginate=lambda url, **kwargs: [
+                SimpleNamespace(repository_name="tools", properties={"category": "B"})
+            ],
+        ),  # type: ignore[arg-type]
+        "o",
+        inputs_fingerprint="i",
+    )
+
+    assert state.repository_count == 42
+    assert state.latest_updated_at == "2025-01-02T00:00:00Z"
+    assert state.properties_fingerprint != changed.properties_fingerprint
@@ -10,14 +10,17 @@ from profile_readme_generator.generator import (
     ReadmeConfig,
     SubcategoryConfig,
     build_repo_entry,
+    config_index_for,
     fetch_repositories,
     fetch_repository_descriptions,
     get_gh_auth_token,
     group_repositories,
+    iter_category_sections,
     load_config,
     normalize_group_name,
     print_status,
     render_readme,
+    render_readme_to,
     resolve_github_token,
 )
 
@@ -91,6 +94,27 @@ def test_group_repositories_matches_configured_category_order_case_insensitively
     assert list(grouped) == ["modules", "infrastructure", "website", "Uncategorized"]
 
 
+def test_group_repositories_keeps_input_order_for_equal_keys_and_reuses_config_index() -> None:
+    repos = [
+        RepoEntry("Tools", "first", "Infra", "General"),
+        RepoEntry("docs", "desc", "infra", "General"),
+        RepoEntry("tools", "second", "Infra", "General"),
+        RepoEntry("score", "desc", "Modules", "General"),
+    ]
+    config = ReadmeConfig(categories=(CategoryConfig("Modules", "Module repos"),))
+    config_index = config_index_for(config)
+
+    grouped = group_repositories(iter(repos), config_index=config_index)
+
+    assert config_index_for(config) is config_index
+    assert grouped == group_repositories(repos, config=config)
+    assert list(grouped) == ["Modules", "Infra", "infra"]
+    assert [entry.description for entry in grouped["Infra"]["General"]] == [
+        "first",
+        "second",
+    ]
+
+
 def test_build_repo_entry_uses_custom_properties_and_description_fallback() -> None:
     entry = build_repo_entry(
         repository_name="tools",
@@ -164,6 +188,62 @@ def test_render_readme_uses_simple_markdown_sections() -> None:
     assert markdown.endswith("\n")
 
 
+@pytest.mark.parametrize(
+    ("sections", "template"),
+    [
+        (
+            [["### A", "", "text", ""], ["### B", ""]],
+            "# Title\n\n{{ repo_sections }}\n",
+        ),
+        ([["### A", ""]], "before {{ repo_sections }} after  \n\n"),
+        ([["### A", "  "], [], ["### C"]], "{{ repo_sections }}|{{ repo_sections }}"),
+        ([[], ["### B", ""]], "# Title\r\n{{ repo_sections }}\r\n"),
+        ([], "# Title\n\n{{ repo_sections }}\n\n"),
+        ([["### A"]], "# No placeholder \n"),
+        ([], "  \n"),
+    ],
+)
+def test_iter_category_sections_matches_joining_the_whole_document(
+    sections: list[list[str]],
+    template: str,
+) -> None:
+    lines: list[str] = []
+    for index, section in enumerate(sections):
+        if index > 0:
+            lines.extend(("---", ""))
+        lines.extend(section)
+    expected = template.replace("{{ repo_sections }}", "\n".join(lines).rstrip())
+
+    sections_by_category = {f"C{index}": lines for index, lines in enumerate(sections)}
+
+    assert "".join(
+        iter_category_sections(
+            template,
+            list(sections_by_category),
+            sections_by_category.__getitem__,
+            repo_count=len(sections),
+        )
+    ) == (expected.rstrip() + "\n")
+
+
+def test_render_readme_to_streams_one_section_at_a_time() -> None:
+    repos = [
+        RepoEntry(f"repo-{index:03d}", "desc", f"Category {index % 4}", "General")
+        for index in range(200)
+    ]
+    template = "# Title\n\n{{ repo_sections }}\n"
+    chunks: list[str] = []
+
+    render_readme_to(
+        SimpleNamespace(write=chunks.append),  # type: ignore[arg-type]
+        repos,
+        template=template,
+    )
+
+    assert "".join(chunks) == render_readme(repos, template=template)
+    assert max(map(len, chunks)) < len("".join(chunks)) / 3
+
+
 def test_render_repo_row_escapes_markdown_table_metacharacters() -> None:
     row = generator.render_repo_row(
         RepoEntry("tools", "Line 1 | Line 2\nLine 3", "Infrastructure", "General")
@@ -0,0 +1,338 @@
+import json
+import threading
+from collections.abc import Callable, Iterator
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from profile_readme_generator.github_api import (
+    GitHubApiError,
+    GitHubClient,
+    GraphQLOrganizationClient,
+    OrganizationClient,
+    following_page_urls,
+    parse_link_header,
+)
+from profile_readme_generator.http_cache import ResponseCache
+from profile_readme_generator.listings import (
+    RepositoryPropertyValues,
+    RepositorySummary,
+)
+
+Route = Callable[[BaseHTTPRequestHandler], tuple[int, dict[str, str], object]]
+
+
+class FakeGitHub:
+    def __init__(self) -> None:
+        self.routes: dict[str, Route] = {}
+        self.requests: list[tuple[str, dict[str, str]]] = []
+        self.url = ""
+
+    def add(self, path: str, route: Route) -> None:
+        self.routes[path] = route
+
+
+@pytest.fixture
+def fake_github() -> Iterator[FakeGitHub]:
+    fake = FakeGitHub()
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self) -> None:
+            self.handle_request()
+
+        def do_POST(self) -> None:
+            self.handle_request()
+
+        def handle_request(self) -> None:
+            fake.requests.append((self.path, dict(self.headers)))
+            route = fake.routes.get(self.path)
+            if route is None:
+                status, headers, payload = 404, {}, {"message": "Not Found"}
+            else:
+                status, headers, payload = route(self)
+            body = b"" if payload is None else json.dumps(payload).encode()
+            self.send_response(status)
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format: str, *args: object) -> None:
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(
+        target=server.serve_forever,
+        kwargs={"poll_interval": 0.01},
+        daemon=True,
+    )
+    thread.start()
+    fake.url = f"http://127.0.0.1:{server.server_address[1]}"
+    yield fake
+    server.shutdown()
+    server.server_close()
+
+
+def etag_route(payload: object, etag: str = '"v1"') -> Route:
+    def route(handler: BaseHTTPRequestHandler) -> tuple[int, dict[str, str], object]:
+        if handler.headers.get("If-None-Match") == etag:
+            return 304, {"ETag": etag}, None
+        return 200, {"ETag": etag}, payload
+
+    return route
+
+
+def test_parse_link_header_maps_relations_to_urls() -> None:
+    header = (
+        '<https://api.github.com/orgs/x/repos?page=2>; rel="next", '
+        '<https://api.github.com/orgs/x/repos?page=5>; rel="last"'
+    )
+
+    assert parse_link_header(header) == {
+        "next": "https://api.github.com/orgs/x/repos?page=2",
+        "last": "https://api.github.com/orgs/x/repos?page=5",
+    }
+
+
+def test_paginate_follows_next_links(fake_github: FakeGitHub) -> None:
+    fake_github.add(
+        "/items?per_page=100",
+        lambda _: (
+            200,
+            {"Link": f'<{fake_github.url}/items?page=2>; rel="next"'},
+            [1, 2],
+        ),
+    )
+    fake_github.add("/items?page=2", lambda _: (200, {}, [3]))
+
+    with GitHubClient("token", api_url=fake_github.url) as client:
+        assert list(client.paginate("/items")) == [1, 2, 3]
+        assert client.requests_sent == 2
+
+
+def test_paginate_fetches_remaining_pages_concurrently(
+    fake_github: FakeGitHub,
+) -> None:
+    last_page_url = f"{fake_github.url}/items?per_page=100&page=3"
+    fake_github.add(
+        "/items?per_page=100",
+        lambda _: (
+            200,
+            {
+                "Link": f'<{fake_github.url}/items?per_page=100&page=2>; rel="next", '
+                f'<{last_page_url}>; rel="last"'
+            },
+            [1, 2],
+        ),
+    )
+    # Each of pages 2 and 3 only answers once the other one was requested too.
+    both_requested = threading.Barrier(2, timeout=5)
+
+    def page(items: list[int]) -> Route:
+        def route(_: BaseHTTPRequestHandler) -> tuple[int, dict[str, str], object]:
+            both_requested.wait()
+            return 200, {}, items
+
+        return route
+
+    fake_github.add("/items?per_page=100&page=2", page([3, 4]))
+    fake_github.add("/items?per_page=100&page=3", page([5]))
+
+    with GitHubClient("token", api_url=fake_github.url) as client:
+        assert list(client.paginate("/items", workers=4)) == [1, 2, 3, 4, 5]
+        assert client.requests_sent == 3
+
+
+def test_paginate_projects_the_items_of_every_page(fake_github: FakeGitHub) -> None:
+    fake_github.add(
+        "/items?per_page=100",
+        lambda _: (
+            200,
+            {"Link": f'<{fake_github.url}/items?page=2>; rel="next"'},
+            [{"id": 1, "extra": "x"}, {"id": 2}],
+        ),
+    )
+    fake_github.add("/items?page=2", lambda _: (200, {}, [{"id": 3}]))
+
+    with GitHubClient("token", api_url=fake_github.url) as client:
+        assert list(client.paginate("/items", project=lambda item: item["id"])) == [
+            1,
+            2,
+            3,
+        ]
+
+
+def test_following_page_urls_keeps_other_parameters() -> None:
+    assert following_page_urls("https://api.github.com/x?per_page=100&page=3&q=a") == [
+        "https://api.github.com/x?per_page=100&page=2&q=a",
+        "https://api.github.com/x?per_page=100&page=3&q=a",
+    ]
+    assert following_page_urls("https://api.github.com/x?cursor=abc") == []
+
+
+def test_count_reads_last_page_number(fake_github: FakeGitHub) -> None:
+    fake_github.add(
+        "/repos/o/r/pulls?state=open&per_page=1",
+        lambda _: (
+            200,
+            {"Link": f'<{fake_github.url}/x?per_page=1&page=17>; rel="last"'},
+            [{}],
+        ),
+    )
+
+    with GitHubClient("token", api_url=fake_github.url) as client:
+        assert client.count("/repos/o/r/pulls", {"state": "open"}) == 17
+
+
+def test_request_raises_api_error_with_message(fake_github: FakeGitHub) -> None:
+    with (
+        GitHubClient("token", api_url=fake_github.url) as client,
+        pytest.raises(GitHubApiError) as exc_info,
+    ):
+        client.get_json("/missing")
+
+    assert exc_info.value.status == 404
+    assert exc_info.value.message == "Not Found"
+
+
+def test_graphql_raises_on_errors(fake_github: FakeGitHub) -> None:
+    fake_github.add(
+        "/graphql",
+        lambda _: (200, {}, {"data": None, "errors": [{"message": "bad field"}]}),
+    )
+
+    with (
+        GitHubClient("token", api_url=fake_github.url) as client,
+        pytest.raises(GitHubApiError, match="bad field"),
+    ):
+        client.graphql("query { x }", {})
+
+
+def test_cached_responses_are_revalidated_with_etag(
+    fake_github: FakeGitHub,
+    tmp_path: Path,
+) -> None:
+    fake_github.add("/orgs/o/repos?per_page=100", etag_route([{"name": "a"}]))
+
+    with GitHubClient(
+        "token", api_url=fake_github.url, cache=ResponseCache(tmp_path)
+    ) as client:
+        assert list(client.paginate("/orgs/o/repos")) == [{"name": "a"}]
+
+    with GitHubClient(
+        "token", api_url=fake_github.url, cache=ResponseCache(tmp_path)
+    ) as client:
+        assert list(client.paginate("/orgs/o/repos")) == [{"name": "a"}]
+        assert client.not_modified == 1
+
+    assert fake_github.requests[0][1].get("If-None-Match") is None
+    assert fake_github.requests[1][1]["If-None-Match"] == '"v1"'
+
+
+def test_cache_is_not_shared_between_tokens(
+    fake_github: FakeGitHub,
+    tmp_path: Path,
+) -> None:
+    fake_github.add("/orgs/o/repos?per_page=100", etag_route([]))
+    cache = ResponseCache(tmp_path)
+
+    with GitHubClient("first", api_url=fake_github.url, cache=cache) as client:
+        list(client.paginate("/orgs/o/repos"))
+    with GitHubClient("second", api_url=fake_github.url, cache=cache) as client:
+        list(client.paginate("/orgs/o/repos"))
+
+    assert fake_github.requests[1][1].get("If-None-Match") is None
+
+
+def test_request_refuses_foreign_hosts() -> None:
+    client = GitHubClient("token")
+
+    with pytest.raises(ValueError, match=r"example\.com"):
+        client.request("GET", "https://example.com/steal")
+
+
+def test_organization_client_decodes_listings(fake_github: FakeGitHub) -> None:
+    fake_github.add(
+        "/orgs/o/repos?per_page=100",
+        lambda _: (
+            200,
+            {},
+            [{"name": "tools", "description": None, "archived": False, "id": 1}],
+        ),
+    )
+    fake_github.add(
+        "/orgs/o/properties/values?per_page=100",
+        lambda _: (
+            200,
+            {},
+            [
+                {
+                    "repository_name": "tools",
+                    "properties": [{"property_name": "category", "value": "Infra"}],
+                }
+            ],
+        ),
+    )
+
+    with GitHubClient("token", api_url=fake_github.url) as client:
+        organization = OrganizationClient(client, "o")
+
+        assert list(organization.get_repos()) == [
+            RepositorySummary(name="tools", description=None, archived=False)
+        ]
+        assert list(organization.list_custom_property_values()) == [
+            RepositoryPropertyValues("tools", {"category": "Infra"})
+        ]
+
+
+def test_graphql_organization_client_reads_both_listings_from_one_query(
+    fake_github: FakeGitHub,
+) -> None:
+    def active_repositories(
+        handler: BaseHTTPRequestHandler,
+    ) -> tuple[int, dict[str, str], object]:
+        body = json.loads(handler.rfile.read(int(handler.headers["Content-Length"])))
+        assert "isArchived: false" in body["query"]
+        first_page = body["variables"]["after"] is None
+        node: dict[str, Any] = {
+            "name": "tools" if first_page else "docs",
+            "description": "Tooling" if first_page else None,
+            "repositoryCustomPropertyValues": {
+                "nodes": (
+                    [{"propertyName": "category", "value": "Infra"}]
+                    if first_page
+                    else []
+                )
+            },
+        }
+        page_info: dict[str, Any] = {"hasNextPage": first_page, "endCursor": "c1"}
+        return (
+            200,
+            {},
+            {
+                "data": {
+                    "organization": {
+                        "repositories": {"pageInfo": page_info, "nodes": [node]}
+                    }
+                }
+            },
+        )
+
+    fake_github.add("/graphql", active_repositories)
+
+    with GitHubClient("token", api_url=fake_github.url) as client:
+        organization = GraphQLOrganizationClient(client, "o")
+
+        assert list(organization.get_repos()) == [
+            RepositorySummary(name="tools", description="Tooling", archived=False),
+            RepositorySummary(name="docs", description=None, archived=False),
+        ]
+        assert list(organization.list_custom_property_values()) == [
+            RepositoryPropertyValues("tools", {"category": "Infra"})
+        ]
+        assert client.requests_sent == 2
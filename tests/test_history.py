@@ -0,0 +1,61 @@
+from pathlib import Path
+
+from profile_readme_generator.history import MetricsHistory, MetricsSample
+
+
+def sample(repo: str, date: str, open_issues: int) -> MetricsSample:
+    return MetricsSample(
+        repo=repo,
+        date=date,
+        open_issues=open_issues,
+        open_prs=0,
+        stars=1,
+        forks=0,
+        latest_release=None,
+    )
+
+
+def test_samples_as_of_returns_latest_sample_per_repository(tmp_path: Path) -> None:
+    with MetricsHistory(tmp_path / "history.sqlite3") as history:
+        history.record(
+            [
+                sample("a", "2025-01-01", 1),
+                sample("a", "2025-01-05", 5),
+                sample("a", "2025-01-09", 9),
+                sample("b", "2025-01-02", 2),
+            ]
+        )
+
+        as_of = history.samples_as_of("2025-01-08")
+
+    assert as_of == {
+        "a": sample("a", "2025-01-05", 5),
+        "b": sample("b", "2025-01-02", 2),
+    }
+
+
+def test_recording_a_day_again_replaces_its_sample(tmp_path: Path) -> None:
+    path = tmp_path / "history.sqlite3"
+    with MetricsHistory(path) as history:
+        history.record([sample("a", "2025-01-01", 1)])
+    with MetricsHistory(path) as history:
+        history.record([sample("a", "2025-01-01", 3)])
+
+        assert history.samples_as_of("2025-01-01") == {
+            "a": sample("a", "2025-01-01", 3)
+        }
+
+
+def test_samples_as_of_leaves_out_samples_before_not_before(tmp_path: Path) -> None:
+    with MetricsHistory(tmp_path / "history.sqlite3") as history:
+        history.record(
+            [
+                sample("a", "2025-01-01", 1),
+                sample("a", "2025-01-05", 5),
+                sample("b", "2025-01-02", 2),
+            ]
+        )
+
+        as_of = history.samples_as_of("2025-01-08", not_before="2025-01-04")
+
+    assert as_of == {"a": sample("a", "2025-01-05", 5)}
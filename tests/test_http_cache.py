@@ -0,0 +1,64 @@
+import time
+from pathlib import Path
+
+import pytest
+
+from profile_readme_generator.http_cache import ResponseCache
+
+
+def store(cache: ResponseCache, key: str, body: bytes = b"{}") -> None:
+    cache.put(
+        key,
+        url=f"/{key}",
+        body=body,
+        headers={"link": ""},
+        etag=f'"{key}"',
+        last_modified=None,
+    )
+
+
+def test_response_cache_round_trips_through_disk(tmp_path: Path) -> None:
+    cache = ResponseCache(tmp_path)
+    store(cache, "repos", b"[1]")
+    cache.save()
+
+    cached = ResponseCache(tmp_path).get("repos")
+
+    assert cached is not None
+    assert cached.body == b"[1]"
+    assert cached.etag == '"repos"'
+    assert cached.headers == {"link": ""}
+
+
+def test_response_cache_ignores_responses_without_validators(tmp_path: Path) -> None:
+    cache = ResponseCache(tmp_path)
+    cache.put("key", url="/", body=b"{}", headers={}, etag=None, last_modified=None)
+
+    assert cache.get("key") is None
+
+
+def test_response_cache_expires_entries_after_ttl(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    cache = ResponseCache(tmp_path, ttl_seconds=60)
+    store(cache, "old")
+    now = time.time()
+    monkeypatch.setattr(time, "time", lambda: now + 61)
+
+    assert cache.get("old") is None
+
+
+def test_response_cache_evicts_least_recently_used_entries(tmp_path: Path) -> None:
+    cache = ResponseCache(tmp_path, max_bytes=8)
+    store(cache, "first", b"1234")
+    store(cache, "second", b"1234")
+    store(cache, "third", b"1234")
+    cache.get("first")
+
+    cache.save()
+
+    reloaded = ResponseCache(tmp_path, max_bytes=8)
+    assert reloaded.get("second") is None
+    assert reloaded.get("first") is not None
+    assert reloaded.get("third") is not None
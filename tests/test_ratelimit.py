@@ -0,0 +1,158 @@
+from collections.abc import Callable, Iterator
+
+import pytest
+
+from profile_readme_generator.ratelimit import (
+    AdaptiveConcurrencyLimiter,
+    RawResponse,
+    RequestScheduler,
+    TokenBucket,
+    resource_for_path,
+)
+
+
+class FakeTime:
+    def __init__(self) -> None:
+        self.now = 1_000.0
+        self.sleeps: list[float] = []
+
+    def clock(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+def make_scheduler(fake_time: FakeTime, **kwargs: object) -> RequestScheduler:
+    return RequestScheduler(
+        clock=fake_time.clock,
+        wall_clock=fake_time.clock,
+        sleep=fake_time.sleep,
+        jitter=lambda: 1.0,
+        **kwargs,  # type: ignore[arg-type]
+    )
+
+
+def responses(*items: RawResponse) -> Callable[[], RawResponse]:
+    iterator: Iterator[RawResponse] = iter(items)
+    return lambda: next(iterator)
+
+
+def test_token_bucket_waits_once_burst_is_spent() -> None:
+    fake_time = FakeTime()
+    bucket = TokenBucket(2.0, 2, clock=fake_time.clock, sleep=fake_time.sleep)
+
+    for _ in range(3):
+        bucket.acquire()
+
+    assert fake_time.sleeps == [0.5]
+
+
+def test_limiter_grows_after_fast_successes_and_halves_when_throttled() -> None:
+    limiter = AdaptiveConcurrencyLimiter(initial=2, maximum=8, target_latency=1.0)
+
+    for _ in range(2):
+        limiter.acquire()
+        limiter.release(latency=0.1, throttled=False)
+    assert limiter.limit == 3
+
+    limiter.acquire()
+    limiter.release(latency=0.1, throttled=True)
+    assert limiter.limit == 1
+
+
+def test_limiter_shrinks_on_slow_responses() -> None:
+    limiter = AdaptiveConcurrencyLimiter(initial=4, target_latency=1.0)
+
+    limiter.acquire()
+    limiter.release(latency=5.0, throttled=False)
+
+    assert limiter.limit == 3
+
+
+def test_scheduler_honours_retry_after_on_secondary_rate_limit() -> None:
+    fake_time = FakeTime()
+    scheduler = make_scheduler(fake_time)
+
+    status, _, _ = scheduler.run(
+        "core",
+        responses(
+            (403, {"retry-after": "30"}, b'{"message": "secondary rate limit"}'),
+            (200, {}, b"{}"),
+        ),
+    )
+
+    assert status == 200
+    assert fake_time.sleeps == [30.0]
+    assert scheduler.retries == 1
+
+
+def test_scheduler_waits_for_reset_when_quota_is_exhausted() -> None:
+    fake_time = FakeTime()
+    scheduler = make_scheduler(fake_time)
+    reset = str(int(fake_time.now) + 120)
+
+    status, _, _ = scheduler.run(
+        "core",
+        responses(
+            (403, {"x-ratelimit-remaining": "0", "x-ratelimit-reset": reset}, b""),
+            (200, {}, b"{}"),
+        ),
+    )
+
+    assert status == 200
+    assert fake_time.sleeps == [121.0]
+
+
+def test_scheduler_pauses_before_spending_the_reserved_quota() -> None:
+    fake_time = FakeTime()
+    scheduler = make_scheduler(fake_time, quota_reserve=5)
+    reset = str(int(fake_time.now) + 60)
+    low_quota = {
+        "x-ratelimit-remaining": "5",
+        "x-ratelimit-reset": reset,
+        "x-ratelimit-resource": "core",
+    }
+
+    scheduler.run("core", responses((200, low_quota, b"{}")))
+    scheduler.run("graphql", responses((200, {}, b"{}")))
+    assert fake_time.sleeps == []
+
+    scheduler.run("core", responses((200, {}, b"{}")))
+    assert fake_time.sleeps == [61.0]
+
+
+def test_scheduler_backs_off_exponentially_on_server_errors() -> None:
+    fake_time = FakeTime()
+    scheduler = make_scheduler(fake_time, max_retries=2)
+
+    status, _, _ = scheduler.run(
+        "core",
+        responses((502, {}, b""), (502, {}, b""), (502, {}, b"")),
+    )
+
+    assert status == 502
+    assert fake_time.sleeps == [1.0, 2.0]
+
+
+def test_scheduler_retries_network_errors() -> None:
+    fake_time = FakeTime()
+    scheduler = make_scheduler(fake_time, max_retries=1)
+    attempts: list[int] = []
+
+    def send() -> RawResponse:
+        attempts.append(1)
+        raise ConnectionResetError("reset")
+
+    with pytest.raises(ConnectionResetError):
+        scheduler.run("core", send)
+    assert len(attempts) == 2
+
+
+@pytest.mark.parametrize(
+    ("path", "resource"),
+    [("/graphql", "graphql"), ("/search/issues?q=x", "search"), ("/orgs/x", "core")],
+)
+def test_resource_for_path(path: str, resource: str) -> None:
+    assert resource_for_path(path) == resource
@@ -0,0 +1,108 @@
+from datetime import UTC, datetime
+from pathlib import Path
+
+import pytest
+
+from profile_readme_generator.freshness import output_is_current
+from profile_readme_generator.generator import RepoEntry, load_template, render_readme
+from profile_readme_generator.readme_template import Slot, compile_template
+
+REPOS = [
+    RepoEntry("score", "Main repo", "Modules", "General"),
+    RepoEntry("tools", "Tooling repo", "Infrastructure", "General"),
+    RepoEntry("docs", "Documentation", "Uncategorized", "General"),
+]
+
+
+def test_compile_template_splits_literals_and_slots_once_per_template() -> None:
+    template = "# {{ repo_count }} repos\n{{repo_sections}}\n${{ secrets.X }}"
+
+    compiled = compile_template(template)
+
+    assert compiled.segments == (
+        "# ",
+        Slot("repo_count"),
+        " repos\n",
+        Slot("repo_sections"),
+        "\n${{ secrets.X }}",
+    )
+    assert compile_template("".join(template)) is compiled
+
+
+@pytest.mark.parametrize(
+    ("template", "error"),
+    [
+        ("{{ repo_list }}", "Unknown template placeholder '{{ repo_list }}'"),
+        ("{{ category_section }}", "needs an argument"),
+        ("{{ repo_count: 3 }}", "takes no argument"),
+    ],
+)
+def test_compile_template_rejects_invalid_placeholders(
+    template: str,
+    error: str,
+) -> None:
+    with pytest.raises(ValueError, match=error):
+        compile_template(template)
+
+
+def test_load_template_rejects_unknown_placeholders(tmp_path: Path) -> None:
+    path = tmp_path / "template.md"
+    path.write_text("# {{ org_name }}\n", encoding="utf-8")
+
+    with pytest.raises(ValueError, match="Unknown template placeholder"):
+        load_template(path)
+
+
+def test_render_readme_fills_count_category_and_generated_at_slots() -> None:
+    template = (
+        "{{ repo_count }} repositories, generated {{ generated_at }}\n\n"
+        "## Modules\n\n{{ category_section: modules }}\n\n"
+        "## Everything else\n\n{{ repo_sections }}\n\n"
+        "{{ category_section: Website }}\n"
+    )
+
+    markdown = render_readme(
+        REPOS,
+        template=template,
+        generated_at=datetime(2025, 1, 2, 3, 4, 5, tzinfo=UTC),
+    )
+
+    modules = render_readme(REPOS[:1], template="{{ repo_sections }}")
+    others = render_readme(REPOS[1:], template="{{ repo_sections }}")
+    assert markdown == (
+        "3 repositories, generated 2025-01-02T03:04:05+00:00\n\n"
+        f"## Modules\n\n{modules.rstrip()}\n\n"
+        f"## Everything else\n\n{others}"
+    )
+
+
+def test_renders_that_differ_only_in_generated_at_count_as_current(
+    tmp_path: Path,
+) -> None:
+    template = "Generated {{ generated_at }}\n\n{{ repo_sections }}\n"
+    volatile = compile_template(template).volatile_pattern
+    path = tmp_path / "README.md"
+    path.write_text(
+        render_readme(
+            REPOS,
+            template=template,
+            generated_at=datetime(2025, 1, 2, 3, 4, 5, tzinfo=UTC),
+        ),
+        encoding="utf-8",
+    )
+
+    later = render_readme(
+        REPOS,
+        template=template,
+        generated_at=datetime(2025, 1, 2, 3, 4, 6, tzinfo=UTC),
+    )
+    changed = render_readme(
+        REPOS[:2],
+        template=template,
+        generated_at=datetime(2025, 1, 2, 3, 4, 6, tzinfo=UTC),
+    )
+
+    assert output_is_current(path, later, volatile=volatile)
+    assert not output_is_current(path, changed, volatile=volatile)
+    assert not output_is_current(path, later)
+    assert compile_template("{{ repo_sections }}").volatile_pattern is None
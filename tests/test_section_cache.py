@@ -0,0 +1,111 @@
+from pathlib import Path
+
+import pytest
+
+from profile_readme_generator import generator
+from profile_readme_generator.generator import (
+    CategoryConfig,
+    ReadmeConfig,
+    RepoEntry,
+    SubcategoryConfig,
+    render_readme,
+)
+from profile_readme_generator.section_cache import (
+    SectionCache,
+    load_section_cache,
+    renderer_fingerprint,
+    save_section_cache,
+)
+
+TEMPLATE = "# Repositories\n\n{{ repo_sections }}\n"
+CONFIG = ReadmeConfig(
+    categories=(
+        CategoryConfig(
+            name="Infrastructure",
+            description="Shared tooling.",
+            subcategories=(SubcategoryConfig("Tooling", "Build tools."),),
+        ),
+    )
+)
+REPOS = [
+    RepoEntry("score", "Main repo", "Modules", "General"),
+    RepoEntry("tools", "Tooling repo", "Infrastructure", "Tooling"),
+    RepoEntry("ci", "CI setup", "Infrastructure", "Automation"),
+    RepoEntry("docs", "Documentation", "Uncategorized", "General"),
+]
+
+
+def test_render_readme_reuses_unchanged_sections() -> None:
+    cache = SectionCache()
+    first = render_readme(REPOS, template=TEMPLATE, config=CONFIG, section_cache=cache)
+
+    assert first == render_readme(REPOS, template=TEMPLATE, config=CONFIG)
+    # Three categories plus the two subcategories of Infrastructure.
+    assert (cache.hits, cache.misses) == (0, 5)
+
+    changed = [
+        *REPOS[:2],
+        RepoEntry("ci", "CI workflows", "Infrastructure", "Automation"),
+        REPOS[3],
+    ]
+    second = render_readme(
+        changed, template=TEMPLATE, config=CONFIG, section_cache=cache
+    )
+
+    assert second == render_readme(changed, template=TEMPLATE, config=CONFIG)
+    # Infrastructure and its Automation subcategory are rendered again; the
+    # Tooling subcategory and the other categories are reused.
+    assert (cache.hits, cache.misses) == (3, 7)
+
+
+def test_section_cache_persists_only_the_sections_in_use(tmp_path: Path) -> None:
+    path = tmp_path / "sections.json"
+    cache = load_section_cache(path)
+    render_readme(REPOS, template=TEMPLATE, config=CONFIG, section_cache=cache)
+    save_section_cache(path, cache)
+
+    reloaded = load_section_cache(path)
+    markdown = render_readme(
+        REPOS[:1], template=TEMPLATE, config=CONFIG, section_cache=reloaded
+    )
+
+    assert markdown == render_readme(REPOS[:1], template=TEMPLATE, config=CONFIG)
+    assert (reloaded.hits, reloaded.misses) == (1, 0)
+
+    save_section_cache(path, reloaded)
+    pruned = load_section_cache(path)
+    render_readme(REPOS, template=TEMPLATE, config=CONFIG, section_cache=pruned)
+
+    # Only the Modules section of the last render was kept.
+    assert (pruned.hits, pruned.misses) == (1, 4)
+
+    path.write_text('{"version": 999}', encoding="utf-8")
+    stale = load_section_cache(path)
+    render_readme(REPOS, template=TEMPLATE, config=CONFIG, section_cache=stale)
+
+    assert (stale.hits, stale.misses) == (0, 5)
+
+
+def test_sections_of_other_renderers_are_not_reused(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    cache = SectionCache()
+    render_readme(REPOS, template=TEMPLATE, config=CONFIG, section_cache=cache)
+
+    monkeypatch.setattr(generator, "section_renderer", lambda: "changed renderer")
+    render_readme(REPOS, template=TEMPLATE, config=CONFIG, section_cache=cache)
+
+    assert (cache.hits, cache.misses) == (0, 10)
+
+
+def test_renderer_fingerprint_follows_the_render_code() -> None:
+    def render_row(name: str) -> str:
+        return f"| {name} |"
+
+    def render_row_bold(name: str) -> str:
+        return f"| **{name}** |"
+
+    assert renderer_fingerprint((render_row,)) == renderer_fingerprint((render_row,))
+    assert renderer_fingerprint((render_row,)) != renderer_fingerprint(
+        (render_row_bold,)
+    )
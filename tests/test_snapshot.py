@@ -0,0 +1,138 @@
+import json
+import os
+import re
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from profile_readme_generator.generator import RepoEntry, fetch_repositories
+from profile_readme_generator.snapshot import (
+    OrgSnapshot,
+    RepositoryRecord,
+    SnapshotOrganization,
+    load_snapshot,
+    write_snapshot,
+)
+
+NETWORK_MODULES = {
+    "http.client",
+    "socket",
+    "ssl",
+    "profile_readme_generator.github_api",
+    "profile_readme_generator.http_cache",
+    "profile_readme_generator.ratelimit",
+}
+GENERATOR_IMPORT_BUDGET_SECONDS = 0.5
+
+OFFLINE_RENDER = """
+import json, sys
+sys.argv = ["generate-profile-readme", "--from-snapshot", sys.argv[1], "--output", sys.argv[2]]
+from profile_readme_generator.generator import main
+main()
+print(json.dumps(sorted(sys.modules)))
+"""
+
+
+def record(name: str, **overrides: object) -> RepositoryRecord:
+    values: dict[str, object] = {
+        "name": name,
+        "full_name": f"eclipse-score/{name}",
+        "description": f"{name} repo",
+        "archived": False,
+        "visibility": "public",
+        "pushed_at": "2025-01-02T03:04:05Z",
+        "default_branch": "main",
+        "open_issues_count": 1,
+        "stargazers_count": 2,
+        "forks_count": 3,
+        "size": 4,
+        "custom_properties": {},
+    }
+    values.update(overrides)
+    return RepositoryRecord(**values)  # type: ignore[arg-type]
+
+
+def make_snapshot(*repositories: RepositoryRecord) -> OrgSnapshot:
+    return OrgSnapshot(
+        org="eclipse-score",
+        created_at="2025-01-02T00:00:00+00:00",
+        repositories=repositories,
+    )
+
+
+def test_snapshot_round_trips_through_json(tmp_path: Path) -> None:
+    snapshot = make_snapshot(
+        record("infra", custom_properties={"category": "Infra", "tags": ["a", "b"]}),
+        record("docs", description=None, visibility="private"),
+    )
+
+    write_snapshot(snapshot, tmp_path / "snapshot.json")
+
+    assert load_snapshot(tmp_path / "snapshot.json") == snapshot
+
+
+def test_load_snapshot_rejects_other_versions(tmp_path: Path) -> None:
+    path = tmp_path / "snapshot.json"
+    path.write_text(json.dumps({"version": 999}), encoding="utf-8")
+
+    with pytest.raises(ValueError, match="Unsupported snapshot version 999"):
+        load_snapshot(path)
+
+
+def test_fetch_repositories_reads_snapshot_organization() -> None:
+    organization = SnapshotOrganization(
+        make_snapshot(
+            record("tools", custom_properties={"category": "Infrastructure"}),
+            record("old", archived=True, custom_properties={"category": "Legacy"}),
+            record("docs"),
+        )
+    )
+
+    assert fetch_repositories(organization) == [
+        RepoEntry("docs", "docs repo", "Uncategorized", "General"),
+        RepoEntry("tools", "tools repo", "Infrastructure", "General"),
+    ]
+
+
+def test_rendering_from_snapshot_stays_offline(tmp_path: Path) -> None:
+    write_snapshot(
+        make_snapshot(
+            record("tools", custom_properties={"category": "Infrastructure"})
+        ),
+        tmp_path / "snapshot.json",
+    )
+    # No token, no PATH (so no `gh`), no proxy settings: only the source tree.
+    environment = {"PYTHONPATH": str(Path(__file__).parents[1] / "src")}
+    if "SYSTEMROOT" in os.environ:
+        environment["SYSTEMROOT"] = os.environ["SYSTEMROOT"]
+
+    result = subprocess.run(
+        [
+            sys.executable,
+            "-X",
+            "importtime",
+            "-c",
+            OFFLINE_RENDER,
+            str(tmp_path / "snapshot.json"),
+            str(tmp_path / "README.md"),
+        ],
+        check=True,
+        capture_output=True,
+        cwd=tmp_path,
+        env=environment,
+        text=True,
+    )
+
+    assert "[tools](https://github.com/eclipse-score/tools)" in (
+        tmp_path / "README.md"
+    ).read_text(encoding="utf-8")
+    assert NETWORK_MODULES.isdisjoint(json.loads(result.stdout))
+    import_time = re.search(
+        r"^import time:\s+\d+ \|\s+(\d+) \| profile_readme_generator\.generator$",
+        result.stderr,
+        re.MULTILINE,
+    )
+    assert import_time is not None
+    assert int(import_time.group(1)) / 1_000_000 < GENERATOR_IMPORT_BUDGET_SECONDS
@@ -0,0 +1,215 @@
+import http.client
+import json
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections.abc import Iterator
+from pathlib import Path
+
+import pytest
+
+from profile_readme_generator.generator import RepoEntry, render_readme
+from profile_readme_generator.webhook import (
+    SIGNATURE_HEADER,
+    DebouncedWriter,
+    ReadmeIndex,
+    WebhookServer,
+    replay,
+    signature_for,
+    write_readme,
+)
+
+DELIVERIES = sorted((Path(__file__).parent / "fixtures" / "webhooks").glob("*.json"))
+TEMPLATE = "# Repositories\n\n{{ repo_sections }}\n"
+INITIAL_REPOS = [
+    RepoEntry("score", "Main repo", "Modules", "General"),
+    RepoEntry("tools", "Tooling repo", "Infrastructure", "General"),
+    RepoEntry("docs", "Documentation", "Uncategorized", "General"),
+    RepoEntry("old-demo", "Early demo", "Uncategorized", "General"),
+]
+EXPECTED_REPOS = [
+    RepoEntry("score", "Main repo", "Modules", "General"),
+    RepoEntry("tools", "Build and release tooling", "Infrastructure", "Tooling"),
+    RepoEntry("docs", "Documentation", "Infrastructure", "General"),
+]
+
+
+@pytest.fixture
+def index() -> ReadmeIndex:
+    return ReadmeIndex(INITIAL_REPOS, template=TEMPLATE, org_name="eclipse-score")
+
+
+@pytest.fixture
+def server(index: ReadmeIndex, tmp_path: Path) -> Iterator[WebhookServer]:
+    writer = DebouncedWriter(
+        lambda: write_readme(index, tmp_path / "README.md"),
+        delay=0.2,
+    )
+    webhook_server = WebhookServer(
+        ("127.0.0.1", 0),
+        index=index,
+        writer=writer,
+        org="eclipse-score",
+        secret=b"s3cret",
+    )
+    thread = threading.Thread(
+        target=webhook_server.serve_forever,
+        kwargs={"poll_interval": 0.01},
+        daemon=True,
+    )
+    thread.start()
+    yield webhook_server
+    webhook_server.shutdown()
+    webhook_server.server_close()
+
+
+def test_index_renders_only_touched_sections(index: ReadmeIndex) -> None:
+    assert index.render() == render_readme(INITIAL_REPOS, template=TEMPLATE)
+    assert index.sections_rendered == 3
+
+    for path in DELIVERIES[:3]:
+        delivery = json.loads(path.read_text(encoding="utf-8"))
+        assert index.apply(delivery["event"], delivery["payload"])
+
+    assert index.render() == render_readme(EXPECTED_REPOS, template=TEMPLATE)
+    # Only Infrastructure is rendered again: Uncategorized is now empty and the
+    # Modules section is reused as it was.
+    assert index.sections_rendered == 4
+
+
+def test_server_coalesces_replayed_deliveries_into_one_write(
+    server: WebhookServer,
+    tmp_path: Path,
+) -> None:
+    replay(server.url, DELIVERIES, secret=b"s3cret")
+
+    deadline = time.monotonic() + 5
+    while server.writer.flushes == 0 and time.monotonic() < deadline:
+        time.sleep(0.05)
+
+    assert server.writer.flushes == 1
+    assert (tmp_path / "README.md").read_text(encoding="utf-8") == render_readme(
+        EXPECTED_REPOS, template=TEMPLATE
+    )
+
+
+def test_server_rejects_unsigned_deliveries(server: WebhookServer) -> None:
+    with pytest.raises(urllib.error.HTTPError) as error:
+        replay(server.url, DELIVERIES[:1])
+
+    assert error.value.code == 401
+    assert server.index.entries() == INITIAL_REPOS
+
+
+def post(server: WebhookServer, body: bytes, event: str = "repository") -> int:
+    """POST a signed delivery and return the response status."""
+    request = urllib.request.Request(
+        server.url,
+        data=body,
+        headers={
+            "Content-Type": "application/json",
+            "X-GitHub-Event": event,
+            SIGNATURE_HEADER: signature_for(b"s3cret", body),
+        },
+        method="POST",
+    )
+    try:
+        with urllib.request.urlopen(request) as response:
+            return response.status
+    except urllib.error.HTTPError as error:
+        return error.code
+
+
+@pytest.mark.parametrize("body", [b"{not json", b"\xff\xfe", b"[]"])
+def test_server_rejects_malformed_deliveries(
+    server: WebhookServer,
+    body: bytes,
+) -> None:
+    assert post(server, body) == 400
+    assert server.index.entries() == INITIAL_REPOS
+
+
+@pytest.mark.parametrize(
+    ("event", "payload"),
+    [
+        ("repository", {"repository": "score"}),
+        ("repository", {"repository": {"name": 5}}),
+        ("repository", {"repository": {"name": "score"}, "organization": "x"}),
+        ("repository", {"repository": {"name": "score"}, "organization": {"login": 5}}),
+        (
+            "repository",
+            {"action": "renamed", "repository": {"name": "score"}, "changes": []},
+        ),
+        (
+            "repository",
+            {
+                "action": "renamed",
+                "repository": {"name": "core", "description": 5},
+                "changes": {"repository": {"name": {"from": "score"}}},
+            },
+        ),
+        (
+            "repository",
+            {"repository": {"name": "score", "custom_properties": {"category": 5}}},
+        ),
+        (
+            "custom_property_values",
+            {"repository": {"name": "score"}, "new_property_values": {"category": "X"}},
+        ),
+        (
+            "custom_property_values",
+            {"repository": {"name": "score"}, "new_property_values": [{"value": "X"}]},
+        ),
+    ],
+)
+def test_server_rejects_deliveries_with_mistyped_fields(
+    server: WebhookServer,
+    event: str,
+    payload: dict[str, object],
+) -> None:
+    assert post(server, json.dumps(payload).encode(), event) == 400
+    assert server.index.entries() == INITIAL_REPOS
+    assert server.writer.flushes == 0
+
+
+@pytest.mark.parametrize("length", ["many", "-1"])
+def test_server_rejects_an_invalid_content_length(
+    server: WebhookServer,
+    length: str,
+) -> None:
+    host, port = server.server_address[:2]
+    connection = http.client.HTTPConnection(str(host), port, timeout=5)
+    connection.putrequest("POST", "/")
+    connection.putheader("Content-Length", length)
+    connection.endheaders()
+
+    assert connection.getresponse().status == 400
+    connection.close()
+
+
+def test_close_waits_for_a_flush_that_already_started() -> None:
+    started = threading.Event()
+    release = threading.Event()
+    active: list[int] = []
+    overlapping: list[int] = []
+
+    def flush() -> None:
+        active.append(1)
+        overlapping.append(len(active))
+        started.set()
+        release.wait(timeout=5)
+        active.pop()
+
+    writer = DebouncedWriter(flush, delay=0)
+    writer.schedule()
+    assert started.wait(timeout=5)
+    # A change arrives while the timer's flush runs; close() flushes it at once.
+    writer.delay = 60
+    writer.schedule()
+    threading.Timer(0.1, release.set).start()
+
+    writer.close()
+
+    assert writer.flushes == 2
+    assert overlapping == [1, 1]